@@ -1,86 +1,327 @@
 """
 Deadline API endpoints for ComfyUI
 Provides REST and WebSocket endpoints for the Deadline panel
+
+Worker state is versioned: every change increments a sequence number and is
+sent as a "worker_delta" message carrying only the changed fields. Clients
+start from a "worker_snapshot" (sent on connect) and apply deltas whose seq is
+exactly one higher than the last applied; on a gap they send
+{"type": "resync"} and receive a new snapshot.
+
+Status updates are merged per worker and flushed at most flush_rate times per
+second as one "update" delta ({"updates": {worker_id: changes}}); lifecycle
+events (add, remove, clear, stop, job submitted) flush pending updates first
+and are sent immediately.
+
+POST /deadline/submit answers with a ticket as soon as the request is parsed;
+the submission itself runs on a thread pool of DEADLINE_SUBMIT_CONCURRENCY
+workers (default 4) and its outcome is sent as "job_submitted" (ticket, jobId)
+or "job_failed" (ticket, error). GET /deadline/submit/{ticket} returns the
+same status for clients that were not connected.
+
+POST /deadline/submit-batch takes {"jobs": [...]} (top-level fields are shared
+defaults for every job) and submits all jobs with one deadlinecommand call;
+each job gets its own ticket and its own job_submitted/job_failed message.
 """
 
+import os
 import json
+import time
+import uuid
 import asyncio
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from typing import Dict, List, Optional, Set
 from aiohttp import web
 import logging
 
+from .deadline_submit import DeadlineJobSubmitter, DeadlineSubmitNode, NodeDefaults, WorkflowProcessor
+
 logger = logging.getLogger(__name__)
 
+CLIENT_QUEUE_SIZE = 64  # messages buffered per websocket client before the oldest are dropped
+CLIENT_HIGH_WATER = 48  # queued messages at which a client counts as falling behind
+CLIENT_HIGH_WATER_TIMEOUT = 15.0  # seconds a client may stay behind before it is disconnected
+CLIENT_CLOSE_TIMEOUT = 5.0  # seconds to wait for a slow client's close handshake
+
+UPDATE_FLUSH_RATE = 4.0  # status update flushes per second
+SUBMIT_CONCURRENCY = int(os.environ.get("DEADLINE_SUBMIT_CONCURRENCY", "4"))  # concurrent deadlinecommand submissions
+
+_MISSING = object()
+
+class WebSocketClient:
+    """
+    Bounded send queue for one websocket client, drained by its own writer task.
+    
+    Messages are encoded once by the broadcaster and queued as text. A message
+    with a coalesce key replaces the queued message with the same key, so a
+    client only receives the latest snapshot; when the queue is full the oldest
+    message is dropped. A client that stays over the high-water mark is
+    disconnected, so one slow viewer never delays the others. A worker snapshot
+    goes to the back of the queue and replaces the queued deltas it covers, so
+    the client never receives a delta older than the snapshot before it.
+    """
+    
+    def __init__(self, ws: web.WebSocketResponse):
+        self.ws = ws
+        self.queue = deque()  # [coalesce_key, payload, is_delta] entries
+        self.keyed: Dict[str, list] = {}
+        self.ready = asyncio.Event()
+        self.dropped = 0
+        self.missed_messages = False  # set when a message was dropped; the client needs a snapshot
+        self.behind_since = None
+        self.closing = False
+        self.writer = asyncio.create_task(self._write())
+    
+    def enqueue(self, payload: str, coalesce_key: Optional[str] = None, delta: bool = False) -> bool:
+        """
+        Queue an encoded message without waiting for the client.
+        
+        Returns:
+            bool: False if the client should be disconnected for falling behind
+        """
+        if self.closing:
+            return True
+        
+        if coalesce_key is not None and coalesce_key in self.keyed:
+            self.keyed[coalesce_key][1] = payload
+        else:
+            entry = [coalesce_key, payload, delta]
+            self.queue.append(entry)
+            if coalesce_key is not None:
+                self.keyed[coalesce_key] = entry
+            if len(self.queue) > CLIENT_QUEUE_SIZE:
+                self._pop()
+                self.dropped += 1
+                self.missed_messages = True
+        self.ready.set()
+        
+        if len(self.queue) < CLIENT_HIGH_WATER:
+            self.behind_since = None
+            return True
+        now = time.monotonic()
+        if self.behind_since is None:
+            self.behind_since = now
+        return now - self.behind_since <= CLIENT_HIGH_WATER_TIMEOUT
+    
+    def enqueue_snapshot(self, payload: str) -> bool:
+        """Queue a worker snapshot after all other messages, dropping the queued deltas and snapshot it supersedes"""
+        self.queue = deque(entry for entry in self.queue if not entry[2] and entry[0] != "snapshot")
+        self.keyed.pop("snapshot", None)
+        return self.enqueue(payload, coalesce_key="snapshot")
+    
+    def _pop(self) -> str:
+        """Remove and return the oldest queued message"""
+        entry = self.queue.popleft()
+        if entry[0] is not None and self.keyed.get(entry[0]) is entry:
+            del self.keyed[entry[0]]
+        return entry[1]
+    
+    async def _write(self) -> None:
+        """Send queued messages until the connection closes"""
+        try:
+            while not self.ws.closed:
+                if not self.queue:
+                    self.ready.clear()
+                    await self.ready.wait()
+                    continue
+                await self.ws.send_str(self._pop())
+        except (ConnectionError, RuntimeError) as e:
+            logger.debug(f"WebSocket writer stopped: {e}")
+    
+    async def close(self) -> None:
+        """Stop the writer and close the connection"""
+        self.closing = True
+        self.writer.cancel()
+        try:
+            await asyncio.wait_for(self.ws.close(), CLIENT_CLOSE_TIMEOUT)
+        except (asyncio.TimeoutError, ConnectionError, RuntimeError):
+            pass
+
 class DeadlineAPIHandler:
     """Handles API requests for Deadline integration"""
     
-    def __init__(self):
+    def __init__(self, flush_rate: float = UPDATE_FLUSH_RATE, submit_concurrency: int = SUBMIT_CONCURRENCY):
         self.workers: Dict[str, Dict] = {}
         self.active_jobs: Dict[str, Dict] = {}
-        self.websocket_clients: Set[web.WebSocketResponse] = set()
+        self.websocket_clients: Dict[web.WebSocketResponse, WebSocketClient] = {}
         self.update_lock = asyncio.Lock()
+        self.worker_seq = 0
+        self.close_tasks: Set[asyncio.Task] = set()  # closes of disconnected slow clients
+        
+        # Status changes waiting for the next flush, merged per worker
+        self.flush_interval = 1.0 / flush_rate
+        self.pending_updates: Dict[str, Dict] = {}
+        self.flush_task: Optional[asyncio.Task] = None
+        self.last_flush = 0.0
+        
+        # Submissions run deadlinecommand on a bounded pool, off the event loop
+        self.submit_executor = ThreadPoolExecutor(max_workers=max(1, submit_concurrency),
+                                                  thread_name_prefix="DeadlineSubmit")
+        self.submission_tasks: Set[asyncio.Task] = set()
     
     async def get_workers(self, request: web.Request) -> web.Response:
         """GET /deadline/workers - Return list of active workers"""
         try:
-            response_data = {
-                "workers": list(self.workers.values()),
-                "activeWorkers": len([w for w in self.workers.values() if w.get("status") == "active"]),
-                "totalJobs": len(self.active_jobs)
-            }
-            return web.json_response(response_data)
+            return web.json_response(self._snapshot_message())
         except Exception as e:
             logger.error(f"Error getting workers: {e}")
             return web.json_response({"error": str(e)}, status=500)
     
     async def submit_job(self, request: web.Request) -> web.Response:
-        """POST /deadline/submit - Submit workflow to Deadline"""
+        """
+        POST /deadline/submit - Submit workflow to Deadline
+        
+        Returns a ticket right away; the JobID (job_submitted) or error (job_failed)
+        is sent over the websocket when the submission finishes.
+        """
         try:
             data = await request.json()
             workflow = data.get("workflow")
-            is_distributed = data.get("isDistributed", False)
-            master_ws = data.get("masterWs", "localhost:8188")
+            if not workflow:
+                return web.json_response({"error": "No workflow in request"}, status=400)
             
-            # Here you would integrate with the actual Deadline submission
-            # For now, return a mock response
-            job_id = f"job_{len(self.active_jobs) + 1:04d}"
+            try:
+                job_config = job_config_from_request(data)
+            except (ValueError, TypeError) as e:
+                return web.json_response({"error": f"Invalid job settings: {e}"}, status=400)
             
-            self.active_jobs[job_id] = {
-                "id": job_id,
-                "status": "submitted",
-                "isDistributed": is_distributed,
-                "masterWs": master_ws
-            }
+            ticket = self._queue_ticket(data)
+            self._start_submission(self._run_submission(ticket, workflow, job_config))
             
-            # Notify WebSocket clients
+            await self.flush_updates()
             await self._broadcast({
-                "type": "job_submitted",
-                "jobId": job_id
+                "type": "job_queued",
+                "ticket": ticket
             })
             
-            return web.json_response({"jobId": job_id, "status": "submitted"})
+            return web.json_response({"ticket": ticket, "status": "queued"}, status=202)
         except Exception as e:
             logger.error(f"Error submitting job: {e}")
             return web.json_response({"error": str(e)}, status=500)
     
+    async def submit_batch(self, request: web.Request) -> web.Response:
+        """
+        POST /deadline/submit-batch - Submit several workflows with one deadlinecommand call
+        
+        Returns one ticket per job, in request order; results are reported per
+        ticket like single submissions.
+        """
+        try:
+            data = await request.json()
+            jobs = data.get("jobs")
+            if not jobs or not isinstance(jobs, list):
+                return web.json_response({"error": "No jobs in request"}, status=400)
+            
+            shared = {key: value for key, value in data.items() if key != "jobs"}
+            entries = []
+            for index, job in enumerate(jobs):
+                if not isinstance(job, dict):
+                    return web.json_response({"error": f"Job {index} is not an object"}, status=400)
+                entries.append(dict(shared, **job))
+            missing = [index for index, job in enumerate(entries) if not job.get("workflow")]
+            if missing:
+                return web.json_response({"error": f"No workflow for job(s) {', '.join(map(str, missing))}"}, status=400)
+            
+            # Reject the whole batch before any ticket exists, so none is left queued
+            batch = []
+            for index, job in enumerate(entries):
+                try:
+                    batch.append((job["workflow"], job_config_from_request(job)))
+                except (ValueError, TypeError) as e:
+                    return web.json_response({"error": f"Invalid settings for job {index}: {e}"}, status=400)
+            
+            tickets = [self._queue_ticket(job) for job in entries]
+            self._start_submission(self._run_batch_submission(tickets, batch))
+            
+            await self.flush_updates()
+            for ticket in tickets:
+                await self._broadcast({
+                    "type": "job_queued",
+                    "ticket": ticket
+                })
+            
+            return web.json_response({"tickets": tickets, "status": "queued"}, status=202)
+        except Exception as e:
+            logger.error(f"Error submitting job batch: {e}")
+            return web.json_response({"error": str(e)}, status=500)
+    
+    def _queue_ticket(self, data: Dict) -> str:
+        """Record a queued submission and return its ticket"""
+        ticket = uuid.uuid4().hex
+        self.active_jobs[ticket] = {
+            "ticket": ticket,
+            "id": None,
+            "status": "queued",
+            "isDistributed": data.get("isDistributed", False),
+            "masterWs": data.get("masterWs", "localhost:8188")
+        }
+        return ticket
+    
+    def _start_submission(self, coroutine) -> None:
+        """Run a submission coroutine in the background, keeping a reference until it finishes"""
+        task = asyncio.create_task(coroutine)
+        self.submission_tasks.add(task)
+        task.add_done_callback(self.submission_tasks.discard)
+    
+    async def get_submission(self, request: web.Request) -> web.Response:
+        """GET /deadline/submit/{ticket} - Status of a submission"""
+        job = self.active_jobs.get(request.match_info.get("ticket"))
+        if job is None:
+            return web.json_response({"error": "Unknown ticket"}, status=404)
+        return web.json_response(job)
+    
+    async def _run_submission(self, ticket: str, workflow: Dict, job_config: Dict) -> None:
+        """Submit on the executor and report the result to WebSocket clients"""
+        self.active_jobs[ticket]["status"] = "submitting"
+        try:
+            loop = asyncio.get_running_loop()
+            success, result = await loop.run_in_executor(self.submit_executor, submit_workflow, workflow, job_config)
+        except Exception as e:
+            success, result = False, str(e)
+        
+        await self._report_submission(ticket, success, result)
+    
+    async def _run_batch_submission(self, tickets: List[str], batch: List) -> None:
+        """Submit a batch on the executor and report each job's result"""
+        for ticket in tickets:
+            self.active_jobs[ticket]["status"] = "submitting"
+        try:
+            loop = asyncio.get_running_loop()
+            results = await loop.run_in_executor(self.submit_executor, submit_workflows, batch)
+        except Exception as e:
+            results = [(False, str(e))] * len(tickets)
+        
+        for ticket, (success, result) in zip(tickets, results):
+            await self._report_submission(ticket, success, result)
+    
+    async def _report_submission(self, ticket: str, success: bool, result: str) -> None:
+        """Record a submission's JobID or error and send it to WebSocket clients"""
+        job = self.active_jobs[ticket]
+        if success:
+            job.update({"id": result, "status": "submitted"})
+            message = {"type": "job_submitted", "ticket": ticket, "jobId": result}
+        else:
+            logger.error(f"Deadline submission {ticket} failed: {result}")
+            job.update({"status": "failed", "error": result})
+            message = {"type": "job_failed", "ticket": ticket, "error": result}
+        
+        await self.flush_updates()
+        await self._broadcast(message)
+    
     async def stop_worker(self, request: web.Request) -> web.Response:
         """POST /deadline/workers/{workerId}/stop - Stop specific worker"""
         try:
             worker_id = request.match_info.get("workerId")
             
             if worker_id in self.workers:
-                self.workers[worker_id]["status"] = "stopping"
+                await self.update_worker_status(worker_id, {"status": "stopping"}, immediate=True)
                 
                 # Here you would send actual stop command to Deadline
                 
                 # Remove worker after a delay
                 asyncio.create_task(self._remove_worker_delayed(worker_id))
                 
-                await self._broadcast({
-                    "type": "worker_stopping",
-                    "workerId": worker_id
-                })
-                
                 return web.json_response({"status": "stopping"})
             else:
                 return web.json_response({"error": "Worker not found"}, status=404)
@@ -92,14 +333,11 @@ class DeadlineAPIHandler:
         """POST /deadline/workers/stop-all - Stop all workers"""
         try:
             for worker_id in list(self.workers.keys()):
-                self.workers[worker_id]["status"] = "stopping"
+                await self.update_worker_status(worker_id, {"status": "stopping"})
+            await self.flush_updates()
             
             # Here you would send actual stop commands to Deadline
             
-            await self._broadcast({
-                "type": "all_workers_stopping"
-            })
-            
             # Clear workers after a delay
             asyncio.create_task(self._clear_workers_delayed())
             
@@ -113,17 +351,13 @@ class DeadlineAPIHandler:
         ws = web.WebSocketResponse()
         await ws.prepare(request)
         
-        # Add to clients set
-        self.websocket_clients.add(ws)
+        # Register the client's send queue
+        client = WebSocketClient(ws)
+        self.websocket_clients[ws] = client
         
         try:
-            # Send initial state
-            await ws.send_json({
-                "type": "initial_state",
-                "workers": list(self.workers.values()),
-                "activeWorkers": len([w for w in self.workers.values() if w.get("status") == "active"]),
-                "totalJobs": len(self.active_jobs)
-            })
+            # Send the current worker state; deltas follow from its seq
+            client.enqueue_snapshot(json.dumps(self._snapshot_message()))
             
             # Keep connection alive
             async for msg in ws:
@@ -132,64 +366,149 @@ class DeadlineAPIHandler:
                         data = json.loads(msg.data)
                         # Handle incoming messages if needed
                         if data.get("type") == "ping":
-                            await ws.send_json({"type": "pong"})
+                            client.enqueue(json.dumps({"type": "pong"}), coalesce_key="pong")
+                        elif data.get("type") == "resync":
+                            # The client missed a delta
+                            client.enqueue_snapshot(json.dumps(self._snapshot_message()))
                     except json.JSONDecodeError:
                         pass
                 elif msg.type == web.WSMsgType.ERROR:
                     logger.error(f"WebSocket error: {ws.exception()}")
         finally:
-            # Remove from clients set
-            self.websocket_clients.discard(ws)
+            # Remove from clients
+            self.websocket_clients.pop(ws, None)
+            client.closing = True
+            client.writer.cancel()
             
         return ws
     
     async def register_worker(self, worker_info: Dict) -> None:
         """Register a new worker"""
         async with self.update_lock:
+            await self._flush_pending()
             worker_id = worker_info.get("id")
-            self.workers[worker_id] = worker_info
-            
-        await self._broadcast({
-            "type": "worker_registered",
-            "worker": worker_info
-        })
+            self.workers[worker_id] = dict(worker_info)
+            await self._publish_delta("add", worker_id, dict(worker_info))
     
-    async def update_worker_status(self, worker_id: str, status: Dict) -> None:
-        """Update worker status"""
+    async def update_worker_status(self, worker_id: str, status: Dict, immediate: bool = False) -> None:
+        """
+        Update worker status. Only changed fields are sent, merged with other
+        pending changes of the worker and flushed on the next tick.
+        
+        Args:
+            worker_id: Worker to update
+            status: Fields to set
+            immediate: Send now instead of on the next tick (lifecycle changes)
+        """
         async with self.update_lock:
-            if worker_id in self.workers:
-                self.workers[worker_id].update(status)
-                
-        await self._broadcast({
-            "type": "worker_update",
-            "workers": list(self.workers.values())
-        })
+            worker = self.workers.get(worker_id)
+            if worker is None:
+                return
+            changes = {key: value for key, value in status.items() if worker.get(key, _MISSING) != value}
+            if changes:
+                worker.update(changes)
+                self.pending_updates.setdefault(worker_id, {}).update(changes)
+            if immediate:
+                await self._flush_pending()
+            elif changes:
+                self._schedule_flush()
     
     async def unregister_worker(self, worker_id: str) -> None:
         """Unregister a worker"""
         async with self.update_lock:
-            if worker_id in self.workers:
-                del self.workers[worker_id]
-                
-        await self._broadcast({
-            "type": "worker_unregistered",
-            "workerId": worker_id
-        })
+            if worker_id not in self.workers:
+                return
+            await self._flush_pending()
+            del self.workers[worker_id]
+            await self._publish_delta("remove", worker_id)
+    
+    async def flush_updates(self) -> None:
+        """Send pending status updates now"""
+        async with self.update_lock:
+            await self._flush_pending()
+    
+    def _schedule_flush(self) -> None:
+        """Flush pending updates once the flush interval since the last flush has passed"""
+        if self.flush_task is not None and not self.flush_task.done():
+            return
+        delay = max(0.0, self.last_flush + self.flush_interval - time.monotonic())
+        self.flush_task = asyncio.create_task(self._flush_later(delay))
     
-    async def _broadcast(self, message: Dict) -> None:
-        """Broadcast message to all WebSocket clients"""
+    async def _flush_later(self, delay: float) -> None:
+        """Flush pending updates after a delay"""
+        await asyncio.sleep(delay)
+        await self.flush_updates()
+    
+    async def _flush_pending(self) -> None:
+        """Publish all pending status changes as one delta (caller holds update_lock)"""
+        if not self.pending_updates:
+            return
+        updates = self.pending_updates
+        self.pending_updates = {}
+        self.last_flush = time.monotonic()
+        await self._publish_delta("update", updates=updates)
+    
+    def _snapshot_message(self) -> Dict:
+        """Full worker state at the current sequence number"""
+        return {
+            "type": "worker_snapshot",
+            "seq": self.worker_seq,
+            "workers": list(self.workers.values()),
+            "activeWorkers": len([w for w in self.workers.values() if w.get("status") == "active"]),
+            "totalJobs": len(self.active_jobs)
+        }
+    
+    async def _publish_delta(self, op: str, worker_id: Optional[str] = None, changes: Optional[Dict] = None,
+                             updates: Optional[Dict[str, Dict]] = None) -> None:
+        """
+        Record a worker state change under the next sequence number and broadcast it.
+        Called with update_lock held, so deltas are queued in sequence order.
+        
+        Args:
+            op: "add", "update", "remove" or "clear"
+            worker_id: Affected worker ("add" and "remove")
+            changes: All fields of an added worker
+            updates: Changed fields per worker ("update")
+        """
+        self.worker_seq += 1
+        message = {"type": "worker_delta", "seq": self.worker_seq, "op": op}
+        if worker_id is not None:
+            message["workerId"] = worker_id
+        if changes:
+            message["changes"] = changes
+        if updates:
+            message["updates"] = updates
+        await self._broadcast(message, delta=True)
+    
+    async def _broadcast(self, message: Dict, coalesce_key: Optional[str] = None, delta: bool = False) -> None:
+        """
+        Queue a message for all WebSocket clients without waiting for them.
+        
+        Args:
+            message: Message to send; encoded once for all clients
+            coalesce_key: Messages with the same key replace each other while queued
+            delta: The message is a worker_delta, superseded by a later snapshot
+        """
         if not self.websocket_clients:
             return
-            
-        # Create tasks for sending to all clients
-        tasks = []
-        for ws in list(self.websocket_clients):
-            if not ws.closed:
-                tasks.append(ws.send_json(message))
-                
-        # Send to all clients concurrently
-        if tasks:
-            await asyncio.gather(*tasks, return_exceptions=True)
+        
+        payload = json.dumps(message)
+        snapshot = None
+        for ws, client in list(self.websocket_clients.items()):
+            if ws.closed:
+                continue
+            if not client.enqueue(payload, coalesce_key, delta):
+                logger.warning(f"Disconnecting slow WebSocket client ({len(client.queue)} queued, {client.dropped} dropped)")
+                self.websocket_clients.pop(ws, None)
+                task = asyncio.create_task(client.close())
+                self.close_tasks.add(task)
+                task.add_done_callback(self.close_tasks.discard)
+            elif client.missed_messages:
+                # Dropped deltas leave a gap; a snapshot lets the client continue from the current seq
+                client.missed_messages = False
+                if snapshot is None:
+                    snapshot = json.dumps(self._snapshot_message())
+                client.enqueue_snapshot(snapshot)
     
     async def _remove_worker_delayed(self, worker_id: str, delay: float = 2.0) -> None:
         """Remove worker after a delay"""
@@ -200,10 +519,47 @@ class DeadlineAPIHandler:
         """Clear all workers after a delay"""
         await asyncio.sleep(delay)
         async with self.update_lock:
+            self.pending_updates.clear()
             self.workers.clear()
-        await self._broadcast({
-            "type": "workers_cleared"
-        })
+            await self._publish_delta("clear")
+
+
+def job_config_from_request(data: Dict) -> Dict:
+    """Build a submitter job configuration from a request body, using the node defaults for missing fields"""
+    return DeadlineSubmitNode()._create_job_config(
+        job_name=data.get("jobName", NodeDefaults.JOB_NAME),
+        priority=int(data.get("priority", NodeDefaults.PRIORITY)),
+        pool=data.get("pool", NodeDefaults.POOL),
+        group=data.get("group", NodeDefaults.GROUP),
+        batch_count=int(data.get("batchCount", NodeDefaults.BATCH_COUNT)),
+        chunk_size=int(data.get("chunkSize", NodeDefaults.CHUNK_SIZE)),
+        output_directory=data.get("outputDirectory", ""),
+        comment=data.get("comment", ""),
+        department=data.get("department", ""),
+        persistent_process=bool(data.get("persistentProcess", False)),
+        batch_latent_fold=bool(data.get("batchLatentFold", False)),
+        model_locality=data.get("modelLocality", NodeDefaults.MODEL_LOCALITY),
+        model_locality_directory=data.get("modelLocalityDirectory", ""),
+        result_cache_directory=data.get("resultCacheDirectory", ""),
+        parameter_table=data.get("parameterTable", "")
+    )
+
+def submit_workflow(workflow: Dict, job_config: Dict):
+    """Prepare and submit a workflow with deadlinecommand (blocking; runs on the submit executor)"""
+    prepared_workflow = WorkflowProcessor.prepare_workflow_for_submission(workflow)
+    return DeadlineJobSubmitter(prepared_workflow, job_config).submit_job()
+
+def submit_workflows(batch: List) -> List:
+    """Prepare and submit (workflow, job_config) pairs with one deadlinecommand call (blocking)"""
+    jobs, errors = [], {}
+    for index, (workflow, job_config) in enumerate(batch):
+        try:
+            jobs.append((WorkflowProcessor.prepare_workflow_for_submission(workflow), job_config))
+        except Exception as e:
+            errors[index] = (False, f"Error submitting to Deadline: {str(e)}")
+    
+    results = iter(DeadlineJobSubmitter.submit_batch(jobs)) if jobs else iter(())
+    return [errors[index] if index in errors else next(results) for index in range(len(batch))]
 
 
 # Global handler instance
@@ -214,6 +570,8 @@ def setup_routes(app: web.Application) -> None:
     """Setup routes for Deadline API"""
     app.router.add_get("/deadline/workers", deadline_api.get_workers)
     app.router.add_post("/deadline/submit", deadline_api.submit_job)
+    app.router.add_post("/deadline/submit-batch", deadline_api.submit_batch)
+    app.router.add_get("/deadline/submit/{ticket}", deadline_api.get_submission)
     app.router.add_post("/deadline/workers/{workerId}/stop", deadline_api.stop_worker)
     app.router.add_post("/deadline/workers/stop-all", deadline_api.stop_all_workers)
     app.router.add_get("/deadline", deadline_api.websocket_handler)
@@ -15,6 +15,8 @@ import subprocess
 import uuid
 import time
 import re
+import threading
+import importlib
 from typing import Optional, Dict, List, Any, Union, Tuple
 
 # Configuration constants
@@ -23,6 +25,14 @@ DEADLINE_COMMAND_PATHS = {
     'linux': "/opt/Thinkbox/Deadline10/bin/deadlinecommand"
 }
 
+# Farm information cached on disk so node definitions don't wait for deadlinecommand
+FARM_CACHE_FILE = os.path.join(tempfile.gettempdir(), "comfyui_deadline_farm_cache.json")
+FARM_LIST_TTL = 300  # seconds before cached pools/groups are refreshed in the background
+DEADLINE_COMMAND_TTL = 24 * 3600  # seconds before the deadlinecommand path is resolved again
+
+# Helper modules shipped with the Deadline plugin are shared with the submitter
+PLUGIN_DIRECTORY = os.path.join(os.path.dirname(os.path.abspath(__file__)), "plugins", "ComfyUI")
+
 # Node configuration constants
 class NodeDefaults:
     JOB_NAME = "ComfyUI via DeadlineNode"
@@ -34,13 +44,122 @@ class NodeDefaults:
     MAX_BATCH_COUNT = 100
     MAX_CHUNK_SIZE = 16
     MAX_PRIORITY = 100
+    MODEL_LOCALITY = "off"
+    MODEL_LOCALITY_MODES = ["off", "prefer", "require"]
+    MODEL_LOCALITY_GRACE = 120  # seconds a "prefer" job waits for workers that have its models
+    PARAMETER_TABLE_FILE = "parameter_table.json"
+    SWEEP_MODES = ["range", "list"]
+
+def import_plugin_module(name: str):
+    """Import a helper module from the Deadline plugin directory"""
+    if PLUGIN_DIRECTORY not in sys.path:
+        sys.path.append(PLUGIN_DIRECTORY)
+    return importlib.import_module(name)
+
+class FarmInfoCache:
+    """
+    Disk-backed cache of slow farm queries (pools, groups, deadlinecommand path).
+    Returns the last known value immediately and refreshes stale entries on a background thread.
+    """
+    
+    _entries = None
+    _lock = threading.Lock()
+    _refreshing = set()
+    
+    @classmethod
+    def get(cls, key: str, loader, default: Any, ttl: float) -> Any:
+        """
+        Get a cached value, refreshing it in the background when older than ttl.
+        
+        Args:
+            key: Cache entry name
+            loader: Callable returning the fresh value; exceptions keep the cached value
+            default: Returned while nothing has been cached yet
+            ttl: Seconds after which the entry is refreshed
+        """
+        with cls._lock:
+            entry = cls._load_entries().get(key)
+        
+        if entry is None or time.time() - entry.get("updated", 0) > ttl:
+            cls._refresh_in_background(key, loader)
+        return entry["value"] if entry is not None else default
+    
+    @classmethod
+    def get_fresh(cls, key: str, ttl: float) -> Any:
+        """Get a cached value if it is younger than ttl, otherwise None"""
+        with cls._lock:
+            entry = cls._load_entries().get(key)
+        if entry is None or time.time() - entry.get("updated", 0) > ttl:
+            return None
+        return entry["value"]
+    
+    @classmethod
+    def set(cls, key: str, value: Any):
+        """Store a value and persist the cache"""
+        with cls._lock:
+            entries = cls._load_entries()
+            entries[key] = {"value": value, "updated": time.time()}
+            cls._save_entries(entries)
+    
+    @classmethod
+    def _refresh_in_background(cls, key: str, loader):
+        """Start one refresh thread per key"""
+        with cls._lock:
+            if key in cls._refreshing:
+                return
+            cls._refreshing.add(key)
+        
+        def refresh():
+            try:
+                cls.set(key, loader())
+            except Exception as e:
+                print(f"Deadline Submission: Warning - Could not refresh cached {key}: {e}")
+            finally:
+                with cls._lock:
+                    cls._refreshing.discard(key)
+        
+        threading.Thread(target=refresh, name=f"DeadlineFarmCache-{key}", daemon=True).start()
+    
+    @classmethod
+    def _load_entries(cls) -> Dict:
+        """Read the cache file once per process (caller holds the lock)"""
+        if cls._entries is None:
+            try:
+                with open(FARM_CACHE_FILE, 'r') as f:
+                    cls._entries = json.load(f)
+            except (OSError, ValueError):
+                cls._entries = {}
+        return cls._entries
+    
+    @classmethod
+    def _save_entries(cls, entries: Dict):
+        """Write the cache file atomically (caller holds the lock)"""
+        temp_path = f"{FARM_CACHE_FILE}.{os.getpid()}.tmp"
+        try:
+            with open(temp_path, 'w') as f:
+                json.dump(entries, f)
+            os.replace(temp_path, FARM_CACHE_FILE)
+        except OSError as e:
+            print(f"Deadline Submission: Warning - Could not write farm cache {FARM_CACHE_FILE}: {e}")
 
 class DeadlineCommandHelper:
     """Helper class for interacting with Deadline command line"""
     
     @staticmethod
     def get_deadline_command() -> str:
-        """Get the path to the deadlinecommand executable"""
+        """Get the path to the deadlinecommand executable, cached between calls"""
+        cached_command = FarmInfoCache.get_fresh("deadline_command", DEADLINE_COMMAND_TTL)
+        if cached_command and os.path.exists(cached_command):
+            return cached_command
+        
+        deadline_command = DeadlineCommandHelper._find_deadline_command()
+        if deadline_command:
+            FarmInfoCache.set("deadline_command", deadline_command)
+        return deadline_command
+
+    @staticmethod
+    def _find_deadline_command() -> str:
+        """Locate the deadlinecommand executable"""
         deadline_bin = ""
         try:
             deadline_bin = os.environ.get('DEADLINE_PATH', '')
@@ -122,42 +241,51 @@ class DeadlineCommandHelper:
                 return line.replace("JobID=", "").strip()
         return ""
 
+    @staticmethod
+    def get_job_ids_from_submission(submission_results: str) -> List[str]:
+        """
+        Parse the job IDs from -SubmitMultipleJobs results, in submission order.
+        
+        Every job reports a Result= line followed by its JobID= on success, so a
+        job that failed gets an empty ID and the remaining IDs stay in place.
+        """
+        job_ids = []
+        expecting_id = False
+        for line in submission_results.split():
+            if line.startswith("Result="):
+                job_ids.append("")
+                expecting_id = True
+            elif line.startswith("JobID="):
+                job_id = line.replace("JobID=", "").strip()
+                if expecting_id:
+                    job_ids[-1] = job_id
+                else:
+                    job_ids.append(job_id)
+                expecting_id = False
+        return job_ids
+
 class WorkflowProcessor:
     """Handles workflow data processing and validation"""
     
     @staticmethod
     def normalize_workflow(workflow_data: Union[Dict, List]) -> Optional[Dict]:
-        """Normalize workflow data to ensure compatibility"""
+        """Normalize workflow data to node ID -> node, the format the Deadline plugin expects"""
         if not workflow_data:
             print("Deadline Submission: Error - Empty workflow data.")
             return None
-            
-        # If workflow is already in UI format (dictionary with node IDs as keys)
-        if isinstance(workflow_data, dict):
-            is_ui_format = any(isinstance(key, str) and key.isdigit() for key in workflow_data.keys())
-            if is_ui_format:
-                return workflow_data
-                
-        # If it's the API format (list of nodes)
-        if isinstance(workflow_data, list):
-            return WorkflowProcessor._convert_api_to_ui_format(workflow_data)
-            
-        # Not recognized format
-        print(f"Deadline Submission: Warning - Unrecognized workflow format. Attempting to use as-is.")
-        return workflow_data if isinstance(workflow_data, dict) else None
+        
+        workflow = import_plugin_module("comfyui_workflow")
+        try:
+            return workflow.normalize_workflow(workflow_data)
+        except workflow.WorkflowFormatError:
+            # Not recognized format
+            print(f"Deadline Submission: Warning - Unrecognized workflow format. Attempting to use as-is.")
+            return workflow_data if isinstance(workflow_data, dict) else None
 
     @staticmethod
-    def _convert_api_to_ui_format(workflow_list: List) -> Dict:
-        """Convert API format workflow to UI format"""
-        ui_format = {}
-        for node in workflow_list:
-            if isinstance(node, list) and len(node) >= 3:
-                node_id = str(node[0])
-                ui_format[node_id] = {
-                    "class_type": node[1],
-                    "inputs": node[2]
-                }
-        return ui_format
+    def compute_workflow_hash(workflow_data: Dict) -> str:
+        """Canonical hash of a normalized workflow, independent of node IDs and UI metadata"""
+        return import_plugin_module("comfyui_workflow").workflow_hash(workflow_data)
 
     @staticmethod
     def validate_workflow(workflow_data: Dict) -> bool:
@@ -248,29 +376,204 @@ class WorkflowProcessor:
         WorkflowProcessor.validate_workflow(normalized_workflow)
         return normalized_workflow
 
+class ModelLocality:
+    """Steers jobs to workers that already have the workflow's models locally"""
+    
+    @staticmethod
+    def find_preferred_workers(workflow_data: Dict, locality_directory: str) -> List[str]:
+        """Workers whose published local models cover the most of the workflow's models"""
+        models = import_plugin_module("comfyui_models")
+        locality = import_plugin_module("comfyui_locality")
+        
+        keys = [locality.model_key(folder, filename)
+                for folder, filename in models.find_model_references(workflow_data)]
+        if not keys:
+            print("Deadline Submission: Model locality - workflow references no model files.")
+            return []
+        
+        ranking = locality.rank_workers(locality_directory, keys)
+        for worker, cached, loaded in ranking:
+            print(f"Deadline Submission: Model locality - {worker}: {cached}/{len(keys)} models local, {loaded} loaded")
+        if not ranking:
+            print("Deadline Submission: Model locality - no worker has the workflow's models locally.")
+        return [worker for worker, _, _ in ranking]
+
+    @staticmethod
+    def release_whitelist_later(job_id: str, delay: float):
+        """
+        Let any worker pick up the job once the preferred workers had a head start.
+        The timer dies with ComfyUI; the plugin also lifts the whitelist when a task
+        starts after the job's ModelLocalityReleaseAt time.
+        """
+        def release():
+            try:
+                DeadlineCommandHelper.call_deadline_command(["-SetJobMachineLimit", job_id, "0", "", "false"])
+                print(f"Deadline Submission: Model locality - released worker preference for job {job_id}")
+            except Exception as e:
+                print(f"Deadline Submission: Warning - Could not release worker preference for job {job_id}: {e}")
+        
+        timer = threading.Timer(delay, release)
+        timer.daemon = True
+        timer.start()
+
 class DeadlineJobSubmitter:
     """Handles submission of jobs to Deadline"""
     
     def __init__(self, workflow_data: Dict, job_config: Dict):
         self.workflow_data = workflow_data
         self.job_config = job_config
+        self.preferred_workers = []
+        self.workflow_hash = ""
+        self.parameter_table = None
 
     def submit_job(self) -> Tuple[bool, str]:
         """Submit the job to Deadline and return success status and job ID or error message"""
         try:
-            workflow_path = self._save_workflow()
+            workflow_path = self._prepare_submission()
             if not workflow_path:
                 return False, "Failed to save workflow for submission"
             
             job_id = self._submit_to_deadline(workflow_path)
-            if job_id:
-                return True, job_id
-            else:
-                return False, "Job submitted but no JobID returned"
+            return self._finish_submission(job_id)
                 
         except Exception as e:
             return False, f"Error submitting to Deadline: {str(e)}"
 
+    @classmethod
+    def submit_batch(cls, jobs: List[Tuple[Dict, Dict]]) -> List[Tuple[bool, str]]:
+        """
+        Submit several jobs with a single deadlinecommand call (-SubmitMultipleJobs).
+        
+        Each job's files go into its own folder of one staging directory. Jobs
+        that fail to prepare are reported without stopping the others.
+        
+        Args:
+            jobs: (workflow_data, job_config) pairs
+            
+        Returns:
+            list: (success, job ID or error message) for each job, in order
+        """
+        results: List[Tuple[bool, str]] = [(False, "Job was not submitted")] * len(jobs)
+        staging_dir = tempfile.mkdtemp(prefix="comfy_deadline_batch_")
+        command_args = ["-SubmitMultipleJobs"]
+        submitters = []
+        
+        for index, (workflow_data, job_config) in enumerate(jobs):
+            submitter = cls(workflow_data, job_config)
+            try:
+                workflow_path = submitter._prepare_submission()
+                if not workflow_path:
+                    results[index] = (False, "Failed to save workflow for submission")
+                    continue
+                
+                job_dir = os.path.join(staging_dir, f"job_{index:04d}")
+                os.makedirs(job_dir)
+                job_info_file, plugin_info_file, aux_files = submitter._create_submission_files(job_dir, workflow_path)
+            except Exception as e:
+                results[index] = (False, f"Error submitting to Deadline: {str(e)}")
+                continue
+            
+            command_args += ["-job", job_info_file, plugin_info_file] + aux_files
+            submitters.append((index, submitter))
+        
+        if not submitters:
+            return results
+        
+        try:
+            result = DeadlineCommandHelper.call_deadline_command(command_args)
+        except Exception as e:
+            print(f"Deadline Submission: Error during batch submission: {e}")
+            for index, _ in submitters:
+                results[index] = (False, f"Error submitting to Deadline: {str(e)}")
+            return results
+        
+        job_ids = DeadlineCommandHelper.get_job_ids_from_submission(result)
+        if len(job_ids) != len(submitters):
+            print(f"Deadline Submission: Expected {len(submitters)} JobID(s) but found {len(job_ids)}. Result: {result}")
+        
+        for position, (index, submitter) in enumerate(submitters):
+            job_id = job_ids[position] if position < len(job_ids) else ""
+            results[index] = submitter._finish_submission(job_id)
+        
+        submitted = sum(1 for success, _ in results if success)
+        print(f"Deadline Submission: Batch submitted {submitted} of {len(jobs)} job(s)")
+        return results
+
+    def _prepare_submission(self) -> Optional[str]:
+        """Resolve tasks, save the workflow and gather job metadata; returns the workflow path"""
+        self._load_parameter_table()
+        self._plan_sweep()
+        
+        workflow_path = self._save_workflow()
+        if not workflow_path:
+            return None
+        
+        self._find_preferred_workers()
+        self._compute_workflow_hash()
+        return workflow_path
+
+    def _finish_submission(self, job_id: str) -> Tuple[bool, str]:
+        """Schedule follow-up work for a submitted job and return the submission result"""
+        if not job_id:
+            return False, "Job submitted but no JobID returned"
+        
+        if self.preferred_workers and self.job_config.get('model_locality') == "prefer":
+            ModelLocality.release_whitelist_later(job_id, NodeDefaults.MODEL_LOCALITY_GRACE)
+        return True, job_id
+
+    def _find_preferred_workers(self):
+        """Look up workers that already have the workflow's models, if model locality is enabled"""
+        config = self.job_config
+        if config.get('model_locality', NodeDefaults.MODEL_LOCALITY) == "off" or not config.get('model_locality_directory'):
+            return
+        
+        try:
+            self.preferred_workers = ModelLocality.find_preferred_workers(
+                self.workflow_data, config['model_locality_directory'].strip()
+            )
+        except Exception as e:
+            print(f"Deadline Submission: Warning - Model locality lookup failed: {e}")
+            self.preferred_workers = []
+
+    def _load_parameter_table(self):
+        """Load the parameter table, if any; its row count sets the number of tasks"""
+        table = self.job_config.get('parameter_table')
+        if not table:
+            return
+        
+        params = import_plugin_module("comfyui_params")
+        if isinstance(table, str):
+            table = params.ParameterTable.load(table.strip())
+        table.validate(self.workflow_data)
+        
+        self.parameter_table = table
+        self.job_config['batch_count'] = table.rows
+        print(f"Deadline Submission: Parameter table with {table.rows} row(s) over "
+              f"{', '.join(f'{node_id}.{input_name}' for node_id, input_name in table.sites)}")
+
+    def _plan_sweep(self):
+        """Create one task per combination of the workflow's sweep node values"""
+        sweeps = import_plugin_module("comfyui_sweeps")
+        plan = sweeps.plan_sweep(self.workflow_data)
+        if not plan.axes:
+            return
+        if self.parameter_table is not None:
+            raise Exception("Sweep nodes and a parameter table cannot be combined; put the sweep into the table")
+        
+        for axis, length, node_ids in plan.axes:
+            print(f"Deadline Submission: Sweep axis '{axis}': {length} value(s) on node(s) {', '.join(node_ids)}")
+        print(f"Deadline Submission: Sweep covers {plan.total} task(s)")
+        self.job_config['batch_count'] = plan.total
+
+    def _compute_workflow_hash(self):
+        """Record the workflow's canonical hash so identical submissions can be recognized"""
+        try:
+            self.workflow_hash = WorkflowProcessor.compute_workflow_hash(self.workflow_data)
+            print(f"Deadline Submission: Workflow hash {self.workflow_hash}")
+        except Exception as e:
+            print(f"Deadline Submission: Warning - Could not hash workflow: {e}")
+            self.workflow_hash = ""
+
     def _save_workflow(self) -> Optional[str]:
         """Save the workflow to a temporary file"""
         return WorkflowProcessor.save_workflow_file(self.workflow_data)
@@ -280,11 +583,11 @@ class DeadlineJobSubmitter:
         submission_temp_dir = tempfile.mkdtemp(prefix="comfy_deadline_job_")
         
         try:
-            job_info_file, plugin_info_file, workflow_copy = self._create_submission_files(
+            job_info_file, plugin_info_file, aux_files = self._create_submission_files(
                 submission_temp_dir, workflow_path
             )
             
-            command_args = [job_info_file, plugin_info_file, workflow_copy]
+            command_args = [job_info_file, plugin_info_file] + aux_files
             result = DeadlineCommandHelper.call_deadline_command(command_args)
             
             job_id = DeadlineCommandHelper.get_job_id_from_submission(result)
@@ -299,8 +602,8 @@ class DeadlineJobSubmitter:
             print(f"Deadline Submission: Error during submission: {e}")
             raise
 
-    def _create_submission_files(self, temp_dir: str, workflow_path: str) -> Tuple[str, str, str]:
-        """Create job info and plugin info files for submission"""
+    def _create_submission_files(self, temp_dir: str, workflow_path: str) -> Tuple[str, str, List[str]]:
+        """Create job info and plugin info files for submission, returning them with the auxiliary files"""
         job_info_file = os.path.join(temp_dir, "job_info.txt")
         plugin_info_file = os.path.join(temp_dir, "plugin_info.txt")
         
@@ -312,10 +615,16 @@ class DeadlineJobSubmitter:
         except Exception:
             workflow_copy = workflow_path
 
+        aux_files = [workflow_copy]
+        if self.parameter_table is not None:
+            table_file = os.path.join(temp_dir, NodeDefaults.PARAMETER_TABLE_FILE)
+            self.parameter_table.save(table_file)
+            aux_files.append(table_file)
+
         self._create_job_info_file(job_info_file)
         self._create_plugin_info_file(plugin_info_file)
         
-        return job_info_file, plugin_info_file, workflow_copy
+        return job_info_file, plugin_info_file, aux_files
 
     def _create_job_info_file(self, job_info_file: str):
         """Create the job info file"""
@@ -342,6 +651,21 @@ class DeadlineJobSubmitter:
             if config.get('output_directory'):
                 abs_output_dir = os.path.abspath(config['output_directory'].strip())
                 f.write(f"OutputDirectory0={abs_output_dir}\n")
+            
+            extra_info = []
+            if self.workflow_hash:
+                extra_info.append(f"WorkflowHash={self.workflow_hash}")
+            
+            # Restrict to workers that have the models; "prefer" lifts this after a grace period
+            if self.preferred_workers:
+                f.write(f"Whitelist={','.join(self.preferred_workers)}\n")
+                extra_info.append(f"ModelLocalityWorkers={','.join(self.preferred_workers)}")
+                if config.get('model_locality') == "prefer":
+                    # Lets the plugin lift the whitelist if the submitter's release timer never fires
+                    extra_info.append(f"ModelLocalityReleaseAt={int(time.time() + NodeDefaults.MODEL_LOCALITY_GRACE)}")
+            
+            for index, key_value in enumerate(extra_info):
+                f.write(f"ExtraInfoKeyValue{index}={key_value}\n")
 
     def _create_plugin_info_file(self, plugin_info_file: str):
         """Create the plugin info file"""
@@ -359,6 +683,21 @@ class DeadlineJobSubmitter:
             
             if config['batch_count'] > 1:
                 f.write("BatchMode=True\n")
+            
+            if config.get('persistent_process'):
+                f.write("PersistentProcess=True\n")
+            
+            if config.get('batch_latent_fold'):
+                f.write("BatchLatentFold=True\n")
+            
+            if config.get('model_locality_directory'):
+                f.write(f"ModelLocalityDirectory={config['model_locality_directory'].strip()}\n")
+            
+            if config.get('result_cache_directory'):
+                f.write(f"ResultCacheDirectory={config['result_cache_directory'].strip()}\n")
+            
+            if self.parameter_table is not None:
+                f.write(f"ParameterTable={NodeDefaults.PARAMETER_TABLE_FILE}\n")
 
 class ExecutionInterruptor:
     """Handles interrupting local ComfyUI execution"""
@@ -478,6 +817,127 @@ class DeadlineSeed:
             print(f"Deadline Seed: Task {task_id} using modified seed {new_seed} (original: {seed})")
             return (new_seed,)
 
+class AnyType(str):
+    """Type name that ComfyUI accepts for any input, so combo sweeps can feed combo widgets"""
+    
+    def __ne__(self, other):
+        return False
+
+ANY_TYPE = AnyType("*")
+
+class DeadlineSweepBase:
+    """
+    Varies a value across Deadline tasks.
+    Sweep nodes on the same axis advance together; different axes form every combination.
+    The submitter creates one task per combination and injects each node's position on its axis.
+    """
+    
+    FUNCTION = "sweep"
+    CATEGORY = "deadline"
+    
+    @staticmethod
+    def _axis_input():
+        return ("STRING", {
+            "default": "",
+            "multiline": False,
+            "placeholder": "(Optional) Axis name - sweeps with the same name are zipped"
+        })
+    
+    @staticmethod
+    def _hidden_inputs():
+        return {"sweep_index": ("INT", {"default": 0})}
+    
+    def sweep(self, sweep_index=0, **settings):
+        """
+        Return the value for this task.
+        
+        Args:
+            sweep_index: Position on this node's axis (injected by Deadline; 0 when run locally)
+            settings: The node's widget values
+        """
+        sweeps = import_plugin_module("comfyui_sweeps")
+        values = sweeps.sweep_values(type(self).__name__, settings)
+        try:
+            sweep_index = int(sweep_index)
+        except (ValueError, TypeError):
+            sweep_index = 0
+        
+        value = values[sweep_index % len(values)]
+        print(f"Deadline Sweep: {type(self).__name__} using value {sweep_index + 1}/{len(values)}: {value!r}")
+        return (value,)
+
+class DeadlineSweepInt(DeadlineSweepBase):
+    """Sweeps an integer over a range (start to stop inclusive) or a list"""
+    
+    @classmethod
+    def INPUT_TYPES(cls):
+        return {
+            "required": {
+                "mode": (NodeDefaults.SWEEP_MODES, {"default": "range"}),
+                "start": ("INT", {"default": 0, "min": -0xffffffffffffffff, "max": 0xffffffffffffffff}),
+                "stop": ("INT", {"default": 0, "min": -0xffffffffffffffff, "max": 0xffffffffffffffff}),
+                "step": ("INT", {"default": 1, "min": -0xffffffffffffffff, "max": 0xffffffffffffffff}),
+                "values": ("STRING", {"default": "", "multiline": True, "placeholder": "List mode: 10, 20, 30"}),
+                "axis": cls._axis_input(),
+            },
+            "hidden": cls._hidden_inputs(),
+        }
+    
+    RETURN_TYPES = ("INT",)
+    RETURN_NAMES = ("value",)
+
+class DeadlineSweepFloat(DeadlineSweepBase):
+    """Sweeps a float over a range (start to stop inclusive) or a list"""
+    
+    @classmethod
+    def INPUT_TYPES(cls):
+        return {
+            "required": {
+                "mode": (NodeDefaults.SWEEP_MODES, {"default": "range"}),
+                "start": ("FLOAT", {"default": 1.0, "min": -1e9, "max": 1e9, "step": 0.01}),
+                "stop": ("FLOAT", {"default": 1.0, "min": -1e9, "max": 1e9, "step": 0.01}),
+                "step": ("FLOAT", {"default": 0.5, "min": -1e9, "max": 1e9, "step": 0.01}),
+                "values": ("STRING", {"default": "", "multiline": True, "placeholder": "List mode: 4.5, 6.0, 7.5"}),
+                "axis": cls._axis_input(),
+            },
+            "hidden": cls._hidden_inputs(),
+        }
+    
+    RETURN_TYPES = ("FLOAT",)
+    RETURN_NAMES = ("value",)
+
+class DeadlineSweepString(DeadlineSweepBase):
+    """Sweeps a string over a list, one value per line"""
+    
+    @classmethod
+    def INPUT_TYPES(cls):
+        return {
+            "required": {
+                "values": ("STRING", {"default": "", "multiline": True, "placeholder": "One value per line"}),
+                "axis": cls._axis_input(),
+            },
+            "hidden": cls._hidden_inputs(),
+        }
+    
+    RETURN_TYPES = ("STRING",)
+    RETURN_NAMES = ("value",)
+
+class DeadlineSweepCombo(DeadlineSweepBase):
+    """Sweeps a combo input (sampler, scheduler, LoRA name, ...) over a list, one option per line"""
+    
+    @classmethod
+    def INPUT_TYPES(cls):
+        return {
+            "required": {
+                "values": ("STRING", {"default": "", "multiline": True, "placeholder": "One option per line"}),
+                "axis": cls._axis_input(),
+            },
+            "hidden": cls._hidden_inputs(),
+        }
+    
+    RETURN_TYPES = (ANY_TYPE,)
+    RETURN_NAMES = ("value",)
+
 # Node implementation
 class DeadlineSubmitNode:
     """Submit the current ComfyUI workflow to Thinkbox Deadline"""
@@ -535,6 +995,32 @@ class DeadlineSubmitNode:
                 }),
                 "comment": ("STRING", {"default": ""}),
                 "department": ("STRING", {"default": ""}),
+                "persistent_process": ("BOOLEAN", {
+                    "default": False,
+                    "label_on": "Keep ComfyUI running between tasks",
+                    "label_off": "Restart ComfyUI for every task"
+                }),
+                "batch_latent_fold": ("BOOLEAN", {
+                    "default": False,
+                    "label_on": "Render chunk as one latent batch",
+                    "label_off": "Render chunk as separate prompts"
+                }),
+                "model_locality": (NodeDefaults.MODEL_LOCALITY_MODES, {"default": NodeDefaults.MODEL_LOCALITY}),
+                "model_locality_directory": ("STRING", {
+                    "default": "",
+                    "multiline": False,
+                    "placeholder": "(Optional) Shared directory where workers publish their local models"
+                }),
+                "result_cache_directory": ("STRING", {
+                    "default": "",
+                    "multiline": False,
+                    "placeholder": "(Optional) Shared directory of cached outputs to reuse for identical tasks"
+                }),
+                "parameter_table": ("STRING", {
+                    "default": "",
+                    "multiline": False,
+                    "placeholder": "(Optional) CSV/JSON table of per-task input values; overrides batch_count"
+                }),
 
             },
             "hidden": {
@@ -556,30 +1042,29 @@ class DeadlineSubmitNode:
 
     @classmethod
     def _get_deadline_pools(cls) -> List[str]:
-        """Get available Deadline pools"""
-        try:
-            result = DeadlineCommandHelper.call_deadline_command(["-pools"], hide_window=True)
-            pools = [line.strip() for line in result.splitlines() if line.strip()]
-            return pools if pools else [NodeDefaults.POOL]
-        except Exception as e:
-            print(f"Deadline Submission: Error getting Deadline pools: {e}")
-            return [NodeDefaults.POOL]
+        """Get available Deadline pools (last known list; refreshed in the background)"""
+        return FarmInfoCache.get("pools", lambda: cls._query_deadline_list("-pools", NodeDefaults.POOL),
+                                 [NodeDefaults.POOL], FARM_LIST_TTL)
 
     @classmethod
     def _get_deadline_groups(cls) -> List[str]:
-        """Get available Deadline groups"""
-        try:
-            result = DeadlineCommandHelper.call_deadline_command(["-groups"], hide_window=True)
-            groups = [line.strip() for line in result.splitlines() if line.strip()]
-            return groups if groups else [NodeDefaults.GROUP]
-        except Exception as e:
-            print(f"Deadline Submission: Error getting Deadline groups: {e}")
-            return [NodeDefaults.GROUP]
+        """Get available Deadline groups (last known list; refreshed in the background)"""
+        return FarmInfoCache.get("groups", lambda: cls._query_deadline_list("-groups", NodeDefaults.GROUP),
+                                 [NodeDefaults.GROUP], FARM_LIST_TTL)
+
+    @staticmethod
+    def _query_deadline_list(argument: str, default: str) -> List[str]:
+        """Run a deadlinecommand listing query, one item per line"""
+        result = DeadlineCommandHelper.call_deadline_command([argument], hide_window=True)
+        items = [line.strip() for line in result.splitlines() if line.strip()]
+        return items if items else [default]
 
     def submit_to_deadline(self, workflow_file, auto_detect_workflow, batch_count, chunk_size, 
                          priority, pool, group, job_name, bypass, 
                          skip_local_execution=True, output_directory="", comment="", department="", 
-                         prompt=None, extra_pnginfo=None):
+                         persistent_process=False, batch_latent_fold=False,
+                         model_locality=NodeDefaults.MODEL_LOCALITY, model_locality_directory="",
+                         result_cache_directory="", parameter_table="", prompt=None, extra_pnginfo=None):
         """Submit the workflow to Deadline for rendering"""
         if bypass:
             print("Deadline Submission: Bypass enabled. Submission skipped.")
@@ -597,7 +1082,8 @@ class DeadlineSubmitNode:
             # Create job configuration
             job_config = self._create_job_config(
                 job_name, priority, pool, group, batch_count, chunk_size,
-                output_directory, comment, department
+                output_directory, comment, department, persistent_process, batch_latent_fold,
+                model_locality, model_locality_directory, result_cache_directory, parameter_table
             )
             
             # Submit to Deadline
@@ -640,7 +1126,10 @@ class DeadlineSubmitNode:
 
     def _create_job_config(self, job_name: str, priority: int, pool: str, group: str, 
                           batch_count: int, chunk_size: int,
-                          output_directory: str, comment: str, department: str) -> Dict:
+                          output_directory: str, comment: str, department: str,
+                          persistent_process: bool = False, batch_latent_fold: bool = False,
+                          model_locality: str = NodeDefaults.MODEL_LOCALITY, model_locality_directory: str = "",
+                          result_cache_directory: str = "", parameter_table: str = "") -> Dict:
         """Create job configuration dictionary"""
         return {
             'job_name': job_name,
@@ -651,17 +1140,31 @@ class DeadlineSubmitNode:
             'chunk_size': chunk_size,
             'output_directory': output_directory,
             'comment': comment,
-            'department': department
+            'department': department,
+            'persistent_process': persistent_process,
+            'batch_latent_fold': batch_latent_fold,
+            'model_locality': model_locality,
+            'model_locality_directory': model_locality_directory,
+            'result_cache_directory': result_cache_directory,
+            'parameter_table': parameter_table
         }
 
 # Register the nodes
 NODE_CLASS_MAPPINGS = {
     "DeadlineSubmit": DeadlineSubmitNode,
     "DeadlineSeed": DeadlineSeed,
+    "DeadlineSweepInt": DeadlineSweepInt,
+    "DeadlineSweepFloat": DeadlineSweepFloat,
+    "DeadlineSweepString": DeadlineSweepString,
+    "DeadlineSweepCombo": DeadlineSweepCombo,
 }
 
 # Add display names for the nodes
 NODE_DISPLAY_NAME_MAPPINGS = {
     "DeadlineSubmit": "Submit to Deadline",
     "DeadlineSeed": "Deadline Seed",
+    "DeadlineSweepInt": "Deadline Sweep (Int)",
+    "DeadlineSweepFloat": "Deadline Sweep (Float)",
+    "DeadlineSweepString": "Deadline Sweep (String)",
+    "DeadlineSweepCombo": "Deadline Sweep (Combo)",
 } 
\ No newline at end of file
@@ -1,7 +1,7 @@
 from __future__ import absolute_import
-from Deadline.Plugins import DeadlinePlugin, PluginType
+from Deadline.Plugins import DeadlinePlugin, PluginType, ManagedProcess
 from System.Diagnostics import ProcessPriorityClass
-from Deadline.Scripting import RepositoryUtils, SystemUtils, FileUtils
+from Deadline.Scripting import RepositoryUtils, SystemUtils, FileUtils, ClientUtils
 import os
 import re 
 import sys
@@ -9,14 +9,31 @@ import json
 import time
 import socket
 import threading
-import urllib.request
-import urllib.error
 import urllib.parse
 import traceback
 import random
 import platform
+import uuid
 from typing import Tuple
 
+# Helper modules shipped alongside this plugin
+PLUGIN_DIRECTORY = os.path.dirname(os.path.abspath(__file__))
+if PLUGIN_DIRECTORY not in sys.path:
+    sys.path.append(PLUGIN_DIRECTORY)
+
+from comfyui_events import ComfyUIEventListener
+from comfyui_http import ComfyUIHttpPool
+from comfyui_outputs import OutputFileWatcher, output_files_from_outputs
+from comfyui_prompts import PromptPatchPlan, plan_latent_fold, fold_latent_batch, order_prompts_for_cache
+from comfyui_ports import PortLeaseRegistry
+from comfyui_models import ModelPrefetcher, ModelSearchPaths, find_model_references
+from comfyui_model_cache import ModelCache
+from comfyui_locality import model_key, publish_worker_models
+from comfyui_results import ResultCache, model_fingerprints, result_cache_key
+from comfyui_workflow import normalize_workflow, workflow_hash
+from comfyui_params import ParameterTable
+from comfyui_sweeps import plan_sweep
+
 """
 ComfyUI Deadline Plugin
 by Dominik Bargiel dominikbargiel97@gmail.com
@@ -34,7 +51,21 @@ DEFAULT_TIMEOUT = 6000  # 100 minutes
 DEFAULT_POLLING_INTERVAL = 10  # seconds
 MAX_SEED_VALUE = 2147483647
 PROGRESS_LOG_INTERVAL = 10  # Log every 10 polls
-FILE_WRITE_DELAY = 2  # seconds to wait for files to be written
+OUTPUT_WAIT_TIMEOUT = 60  # max seconds to wait for reported output files to finish writing
+OUTPUT_FALLBACK_DELAY = 2  # seconds to wait for output files when ComfyUI did not report them
+WEBSOCKET_EVENT_WAIT = 1.0  # seconds to block waiting for a websocket event
+HTTP_POOL_SIZE = 4  # keep-alive connections per ComfyUI instance
+HTTP_REQUEST_TIMEOUT = 30  # seconds
+MANAGED_PROCESS_NAME = "ComfyUI"
+SERVER_START_TIMEOUT = 300  # seconds to wait for the ComfyUI API to become ready
+READINESS_INITIAL_DELAY = 0.05  # seconds before the second readiness probe
+READINESS_MAX_DELAY = 1.0  # cap for the exponential readiness backoff
+READINESS_CONNECT_TIMEOUT = 0.5  # seconds for the TCP part of a readiness probe
+HEALTH_CHECK_TIMEOUT = 5  # seconds
+MODEL_PREFETCH_TIMEOUT = 1800  # max seconds to hold the first prompt while models are staged
+
+# Messages that indicate ComfyUI ran out of GPU memory and should be restarted
+OUT_OF_MEMORY_PATTERN = r".*(CUDA out of memory|OutOfMemoryError|Allocation on device).*"
 
 # Seed parameter names to search for in workflows
 SEED_PARAMETER_NAMES = ["seed", "noise_seed", "value"]
@@ -42,6 +73,11 @@ SEED_PARAMETER_NAMES = ["seed", "noise_seed", "value"]
 # Output node types that indicate the workflow will produce output
 OUTPUT_NODE_TYPES = ["SaveImage", "PreviewImage", "SaveVideo"]
 
+# TaskID -> Task index for the job this worker is rendering, shared by all plugin
+# instances in the worker process so the task collection is fetched at most once
+TASK_INDEX_CACHE = {}
+TASK_INDEX_LOCK = threading.Lock()
+
 def get_distributed_config_for_plugin(plugin) -> Tuple[bool, bool, bool]:
     """Get distributed configuration with plugin info priority, fallback to environment"""
     # Priority 1: Plugin info entries (preferred)
@@ -89,13 +125,15 @@ class ComfyUI(DeadlinePlugin):
         self.RenderArgumentCallback += self.RenderArgument
         self.PreRenderTasksCallback += self.PreRenderTasks
         self.PostRenderTasksCallback += self.PostRenderTasks
+        
+        # Advanced plugin callbacks (only used in persistent process mode)
+        self.StartJobCallback += self.StartJob
+        self.RenderTasksCallback += self.RenderTasks
+        self.EndJobCallback += self.EndJob
 
     def _setup_stdout_handlers(self):
         """Setup stdout handlers for ComfyUI output parsing"""
-        # Server startup handlers
-        self.AddStdoutHandlerCallback(".*Starting server.*").HandleCallback += self.HandleServerStarted
-        # Also catch the GUI message as backup
-        self.AddStdoutHandlerCallback(".*To see the GUI go to.*").HandleCallback += self.HandleServerStarted
+        # Server readiness is detected by probing the API, see _wait_for_server_ready
         self.AddStdoutHandlerCallback(".*Error:.*").HandleCallback += self.HandleStdoutError
         self.AddStdoutHandlerCallback(".*Exception:.*").HandleCallback += self.HandleStdoutError
 
@@ -119,20 +157,62 @@ class ComfyUI(DeadlinePlugin):
         self.progress_value = 0
         self.thread_running = True
         self.custom_output_dir_specified = False
+        self.process_spawn_time = None
+        self.time_to_ready = None
+        self.repository_calls = 0
+        
+        # Persistent process variables
+        self.persistent_process = False
+        self.managed_process_started = False
+        self.process_restart_requested = False
+        self.use_existing_comfyui = False
         
         # Batch processing variables
         self.chunk_size = 1
+        self.prompt_count = 1
+        self.folded_batch = False
         self.prompts_executed = 0
         self.batch_mode = False
         
         # Prompt tracking variables
         self.prompt_ids = []
+        self.prompt_chunk_indices = {}  # prompt ID -> index within the chunk (prompts may be queued out of order)
         self.completed_prompts = set()
         self.current_tracking_index = 0
+        
+        # Websocket event tracking variables
+        self.event_listener = None
+        self.prompt_outputs = {}
+        self.verified_output_files = set()
+        
+        # Keep-alive HTTP connection pool (created on first request)
+        self.http_pool = None
+        self.http_pool_lock = threading.Lock()
+        
+        # Host-wide port lease held while this worker thread runs ComfyUI
+        self.port_registry = None
+        self.leased_port = None
+        
+        # Background staging of the workflow's models to local disk
+        self.model_prefetcher = None
+        self.model_cache = None
+        self.model_pin_owner = None
+        
+        # Outputs of identical tasks reused from the shared result cache
+        self.result_cache_key = None
+        self.result_cache_hit = False
+        
+        # Per-task input values shipped with the job (loaded once per job)
+        self.parameter_table = None
+        self.parameter_table_path = None
 
     def Cleanup(self):
         """Clean up plugin resources"""
         self.thread_running = False
+        self._stop_event_listener()
+        self._close_http_pool()
+        self._release_port()
+        self._release_model_pins()
         
         # Clean up callbacks
         del self.InitializeProcessCallback
@@ -140,6 +220,9 @@ class ComfyUI(DeadlinePlugin):
         del self.RenderArgumentCallback
         del self.PreRenderTasksCallback
         del self.PostRenderTasksCallback
+        del self.StartJobCallback
+        del self.RenderTasksCallback
+        del self.EndJobCallback
 
         # Clean up stdout handlers
         for stdoutHandler in self.StdoutHandlers:
@@ -148,6 +231,14 @@ class ComfyUI(DeadlinePlugin):
     def InitializeProcess(self):
         """Initialize process settings"""
         self.SingleFramesOnly = True
+        self.persistent_process = self.GetBooleanPluginInfoEntryWithDefault("PersistentProcess", False)
+        
+        if self.persistent_process:
+            # ComfyUI runs as a managed process that lives for the whole job
+            self.LogInfo("Persistent process mode: ComfyUI will be kept running across tasks")
+            self.PluginType = PluginType.Advanced
+            return
+        
         self.PluginType = PluginType.Simple 
         self.ProcessPriority = ProcessPriorityClass.BelowNormal
         self.UseProcessTree = True
@@ -214,12 +305,16 @@ class ComfyUI(DeadlinePlugin):
         """Setup batch processing configuration"""
         self.batch_mode = self.GetBooleanPluginInfoEntryWithDefault("BatchMode", False)
         if self.batch_mode:
-            self.chunk_size = int(self.GetJob().ChunkSize)
+            # The last task of a job can hold fewer frames than the job's chunk size
+            task_frames = int(self.GetEndFrame()) - int(self.GetStartFrame()) + 1
+            self.chunk_size = max(1, min(int(self.GetJob().ChunkSize), task_frames))
             self.LogInfo(f"Batch mode enabled. Chunk size: {self.chunk_size}")
         else:
             self.chunk_size = 1
             self.LogInfo("Batch mode disabled. Processing single task.")
         
+        self.prompt_count = self.chunk_size
+        self.folded_batch = False
         self.prompts_executed = 0
 
     def _setup_output_directory(self):
@@ -251,14 +346,29 @@ class ComfyUI(DeadlinePlugin):
             self.LogInfo(f"Using configured default output directory: {self.comfyui_output_dir}")
         else:
             # Fall back to ComfyUI's standard output directory
-            comfyui_path = self.GetConfigEntry("ComfyUIPath")
-            self.comfyui_output_dir = os.path.join(comfyui_path, "ComfyUI", "output")
+            self.comfyui_output_dir = self._comfyui_default_output_dir()
             self.custom_output_dir_specified = False
             self.LogInfo(f"Using ComfyUI's default output directory: {self.comfyui_output_dir}")
         
         if not os.path.exists(self.comfyui_output_dir):
             self._create_directory(self.comfyui_output_dir, "default output")
 
+    def _comfyui_default_output_dir(self) -> str:
+        """The output directory ComfyUI uses when started without --output-directory"""
+        return os.path.abspath(os.path.join(self.GetConfigEntry("ComfyUIPath"), "ComfyUI", "output"))
+
+    def _passes_output_directory(self) -> bool:
+        """Whether ComfyUI must be told where to write, because the task's output directory is not its default"""
+        if not self.comfyui_output_dir:
+            return False
+        if self.custom_output_dir_specified:
+            return True
+        return os.path.normcase(self.comfyui_output_dir) != os.path.normcase(self._comfyui_default_output_dir())
+
+    def _output_directory_known(self) -> bool:
+        """Whether ComfyUI writes to comfyui_output_dir; an instance this task did not start uses its own"""
+        return not self.use_existing_comfyui
+
     def _create_directory(self, directory_path: str, description: str):
         """Create a directory with error handling"""
         try:
@@ -300,10 +410,10 @@ class ComfyUI(DeadlinePlugin):
             # For workers, use dynamic port allocation to avoid conflicts
             if worker_mode or distributed_mode:
                 worker_port = self._calculate_worker_port(base_port)
-                self.comfyui_port = self._find_available_port(worker_port)
+                self.comfyui_port = self._allocate_port(worker_port)
                 self.LogInfo(f"Worker mode: Using port {self.comfyui_port}")
             else:
-                self.comfyui_port = self._find_available_port(base_port)
+                self.comfyui_port = self._allocate_port(base_port)
                 self.LogInfo(f"Force new instance: Using port {self.comfyui_port}")
                 
             self.comfyui_api_url = f"http://127.0.0.1:{self.comfyui_port}"
@@ -314,6 +424,7 @@ class ComfyUI(DeadlinePlugin):
         
         if self._is_port_in_use(base_port):
             self.LogInfo(f"ComfyUI is already running on port {base_port}, will use existing instance")
+            self.LogInfo("The existing instance writes to its own output directory; output files will not be verified")
             self.use_existing_comfyui = True
             self.comfyui_port = str(base_port)
             self.comfyui_api_url = f"http://127.0.0.1:{self.comfyui_port}"
@@ -321,30 +432,21 @@ class ComfyUI(DeadlinePlugin):
         else:
             self.LogInfo(f"No ComfyUI instance detected on port {base_port}")
             self.use_existing_comfyui = False
-            self.comfyui_port = self._find_available_port(base_port)
+            self.comfyui_port = self._allocate_port(base_port)
             self.LogInfo(f"Will use port {self.comfyui_port} for ComfyUI")
             self.comfyui_api_url = f"http://127.0.0.1:{self.comfyui_port}"
         
         return self.comfyui_port
 
     def _calculate_worker_port(self, base_port: int) -> int:
-        """Calculate unique worker port based on task ID to avoid conflicts"""
-        try:
-            # Get task ID from Deadline environment
-            task_id = int(os.environ.get('DEADLINE_TASK_ID', '1'))
-            
-            # Calculate unique worker port: base_port + 100 + task_id
-            # This ensures workers get ports like 8289, 8290, 8291, etc.
-            # For single PC testing, this allows multiple workers on one GPU
-            worker_port = base_port + 100 + task_id
-            
-            self.LogInfo(f"Calculated worker port: {worker_port} (base: {base_port}, task: {task_id})")
-            return worker_port
-        except ValueError:
-            # Fallback if task ID is not a valid integer
-            fallback_port = base_port + 100
-            self.LogInfo(f"Could not parse task ID, using fallback port: {fallback_port}")
-            return fallback_port
+        """Calculate the preferred worker port based on the worker thread"""
+        # Concurrent tasks on one machine run on different threads, so base_port + 100 + thread
+        # is normally free on the first try; the lease registry resolves any remaining clashes
+        thread_number = self.GetThreadNumber()
+        worker_port = base_port + 100 + thread_number
+        
+        self.LogInfo(f"Calculated worker port: {worker_port} (base: {base_port}, thread: {thread_number})")
+        return worker_port
 
     def PreRenderTasks(self):
         """Setup tasks before rendering"""
@@ -354,13 +456,237 @@ class ComfyUI(DeadlinePlugin):
             self._setup_batch_processing()
             self._setup_output_directory()
             self._setup_temp_directory()
-            self._calculate_comfyui_port()
             self.task_completed = False
+            self._release_model_locality_preference()
+            # The port check decides whether an existing instance (with its own output directory) is used
+            self._calculate_comfyui_port()
+            if not self._check_result_cache():
+                self._start_model_prefetch()
             self.LogInfo("PreRenderTasks completed successfully.")
         except Exception as e:
             self.LogWarning(f"Error in PreRenderTasks: {e}")
             raise ComfyUIError(f"PreRenderTasks failed: {str(e)}")
 
+    def _release_model_locality_preference(self):
+        """Lift a "prefer" model locality whitelist whose grace period is over, in case the submitter could not"""
+        try:
+            job = self.GetJob()
+            release_at = job.GetJobExtraInfoKeyValueWithDefault("ModelLocalityReleaseAt", "")
+            if not release_at or not job.JobWhitelistFlag or time.time() < float(release_at):
+                return
+            
+            ClientUtils.ExecuteCommand(["-SetJobMachineLimit", job.JobId, "0", "", "false"])
+            self.LogInfo("Model locality: grace period over, any worker may now render this job")
+        except Exception as e:
+            self.LogWarning(f"Model locality: could not release worker preference: {e}")
+
+    def _start_model_prefetch(self):
+        """Start copying models referenced by the workflow to local disk while ComfyUI starts"""
+        self.model_prefetcher = None
+        if not self.GetBooleanConfigEntryWithDefault("ModelPrefetch", False):
+            return
+        
+        try:
+            workflow_data = normalize_workflow(self._load_workflow_from_file(self._get_workflow_file_path()))
+            
+            references = find_model_references(workflow_data)
+            if not references:
+                self.LogInfo("Model prefetch: workflow references no model files")
+                return
+            
+            comfyui_dir = os.path.join(self.GetConfigEntry("ComfyUIPath"), "ComfyUI")
+            search_paths = ModelSearchPaths.from_comfyui(comfyui_dir)
+            self.model_cache = self._get_model_cache()
+            streams = int(self.GetConfigEntryWithDefault("ModelTransferStreams", "4") or 4)
+            prefetcher = ModelPrefetcher(search_paths, self.LogInfo, self.LogWarning,
+                                         cache=self.model_cache, streams=streams)
+            transfers = prefetcher.plan(references)
+            self.LogInfo(f"Model prefetch: {len(references)} model(s) referenced, {len(transfers)} to stage locally")
+            
+            if self.model_cache is not None:
+                # Keep this task's models from being evicted by other tasks on the machine
+                self.model_pin_owner = f"{self.GetJob().JobId}_{self.GetThreadNumber()}"
+                self.model_cache.pin(self.model_pin_owner, prefetcher.targets)
+            
+            if prefetcher.start(transfers):
+                self.model_prefetcher = prefetcher
+        except Exception as e:
+            # Prefetching is an optimization; ComfyUI can still load from the network path
+            self.LogWarning(f"Model prefetch skipped: {e}")
+
+    def _get_model_cache(self):
+        """Create the local model cache if a cache root is configured"""
+        cache_root = self.GetConfigEntryWithDefault("ModelCacheRoot", "").strip()
+        if not cache_root:
+            return None
+        
+        budget_gb = float(self.GetConfigEntryWithDefault("ModelCacheBudgetGB", "0") or 0)
+        cache = ModelCache(cache_root, int(budget_gb * 1024 ** 3), self.LogInfo, self.LogWarning)
+        budget_text = f"{budget_gb:g} GB" if budget_gb else "unlimited"
+        self.LogInfo(f"Model cache: {cache.root} ({cache.usage() / 1024 ** 3:.1f} GB used, budget {budget_text})")
+        return cache
+
+    def _release_model_pins(self):
+        """Allow the models used by this task to be evicted again"""
+        if self.model_cache is not None and self.model_pin_owner:
+            self.model_cache.unpin(self.model_pin_owner)
+        self.model_cache = None
+        self.model_pin_owner = None
+
+    def _get_model_locality_directory(self) -> str:
+        """Shared directory where workers publish their local models, if configured"""
+        directory = self.GetPluginInfoEntryWithDefault("ModelLocalityDirectory", "").strip()
+        if not directory:
+            directory = self.GetConfigEntryWithDefault("ModelLocalityDirectory", "").strip()
+        return RepositoryUtils.CheckPathMapping(directory) if directory else ""
+
+    def _publish_model_locality(self, workflow_data):
+        """Publish which of the workflow's models are on this worker's local disk and loaded in ComfyUI"""
+        directory = self._get_model_locality_directory()
+        if not directory:
+            return
+        
+        try:
+            cached = {}
+            loaded = []
+            if workflow_data:
+                comfyui_dir = os.path.join(self.GetConfigEntry("ComfyUIPath"), "ComfyUI")
+                search_paths = ModelSearchPaths.from_comfyui(comfyui_dir)
+                references = find_model_references(workflow_data)
+                for folder, filename in references:
+                    # The highest priority search path is the local one in a local-first setup
+                    local_path = os.path.join(search_paths.get(folder)[0], filename)
+                    if os.path.isfile(local_path):
+                        cached[model_key(folder, filename)] = local_path
+                
+                # Models stay loaded only if ComfyUI keeps running after the task
+                if self.persistent_process or self.use_existing_comfyui:
+                    loaded = [model_key(folder, filename) for folder, filename in references]
+            
+            publish_worker_models(directory, self.GetSlaveName(), cached, loaded)
+            self.LogInfo(f"Published model locality: {len(cached)} local, {len(loaded)} loaded")
+        except Exception as e:
+            self.LogWarning(f"Could not publish model locality to {directory}: {e}")
+
+    def _get_result_cache(self):
+        """Shared result cache from the job's plugin info or the plugin configuration, if set"""
+        directory = self.GetPluginInfoEntryWithDefault("ResultCacheDirectory", "").strip()
+        if not directory:
+            directory = self.GetConfigEntryWithDefault("ResultCacheDirectory", "").strip()
+        if not directory:
+            return None
+        return ResultCache(RepositoryUtils.CheckPathMapping(directory))
+
+    def _check_result_cache(self) -> bool:
+        """
+        Restore the task's outputs from the result cache if an identical task was rendered before.
+        
+        Returns:
+            bool: True if the outputs were restored and ComfyUI does not need to run
+        """
+        self.result_cache_key = None
+        self.result_cache_hit = False
+        cache = self._get_result_cache()
+        if cache is None:
+            return False
+        if not self._output_directory_known():
+            self.LogInfo("Result cache: skipped, the existing ComfyUI instance writes to its own output directory")
+            return False
+        
+        try:
+            workflow_data = self.load_and_validate_workflow()
+            if not workflow_data:
+                return False
+            
+            # Randomized seeds make every render unique; caching them would only fill the store.
+            # All other seeds are derived from the task, so submit_workflow reloads the same values.
+            random_seed_reason = self._random_seed_reason(workflow_data)
+            if random_seed_reason:
+                self.LogInfo(f"Result cache: skipped, {random_seed_reason}")
+                return False
+            
+            if self.batch_mode and self.chunk_size > 1:
+                sites, prompt_values = self._build_chunk_prompt_values(workflow_data)
+            else:
+                sites, prompt_values = [], []
+            comfyui_dir = os.path.join(self.GetConfigEntry("ComfyUIPath"), "ComfyUI")
+            models = model_fingerprints(workflow_data, ModelSearchPaths.from_comfyui(comfyui_dir))
+            options = {
+                "chunk_size": self.chunk_size if self.batch_mode else 1,
+                "batch_latent_fold": self.GetBooleanPluginInfoEntryWithDefault("BatchLatentFold", False),
+            }
+            self.result_cache_key = result_cache_key(workflow_data, sites, prompt_values, models, options)
+            
+            entry = cache.lookup(self.result_cache_key)
+            if entry is None:
+                self.LogInfo(f"Result cache miss: {self.result_cache_key}")
+                return False
+            
+            restored = cache.restore(self.result_cache_key, entry, self.comfyui_output_dir)
+            for path in restored:
+                self.LogInfo(f"Restored output: {path}")
+            self.LogInfo(f"Result cache hit: {self.result_cache_key} ({len(restored)} file(s) from job {entry.get('job_id', 'unknown')})")
+            
+            self.result_cache_hit = True
+            self.task_completed = True
+            self.SetProgress(100)
+            self.SetStatusMessage("Restored from result cache")
+            return True
+        except Exception as e:
+            self.LogWarning(f"Result cache lookup failed, rendering normally: {e}")
+            self.result_cache_key = None
+            return False
+
+    def _random_seed_reason(self, workflow_data: dict) -> str:
+        """Why the task's seeds are random, or an empty string if they are derived from the task"""
+        if any(isinstance(node, dict) and node.get("class_type") == "DeadlineSeed" for node in workflow_data.values()):
+            return ""
+        
+        seed_mode = self.GetPluginInfoEntryWithDefault("SeedMode", "fixed")
+        if seed_mode == "fixed":
+            return ""
+        if seed_mode != "auto":
+            return f"SeedMode '{seed_mode}' picks random seeds"
+        
+        for node_id, node in workflow_data.items():
+            inputs = node.get("inputs", {}) if isinstance(node, dict) else {}
+            if inputs.get("control_after_generate") == "randomize" and any(name in inputs for name in SEED_PARAMETER_NAMES):
+                return f"node {node_id} randomizes its seed"
+        return ""
+
+    def _store_result_cache(self):
+        """Store the task's verified outputs under its result cache key"""
+        cache = self._get_result_cache()
+        if cache is None or not self.result_cache_key:
+            return
+        
+        files = []
+        for outputs in self.prompt_outputs.values():
+            files.extend(path for path in output_files_from_outputs(outputs, self.comfyui_output_dir)
+                         if os.path.isfile(path))
+        if not files:
+            return
+        
+        try:
+            metadata = {"job_id": self.GetJob().JobId, "task_id": self.GetCurrentTaskId()}
+            if cache.store(self.result_cache_key, files, self.comfyui_output_dir, metadata):
+                self.LogInfo(f"Stored {len(files)} output file(s) in result cache: {self.result_cache_key}")
+        except Exception as e:
+            self.LogWarning(f"Could not store outputs in result cache: {e}")
+
+    def _wait_for_model_prefetch(self):
+        """Hold the first prompt until staged models are in place so loaders read them locally"""
+        if self.model_prefetcher is None:
+            return
+        
+        start_time = time.time()
+        if self.model_prefetcher.wait(MODEL_PREFETCH_TIMEOUT):
+            self.LogInfo(f"Model prefetch finished ({len(self.model_prefetcher.staged)} staged, "
+                         f"{len(self.model_prefetcher.failed)} failed, waited {time.time() - start_time:.1f}s)")
+        else:
+            self.LogWarning(f"Model prefetch still running after {MODEL_PREFETCH_TIMEOUT}s - remaining models load from their original paths")
+        self.model_prefetcher = None
+
     def _setup_temp_directory(self):
         """Create temporary directory for job files"""
         self.temp_dir = self.CreateTempDirectory("comfyui_job")
@@ -375,27 +701,40 @@ class ComfyUI(DeadlinePlugin):
         except:
             return False
     
-    def _find_available_port(self, start_port: int) -> str:
-        """Find an available port starting from start_port"""
-        port = start_port
-        max_port = start_port + MAX_PORT_SEARCH_RANGE
-        
-        while port < max_port:
-            if not self._is_port_in_use(port):
-                return str(port)
-            port += 1
-        
-        return str(start_port)
+    def _allocate_port(self, start_port: int) -> str:
+        """Lease a free port at or after start_port from the host-wide registry"""
+        if self.port_registry is None:
+            self.port_registry = PortLeaseRegistry(log_info=self.LogInfo)
+        
+        owner = f"{self.GetSlaveName()}:{self.GetThreadNumber()}"
+        port = self.port_registry.acquire(start_port, owner, MAX_PORT_SEARCH_RANGE)
+        if port is None:
+            self.LogWarning(f"No free port found in {start_port}-{start_port + MAX_PORT_SEARCH_RANGE - 1}, using {start_port}")
+            return str(start_port)
+        
+        if self.leased_port is not None and self.leased_port != port:
+            self._release_port()
+        self.leased_port = port
+        self.LogInfo(f"Leased port {port} (lease directory: {self.port_registry.directory})")
+        return str(port)
+
+    def _release_port(self):
+        """Release the port lease so other tasks on this machine can use the port"""
+        if self.port_registry is not None and self.leased_port is not None:
+            self.port_registry.release(self.leased_port)
+            self.LogInfo(f"Released port {self.leased_port}")
+        self.leased_port = None
 
     def PostRenderTasks(self):
         """Cleanup tasks after rendering"""
         self.LogInfo("ComfyUI PostRenderTasks started.")
         
-        # Wait for files to be written
-        self.LogInfo("Waiting for files to be written to disk...")
-        time.sleep(FILE_WRITE_DELAY)
+        # Usually a no-op: outputs are verified before the task is completed
+        self._wait_for_output_files()
         
         self._log_output_directory_status()
+        self._release_port()
+        self._release_model_pins()
         self.LogInfo("PostRenderTasks finished.")
 
     def _log_output_directory_status(self):
@@ -429,6 +768,132 @@ class ComfyUI(DeadlinePlugin):
         else:
             self.LogWarning(f"Default output directory was not found: {self.comfyui_output_dir}")
 
+    def StartJob(self):
+        """Setup shared by all tasks rendered by this worker thread (persistent process mode)"""
+        self.LogInfo("ComfyUI StartJob started.")
+        
+        try:
+            self._setup_output_directory()
+            self._setup_temp_directory()
+            self._calculate_comfyui_port()
+            self.LogInfo("StartJob completed successfully.")
+        except Exception as e:
+            self.LogWarning(f"Error in StartJob: {e}")
+            raise ComfyUIError(f"StartJob failed: {str(e)}")
+
+    def RenderTasks(self):
+        """Render the current task on the persistent ComfyUI process"""
+        self.LogInfo(f"ComfyUI RenderTasks started for task {self.GetCurrentTaskId()}.")
+        
+        self._reset_task_state()
+        self._setup_batch_processing()
+        self._release_model_locality_preference()
+        if self._check_result_cache():
+            self.LogInfo("RenderTasks finished.")
+            return
+        
+        self._start_model_prefetch()
+        self._ensure_comfyui_process()
+        
+        self.submit_workflow()
+        
+        if not self.task_completed:
+            self.FailRender("ComfyUI workflow did not complete")
+        
+        self._log_output_directory_status()
+        self.LogInfo("RenderTasks finished.")
+
+    def EndJob(self):
+        """Shut down the persistent ComfyUI process"""
+        self.LogInfo("ComfyUI EndJob started.")
+        self._stop_event_listener()
+        self._shutdown_comfyui_process()
+        self._publish_model_locality(None)
+        self._close_http_pool()
+        self._release_port()
+        self._release_model_pins()
+        self.LogInfo("EndJob finished.")
+
+    def _reset_task_state(self):
+        """Reset per-task state before rendering another task on the same plugin instance"""
+        self.task_completed = False
+        self.workflow_submitted = False
+        self.thread_running = True
+        self.progress_value = 0
+        self.prompt_id = None
+        self.process_spawn_time = None
+        self._reset_prompt_tracking()
+
+    def _ensure_comfyui_process(self):
+        """Start the ComfyUI process, or reuse it if it is still healthy"""
+        if self.use_existing_comfyui:
+            self.LogInfo("Using existing ComfyUI instance - no managed process needed.")
+            return
+        
+        if self.managed_process_started:
+            if self.process_restart_requested:
+                self.LogWarning("ComfyUI ran out of GPU memory during a previous task. Restarting process.")
+                self._shutdown_comfyui_process()
+            elif self._is_comfyui_process_healthy():
+                self.LogInfo("Reusing warm ComfyUI process.")
+                return
+            else:
+                self.LogWarning("ComfyUI process is not healthy. Restarting process.")
+                self._shutdown_comfyui_process()
+        
+        self._start_comfyui_process()
+
+    def _start_comfyui_process(self):
+        """Launch ComfyUI as a managed process and wait for the server to come up"""
+        self.LogInfo("Starting persistent ComfyUI process...")
+        self.server_started = False
+        self.process_restart_requested = False
+        self.process_spawn_time = time.time()
+        self.StartMonitoredManagedProcess(MANAGED_PROCESS_NAME, ComfyUIProcess(self))
+        self.managed_process_started = True
+        
+        if not self._wait_for_server_ready():
+            self.FailRender("Persistent ComfyUI process did not become ready")
+
+    def _shutdown_comfyui_process(self):
+        """Stop the managed ComfyUI process if it was started"""
+        if not self.managed_process_started:
+            return
+        
+        try:
+            self.ShutdownMonitoredManagedProcess(MANAGED_PROCESS_NAME)
+        except Exception as e:
+            self.LogWarning(f"Error shutting down ComfyUI process: {e}")
+        self.managed_process_started = False
+
+    def _is_comfyui_process_healthy(self) -> bool:
+        """Check the managed process is alive and its API answers"""
+        if not self.MonitoredManagedProcessIsRunning(MANAGED_PROCESS_NAME):
+            self.LogWarning("ComfyUI process has exited.")
+            return False
+        
+        try:
+            response = self.http_request(f"{self.comfyui_api_url}/system_stats", verbose=False, timeout=HEALTH_CHECK_TIMEOUT)
+            return response['status_code'] == 200
+        except Exception as e:
+            self.LogWarning(f"ComfyUI health check failed: {e}")
+            return False
+
+    def _service_managed_process(self):
+        """Process pending stdout of the managed process and fail if it crashed"""
+        if not self.persistent_process or not self.managed_process_started:
+            return
+        
+        self.FlushMonitoredManagedProcessStdout(MANAGED_PROCESS_NAME)
+        if not self.MonitoredManagedProcessIsRunning(MANAGED_PROCESS_NAME):
+            self.managed_process_started = False
+            self.FailRender("ComfyUI process exited unexpectedly")
+
+    def HandleOutOfMemory(self, line: str):
+        """Flag the persistent process for restart after a GPU out-of-memory error"""
+        self.LogWarning(f"ComfyUI out of memory: {line}")
+        self.process_restart_requested = True
+
     def RenderExecutable(self):
         """Get the Python executable for ComfyUI"""
         comfyui_path = self.GetConfigEntry("ComfyUIPath")
@@ -457,21 +922,30 @@ class ComfyUI(DeadlinePlugin):
             self.FailRender(error_msg)
             return ""
         
+        # Outputs were restored from the result cache, so there is nothing to render
+        if self.result_cache_hit:
+            self.LogInfo("Outputs restored from result cache - skipping ComfyUI.")
+            return '-c "print(\'Outputs restored from result cache\')"'
+        
         # If using existing ComfyUI instance, return dummy command
         if self.use_existing_comfyui:
             return self._create_dummy_command()
         
         # Build arguments for new ComfyUI instance
-        return self._build_comfyui_arguments(comfyui_main_py)
+        args = self._build_comfyui_arguments(comfyui_main_py)
+        
+        # The process is spawned right after this returns; start probing for readiness now.
+        # In persistent process mode RenderTasks drives submission instead.
+        if not self.persistent_process:
+            self._start_workflow_submission()
+        
+        return args
 
     def _create_dummy_command(self) -> str:
         """Create dummy command for existing ComfyUI instances"""
         self.LogInfo("Using existing ComfyUI instance - returning dummy command.")
         
-        # Start workflow submission thread
-        workflow_thread = threading.Thread(target=self.submit_workflow)
-        workflow_thread.daemon = True
-        workflow_thread.start()
+        self._start_workflow_submission()
         
         dummy_script = self._get_dummy_script()
         return f'-c "{dummy_script}"'
@@ -523,8 +997,8 @@ print('Dummy command timeout reached or task completed.')
 
         args_list.append("--disable-auto-launch")
 
-        # Add output directory if custom one was specified
-        if self.custom_output_dir_specified and self.comfyui_output_dir:
+        # Add output directory unless it is ComfyUI's own default
+        if self._passes_output_directory():
             args_list.append(f'--output-directory "{self.comfyui_output_dir}"')
             self.LogInfo(f"Passing --output-directory \"{self.comfyui_output_dir}\" to ComfyUI.")
         else:
@@ -534,35 +1008,67 @@ print('Dummy command timeout reached or task completed.')
         self.LogInfo(f"Render Arguments: {args}")
         return args
 
-    def HandleServerStarted(self):
-        """Called when the ComfyUI server has started"""
-        # Prevent multiple triggers from stdout handlers
+    def _start_workflow_submission(self):
+        """Start the thread that waits for the API and submits the workflow"""
+        # Prevent submitting the workflow twice
         if self.workflow_submitted:
-            self.LogInfo("ComfyUI server startup detected, but workflow already submitted - ignoring")
+            self.LogInfo("Workflow submission already started - ignoring")
             return
+        
+        self.workflow_submitted = True
+        self.process_spawn_time = time.time()
+        self.LogInfo("Starting workflow submission thread...")
+        workflow_thread = threading.Thread(target=self.submit_workflow)
+        workflow_thread.daemon = True
+        workflow_thread.start()
+
+    def _wait_for_server_ready(self) -> bool:
+        """
+        Probe the ComfyUI API with exponential backoff until it answers.
+        
+        Returns:
+            bool: True once the API is ready, False on timeout or shutdown
+        """
+        timeout = float(self.GetPluginInfoEntryWithDefault("StartupTimeout", str(SERVER_START_TIMEOUT)))
+        start_time = self.process_spawn_time or time.time()
+        delay = READINESS_INITIAL_DELAY
+        probes = 0
+        
+        while self.thread_running:
+            probes += 1
+            if self._probe_server():
+                self.time_to_ready = time.time() - start_time
+                self.server_started = True
+                self.LogInfo(f"ComfyUI API ready in {self.time_to_ready:.2f} seconds ({probes} probes)")
+                return True
             
-        self.LogInfo("ComfyUI server has started")
-        self.server_started = True
+            if time.time() - start_time > timeout:
+                self.LogWarning(f"ComfyUI API did not become ready within {timeout:.0f} seconds")
+                return False
+            
+            self._service_managed_process()
+            time.sleep(delay)
+            delay = min(delay * 2, READINESS_MAX_DELAY)
         
-        # Check if we're in worker/distributed mode
-        worker_mode, distributed_mode, force_new_instance = get_distributed_config_for_plugin(self)
+        return False
+
+    def _probe_server(self) -> bool:
+        """Check that the port accepts connections and /system_stats answers"""
+        try:
+            with socket.create_connection(("127.0.0.1", int(self.comfyui_port)), timeout=READINESS_CONNECT_TIMEOUT):
+                pass
+        except (OSError, ValueError):
+            return False
         
-        self.LogInfo(f"Distributed config check - WorkerMode: {worker_mode}, DistributedMode: {distributed_mode}")
-        self.LogInfo(f"use_existing_comfyui={self.use_existing_comfyui}, workflow_submitted={self.workflow_submitted}")
-        
-        # Start workflow submission if not using existing instance
-        if not self.use_existing_comfyui and not self.workflow_submitted:
-            # Mark as submitted IMMEDIATELY to prevent race conditions
-            self.workflow_submitted = True
-            self.LogInfo("Starting workflow submission thread...")
-            workflow_thread = threading.Thread(target=self.submit_workflow)
-            workflow_thread.daemon = True
-            workflow_thread.start()
-        else:
-            self.LogInfo("Skipping workflow submission - using existing instance or already submitted")
+        try:
+            response = self.http_request(f"{self.comfyui_api_url}/system_stats", verbose=False, timeout=HEALTH_CHECK_TIMEOUT)
+            return response['status_code'] == 200
+        except Exception:
+            return False
 
-    def http_request(self, url: str, method: str = "GET", data=None, headers=None, verbose: bool = True) -> dict:
-        """Make an HTTP request to the ComfyUI API"""
+    def http_request(self, url: str, method: str = "GET", data=None, headers=None, verbose: bool = True,
+                     timeout: float = HTTP_REQUEST_TIMEOUT) -> dict:
+        """Make an HTTP request to the ComfyUI API over a pooled keep-alive connection"""
         if not self.thread_running:
             self.LogInfo("Thread stopping due to task completion")
             return {'status_code': 0, 'text': '', 'json': lambda: {}}
@@ -577,26 +1083,56 @@ print('Dummy command timeout reached or task completed.')
             data = json.dumps(data).encode('utf-8')
             headers['Content-Type'] = 'application/json'
         
-        req = urllib.request.Request(url, data=data, headers=headers, method=method)
+        parsed_url = urllib.parse.urlsplit(url)
+        path = parsed_url.path or "/"
+        if parsed_url.query:
+            path = f"{path}?{parsed_url.query}"
         
         try:
-            with urllib.request.urlopen(req) as response:
-                response_data = response.read().decode('utf-8')
-                return {
-                    'status_code': response.status,
-                    'text': response_data,
-                    'json': lambda: json.loads(response_data) if response_data else {}
-                }
-        except urllib.error.HTTPError as e:
-            self.LogWarning(f"HTTP Error: {e.code} {e.reason}")
-            return {
-                'status_code': e.code,
-                'text': e.read().decode('utf-8'),
-                'json': lambda: {}
-            }
+            pool = self._get_http_pool(parsed_url.hostname, parsed_url.port or 80)
+            status_code, reason, body = pool.request(method, path, body=data, headers=headers, timeout=timeout)
         except Exception as e:
             self.LogWarning(f"Error in HTTP request: {str(e)}")
             raise
+        
+        response_data = body.decode('utf-8')
+        if status_code >= 400:
+            self.LogWarning(f"HTTP Error: {status_code} {reason}")
+            return {
+                'status_code': status_code,
+                'text': response_data,
+                'json': lambda: {}
+            }
+        
+        return {
+            'status_code': status_code,
+            'text': response_data,
+            'json': lambda: json.loads(response_data) if response_data else {}
+        }
+
+    def _get_http_pool(self, host: str, port: int) -> ComfyUIHttpPool:
+        """Get the connection pool for the ComfyUI instance, creating it on first use"""
+        with self.http_pool_lock:
+            pool = self.http_pool
+            if pool is None or pool.host != host or pool.port != port:
+                if pool is not None:
+                    self._log_http_stats()
+                    pool.close()
+                pool = ComfyUIHttpPool(host, port, pool_size=HTTP_POOL_SIZE, timeout=HTTP_REQUEST_TIMEOUT)
+                self.http_pool = pool
+            return pool
+
+    def _close_http_pool(self):
+        """Close pooled connections"""
+        with self.http_pool_lock:
+            if self.http_pool is not None:
+                self.http_pool.close()
+                self.http_pool = None
+
+    def _log_http_stats(self):
+        """Log connection reuse counters for the ComfyUI API"""
+        if self.http_pool is not None:
+            self.LogInfo(f"ComfyUI API connections: {self.http_pool.stats.summary()}")
     
     def modify_workflow_seeds(self, workflow_data: dict, task_id: int) -> bool:
         """
@@ -769,6 +1305,9 @@ print('Dummy command timeout reached or task completed.')
             else:
                 self.LogInfo("DeadlineSeed nodes detected - skipping automatic seed modification")
             
+            self.inject_sweep_parameters(workflow_data)
+            self._apply_parameter_row(workflow_data)
+            
             return workflow_data
         except Exception as e:
             self.LogWarning(f"Error loading or validating workflow file '{workflow_file}': {e}")
@@ -794,6 +1333,53 @@ print('Dummy command timeout reached or task completed.')
         self.LogInfo(f"Workflow file setting from plugin info: '{workflow_file}'")
         return workflow_file
 
+    def inject_sweep_parameters(self, workflow_data: dict) -> bool:
+        """
+        Inject each DeadlineSweep node's position on its axis for this task's first frame.
+        
+        Returns:
+            bool: True if the workflow has sweep nodes
+        """
+        plan = plan_sweep(workflow_data)
+        if not plan.axes:
+            return False
+        
+        frame = int(self.GetStartFrame())
+        for node_id, position in plan.node_indices(frame).items():
+            workflow_data[node_id]["inputs"]["sweep_index"] = position
+            self.LogInfo(f"Injected sweep_index={position} into {workflow_data[node_id]['class_type']} node {node_id} (frame {frame})")
+        return True
+
+    def _get_parameter_table(self):
+        """Load the job's parameter table, if it has one"""
+        table_setting = self.GetPluginInfoEntryWithDefault("ParameterTable", "").strip()
+        if not table_setting:
+            return None
+        
+        # Usually submitted as an auxiliary file; otherwise a path on shared storage
+        table_path = next((path for path in self.GetAuxiliaryFilenames()
+                           if os.path.basename(path) == os.path.basename(table_setting)), None)
+        if table_path is None:
+            table_path = RepositoryUtils.CheckPathMapping(table_setting)
+        
+        if self.parameter_table is None or self.parameter_table_path != table_path:
+            self.parameter_table = ParameterTable.load(table_path)
+            self.parameter_table_path = table_path
+            self.LogInfo(f"Loaded parameter table {table_path}: {self.parameter_table.rows} row(s), "
+                         f"{len(self.parameter_table.sites)} column(s)")
+        return self.parameter_table
+
+    def _apply_parameter_row(self, workflow_data: dict):
+        """Set the parameter table row for this task's first frame in the workflow"""
+        table = self._get_parameter_table()
+        if table is None:
+            return
+        
+        table.validate(workflow_data)
+        row = int(self.GetStartFrame())
+        for node_id, input_name, value in table.apply(workflow_data, row):
+            self.LogInfo(f"Parameter table row {row}: {node_id}.{input_name} = {value!r}")
+
     def _load_workflow_from_file(self, workflow_file: str) -> dict:
         """Load workflow data from JSON file"""
         with open(workflow_file, 'r') as f:
@@ -802,8 +1388,11 @@ print('Dummy command timeout reached or task completed.')
         self.LogInfo(f"Successfully loaded workflow file: {workflow_file}")
         return workflow_data
     
-    def validate_workflow(self, workflow_data: dict) -> dict:
-        """Check workflow for output nodes and convert to UI format if needed"""
+    def validate_workflow(self, workflow_data) -> dict:
+        """Normalize the workflow to node ID -> node and check it for output nodes"""
+        workflow_data = normalize_workflow(workflow_data)
+        self.LogInfo(f"Workflow has {len(workflow_data)} node(s), hash {workflow_hash(workflow_data)}")
+        
         has_save_image, has_output_node = self._check_workflow_output_nodes(workflow_data)
         
         if not has_output_node:
@@ -812,11 +1401,6 @@ print('Dummy command timeout reached or task completed.')
         if not has_save_image:
             self.LogWarning("No SaveImage node found in workflow. Images may not be saved to disk.")
             
-        # Convert from API format to UI format if needed
-        if "nodes" in workflow_data:
-            self.LogInfo("Converting from API format to UI format...")
-            workflow_data = self._convert_api_to_ui_format(workflow_data)
-            
         return workflow_data
 
     def _check_workflow_output_nodes(self, workflow_data: dict) -> tuple:
@@ -824,94 +1408,86 @@ print('Dummy command timeout reached or task completed.')
         has_save_image = False
         has_output_node = False
         
-        # Check UI format (numbered keys)
-        for key, node in workflow_data.items():
-            if isinstance(node, dict):
-                class_type = node.get("class_type", "")
-                if class_type == "SaveImage":
-                    has_save_image = True
-                    has_output_node = True
-                    self.LogInfo(f"Found SaveImage node in workflow")
-                elif class_type in OUTPUT_NODE_TYPES:
-                    has_output_node = True
-                    self.LogInfo(f"Found output node {class_type} in workflow")
-        
-        # Check API format (nodes array)
-        if not has_output_node and "nodes" in workflow_data:
-            for node in workflow_data["nodes"]:
-                if isinstance(node, dict):
-                    class_type = node.get("class_type", "")
-                    if class_type == "SaveImage":
-                        has_save_image = True
-                        has_output_node = True
-                        self.LogInfo(f"Found SaveImage node in workflow")
-                    elif class_type in OUTPUT_NODE_TYPES:
-                        has_output_node = True
-                        self.LogInfo(f"Found output node {class_type} in workflow")
+        for node in workflow_data.values():
+            class_type = node.get("class_type", "")
+            if class_type == "SaveImage":
+                has_save_image = True
+                has_output_node = True
+                self.LogInfo(f"Found SaveImage node in workflow")
+            elif class_type in OUTPUT_NODE_TYPES:
+                has_output_node = True
+                self.LogInfo(f"Found output node {class_type} in workflow")
         
         return has_save_image, has_output_node
 
-    def _convert_api_to_ui_format(self, workflow_data: dict) -> dict:
-        """Convert workflow from API format to UI format"""
-        converted_workflow = {}
-        for node in workflow_data["nodes"]:
-            node_id = str(node.get("id", 0))
-            converted_workflow[node_id] = node
-        return converted_workflow
-
     def HandleStdoutProgressBar(self):
         """Handle progress in the format '  4%|4         | 1/25 [00:02<00:59,  2.50s/it]'"""
+        self._apply_progress_bar(self.GetRegexMatch(0), self.GetRegexMatch(1), self.GetRegexMatch(2), self.GetRegexMatch(3))
+
+    def _apply_progress_bar(self, line: str, percent_match: str, step_match: str, total_match: str):
+        """Update progress from a tqdm progress bar line"""
         try:
-            percent = float(self.GetRegexMatch(1))
-            current_step = int(self.GetRegexMatch(2))
-            total_steps = int(self.GetRegexMatch(3))
+            percent = float(percent_match)
+            current_step = int(step_match)
+            total_steps = int(total_match)
             
             # Calculate overall chunk progress if needed
-            if self.chunk_size > 1:
-                completed_progress = (self.prompts_executed / self.chunk_size) * 100
-                current_contribution = (percent / self.chunk_size)
-                overall_progress = min(99, completed_progress + current_contribution) if self.prompts_executed < self.chunk_size else 100
+            if self.prompt_count > 1:
+                completed_progress = (self.prompts_executed / self.prompt_count) * 100
+                current_contribution = (percent / self.prompt_count)
+                overall_progress = min(99, completed_progress + current_contribution) if self.prompts_executed < self.prompt_count else 100
                 
                 self.SetProgress(overall_progress)
                 self.progress_value = overall_progress
-                self.SetStatusMessage(f"Chunk {self.prompts_executed + 1}/{self.chunk_size} - Step {current_step}/{total_steps} ({overall_progress:.2f}%)")
-                self.LogInfo(f"Chunk Progress: {overall_progress:.2f}% (Prompt {self.prompts_executed + 1}/{self.chunk_size}, Step {current_step}/{total_steps})")
+                self.SetStatusMessage(f"Chunk {self.prompts_executed + 1}/{self.prompt_count} - Step {current_step}/{total_steps} ({overall_progress:.2f}%)")
+                self.LogInfo(f"Chunk Progress: {overall_progress:.2f}% (Prompt {self.prompts_executed + 1}/{self.prompt_count}, Step {current_step}/{total_steps})")
             else:
                 self.SetProgress(percent)
                 self.progress_value = percent
                 self.SetStatusMessage(f"Step {current_step}/{total_steps} ({percent:.2f}%)")
                 self.LogInfo(f"Progress: {percent}% ({current_step}/{total_steps})")
         except ValueError:
-            self.LogWarning(f"Could not parse progress from: {self.GetRegexMatch(0)}")
+            self.LogWarning(f"Could not parse progress from: {line}")
     
     def HandleStdoutProgressPercent(self):
         """Handle progress in the format 'Progress: 45.5%'"""
+        self._apply_progress_percent(self.GetRegexMatch(0), self.GetRegexMatch(1))
+
+    def _apply_progress_percent(self, line: str, percent_match: str):
+        """Update progress from a 'Progress: X%' line"""
         try:
-            percent = float(self.GetRegexMatch(1))
+            percent = float(percent_match)
             
             # Calculate overall chunk progress if needed
-            if self.chunk_size > 1:
-                completed_progress = (self.prompts_executed / self.chunk_size) * 100
-                current_contribution = (percent / self.chunk_size)
-                overall_progress = min(99, completed_progress + current_contribution) if self.prompts_executed < self.chunk_size else 100
+            if self.prompt_count > 1:
+                completed_progress = (self.prompts_executed / self.prompt_count) * 100
+                current_contribution = (percent / self.prompt_count)
+                overall_progress = min(99, completed_progress + current_contribution) if self.prompts_executed < self.prompt_count else 100
                 
                 self.SetProgress(overall_progress)
                 self.progress_value = overall_progress
-                self.SetStatusMessage(f"Chunk {self.prompts_executed + 1}/{self.chunk_size} - Rendering: {overall_progress:.2f}%")
-                self.LogInfo(f"Chunk Progress: {overall_progress:.2f}% (Prompt {self.prompts_executed + 1}/{self.chunk_size} at {percent:.1f}%)")
+                self.SetStatusMessage(f"Chunk {self.prompts_executed + 1}/{self.prompt_count} - Rendering: {overall_progress:.2f}%")
+                self.LogInfo(f"Chunk Progress: {overall_progress:.2f}% (Prompt {self.prompts_executed + 1}/{self.prompt_count} at {percent:.1f}%)")
             else:
                 self.SetProgress(percent)
                 self.progress_value = percent
                 self.SetStatusMessage(f"Rendering: {percent:.2f}%")
                 self.LogInfo(f"Progress: {percent}%")
         except ValueError:
-            self.LogWarning(f"Could not parse progress from: {self.GetRegexMatch(0)}")
+            self.LogWarning(f"Could not parse progress from: {line}")
     
     def HandleStdoutPromptExecuted(self):
         """Handle completion message 'Prompt executed in X seconds'"""
-        execution_time = self.GetRegexMatch(1)
+        self._apply_prompt_executed(self.GetRegexMatch(1))
+
+    def _apply_prompt_executed(self, execution_time: str):
+        """Handle a prompt completion reported on stdout"""
         self.LogInfo(f"Workflow completed in {execution_time} seconds")
         
+        # Completion is tracked per prompt ID from websocket events when connected
+        if self._event_listener_active():
+            return
+        
         # Check if we already counted this prompt
         if self.prompt_id and self.prompt_id in self.completed_prompts:
             self.LogInfo(f"Prompt {self.prompt_id} already counted")
@@ -924,23 +1500,25 @@ print('Dummy command timeout reached or task completed.')
             self.completed_prompts.add(self.prompt_id)
         
         self.prompts_executed += 1
-        self.LogInfo(f"Prompt execution {self.prompts_executed} of {self.chunk_size} completed")
+        self.LogInfo(f"Prompt execution {self.prompts_executed} of {self.prompt_count} completed")
         
         # Move to next prompt
         if self.prompt_id:
             self._move_to_next_prompt()
         
         # Check if all prompts completed
-        if self.prompts_executed >= self.chunk_size:
+        if self.prompts_executed >= self.prompt_count:
             self._complete_task()
-            time.sleep(FILE_WRITE_DELAY)  # Wait for files to be written
         else:
             self._update_progress()
-            self.LogInfo(f"Waiting for remaining prompts. {self.prompts_executed} of {self.chunk_size} completed")
+            self.LogInfo(f"Waiting for remaining prompts. {self.prompts_executed} of {self.prompt_count} completed")
 
     def HandleStdoutError(self):
         """Handle errors from ComfyUI"""
-        error_msg = self.GetRegexMatch(0)
+        self._apply_stdout_error(self.GetRegexMatch(0))
+
+    def _apply_stdout_error(self, error_msg: str):
+        """Fail the current task on an error reported on stdout"""
         self.LogWarning(f"ComfyUI error: {error_msg}")
         
         if not self.task_completed:
@@ -949,16 +1527,16 @@ print('Dummy command timeout reached or task completed.')
     def initialize_api_connection(self) -> bool:
         """Initialize connection to ComfyUI API and get client ID"""
         try:
-            time.sleep(2)  # Wait for server to be fully initialized
-            
             response = self.http_request(f"{self.comfyui_api_url}/prompt")
             if response['status_code'] != 200:
                 self.LogWarning(f"Error connecting to ComfyUI API: {response['status_code']}")
                 self.FailRender(f"Error connecting to ComfyUI API: {response['status_code']}")
                 return False
                 
-            self.client_id = response['json']().get('client_id', '')
+            # ComfyUI only routes execution events to prompts queued with a client ID
+            self.client_id = response['json']().get('client_id', '') or uuid.uuid4().hex
             self.LogInfo(f"Got client ID: {self.client_id}")
+            self._start_event_listener()
             return True
         except Exception as e:
             self.LogWarning(f"Error initializing API connection: {e}")
@@ -970,9 +1548,19 @@ print('Dummy command timeout reached or task completed.')
         try:
             self._reset_prompt_tracking()
             
+            # Render the whole chunk as one batched prompt when the graph allows it
+            if self.batch_mode and self.chunk_size > 1:
+                folded_workflow = self._fold_chunk_into_batch(workflow_data)
+                if folded_workflow is not None:
+                    if not self._queue_single_prompt(folded_workflow):
+                        return False
+                    self.LogInfo(f"Queued chunk of {self.chunk_size} as a single batched prompt: {self.prompt_id}")
+                    return True
+            
             # Queue initial prompt
             if not self._queue_single_prompt(workflow_data):
                 return False
+            self.prompt_chunk_indices[self.prompt_id] = 0
             
             # Queue additional prompts for batch mode
             if self.batch_mode and self.chunk_size > 1:
@@ -988,8 +1576,11 @@ print('Dummy command timeout reached or task completed.')
     def _reset_prompt_tracking(self):
         """Reset prompt tracking variables"""
         self.prompt_ids = []
+        self.prompt_chunk_indices = {}
         self.completed_prompts = set()
         self.current_tracking_index = 0
+        self.prompt_outputs = {}
+        self.verified_output_files = set()
 
     def _queue_single_prompt(self, workflow_data: dict) -> bool:
         """Queue a single prompt to ComfyUI"""
@@ -1011,37 +1602,23 @@ print('Dummy command timeout reached or task completed.')
         """Queue additional prompts for batch processing"""
         self.LogInfo(f"Batch mode with chunk size {self.chunk_size}. Queueing additional prompts...")
         
-        import copy
+        # Index the inputs that differ between prompts once, then patch them into a pre-serialized body
+        sites, prompt_values = self._build_chunk_prompt_values(workflow_data)
+        patch_plan = PromptPatchPlan(workflow_data, self.client_id, sites)
+        self.LogInfo(f"Prepared prompt template with {len(sites)} per-prompt patch site(s): "
+                     f"{[f'{node_id}.{input_name}' for node_id, input_name in sites]}")
         
-        for i in range(1, self.chunk_size):
-            prompt_workflow = copy.deepcopy(workflow_data)
-            
-            # Check if workflow has DeadlineSeed nodes
-            has_deadline_seeds = any(
-                node.get("class_type") == "DeadlineSeed" 
-                for node in prompt_workflow.values() 
-                if isinstance(node, dict)
-            )
-            
-            if has_deadline_seeds:
-                # Update task_id for DeadlineSeed nodes (chunk-local indexing)
-                for node_id, node in prompt_workflow.items():
-                    if isinstance(node, dict) and node.get("class_type") == "DeadlineSeed":
-                        if "inputs" not in node:
-                            node["inputs"] = {}
-                        # Use i as the offset for chunks within the same task
-                        base_task_id = int(node["inputs"].get("task_id", 0))
-                        node["inputs"]["task_id"] = base_task_id + i
-                        self.LogInfo(f"Updated DeadlineSeed node {node_id} task_id to {base_task_id + i}")
-            else:
-                # Modify seeds using the old method
-                if self.GetPluginInfoEntryWithDefault("SeedMode", "fixed") != "fixed":
-                    self.modify_workflow_seeds(prompt_workflow, i)
-                    self.LogInfo(f"Modified seeds for additional prompt {i}")
+        queue_order = order_prompts_for_cache(workflow_data, sites, prompt_values)
+        if queue_order != sorted(queue_order):
+            self.LogInfo(f"Queueing chunk prompts in order {queue_order} to reuse cached nodes")
+        
+        for i in queue_order[1:]:
+            values = prompt_values[i]
+            body = patch_plan.render(values)
             
             # Queue the workflow
-            data = {"prompt": prompt_workflow, "client_id": self.client_id}
-            response = self.http_request(f"{self.comfyui_api_url}/prompt", method="POST", data=data)
+            response = self.http_request(f"{self.comfyui_api_url}/prompt", method="POST", data=body,
+                                         headers={'Content-Type': 'application/json'})
             
             if response['status_code'] != 200:
                 self.LogWarning(f"Error queuing additional prompt {i}: {response['text']}")
@@ -1049,9 +1626,112 @@ print('Dummy command timeout reached or task completed.')
                 
             prompt_id = response['json']()['prompt_id']
             self.prompt_ids.append(prompt_id)
-            self.LogInfo(f"Queued additional prompt {i} with ID: {prompt_id}")
-            
-            time.sleep(0.5)  # Small delay between submissions
+            self.prompt_chunk_indices[prompt_id] = i
+            self.LogInfo(f"Queued additional prompt {i} with ID: {prompt_id} (patched values: {values})")
+
+    def _build_chunk_prompt_values(self, workflow_data: dict) -> tuple:
+        """
+        Work out the values of the per-prompt inputs for every prompt in the chunk.
+        
+        Returns:
+            tuple: (sites, prompt_values) - (node_id, input_name) pairs and, per prompt, their values.
+                   Prompt 0 is the unpatched workflow.
+        """
+        patch_sites = self._find_prompt_patch_sites(workflow_data)
+        sites = [(node_id, input_name) for node_id, input_name, _ in patch_sites]
+        
+        prompt_values = [[workflow_data[node_id]["inputs"][input_name] for node_id, input_name in sites]]
+        for i in range(1, self.chunk_size):
+            prompt_values.append([value_for_prompt(i) for _, _, value_for_prompt in patch_sites])
+        return sites, prompt_values
+
+    def _fold_chunk_into_batch(self, workflow_data: dict):
+        """
+        Rewrite the workflow to render the whole chunk in one prompt with a latent batch.
+        
+        Returns:
+            dict: The folded workflow, or None if folding is disabled or not possible
+        """
+        if not self.GetBooleanPluginInfoEntryWithDefault("BatchLatentFold", False):
+            return None
+        
+        patch_sites = self._find_prompt_patch_sites(workflow_data)
+        latent_nodes, reason = plan_latent_fold(workflow_data, [(node_id, input_name) for node_id, input_name, _ in patch_sites])
+        if not latent_nodes:
+            self.LogInfo(f"Cannot fold chunk into a batched prompt ({reason}). Queueing {self.chunk_size} prompts.")
+            return None
+        
+        # Noise for batch items is derived from the first prompt's seed, so images differ
+        # from what separately seeded prompts would produce
+        self.LogInfo(f"Folding chunk into one prompt: batch_size={self.chunk_size} on latent node(s) {latent_nodes}")
+        self.folded_batch = True
+        self.prompt_count = 1
+        return fold_latent_batch(workflow_data, latent_nodes, self.chunk_size)
+
+    def _find_prompt_patch_sites(self, workflow_data: dict) -> list:
+        """
+        Find the inputs that change between prompts of a chunk.
+        
+        Returns:
+            list: (node_id, input_name, value_for_prompt) tuples, where value_for_prompt(i)
+                  gives the input value for the i-th prompt in the chunk
+        """
+        patch_sites = self._find_seed_patch_sites(workflow_data)
+        start_frame = int(self.GetStartFrame())
+        
+        # Prompt i renders the sweep combination of frame start + i
+        plan = plan_sweep(workflow_data)
+        for _, _, node_ids in plan.axes:
+            for node_id in node_ids:
+                patch_sites.append((node_id, "sweep_index",
+                                    lambda i, node=node_id: plan.node_indices(start_frame + i)[node]))
+        
+        table = self._get_parameter_table()
+        if table is None:
+            return patch_sites
+        
+        # Prompt i renders the table row of frame start + i; table values take precedence over seeds
+        table_sites = [(node_id, input_name, lambda i, column=index: table.value(column, start_frame + i))
+                       for index, (node_id, input_name) in enumerate(table.sites)]
+        patch_sites = [site for site in patch_sites if (site[0], site[1]) not in table.sites]
+        return patch_sites + table_sites
+
+    def _find_seed_patch_sites(self, workflow_data: dict) -> list:
+        """Find the seed inputs that change between prompts of a chunk"""
+        patch_sites = []
+        
+        deadline_seed_nodes = [
+            (node_id, node) for node_id, node in workflow_data.items()
+            if isinstance(node, dict) and node.get("class_type") == "DeadlineSeed"
+        ]
+        
+        if deadline_seed_nodes:
+            # Update task_id for DeadlineSeed nodes (chunk-local indexing)
+            for node_id, node in deadline_seed_nodes:
+                base_task_id = int(node.get("inputs", {}).get("task_id", 0))
+                patch_sites.append((node_id, "task_id", lambda i, base=base_task_id: base + i))
+            return patch_sites
+        
+        # Modify seeds using the old method
+        seed_mode = self.GetPluginInfoEntryWithDefault("SeedMode", "fixed")
+        if seed_mode == "fixed":
+            return patch_sites
+        
+        for node_id, node in workflow_data.items():
+            if not isinstance(node, dict):
+                continue
+            inputs = node.get("inputs", {})
+            for param_name in SEED_PARAMETER_NAMES:
+                if param_name not in inputs:
+                    continue
+                try:
+                    original_seed = int(inputs[param_name])
+                except (ValueError, TypeError):
+                    continue
+                patch_sites.append((node_id, param_name, lambda i, seed=original_seed, node_inputs=inputs:
+                                    self._calculate_new_seed(seed, i, seed_mode, node_inputs)))
+        
+        return patch_sites
 
     def process_history_data(self, history_data: dict) -> bool:
         """Process history data and update task status"""
@@ -1074,18 +1754,29 @@ print('Dummy command timeout reached or task completed.')
             return False
             
         self.LogInfo(f"Workflow complete: Found outputs in history for prompt {self.prompt_id}")
+        return self._record_prompt_completion(outputs)
+
+    def _record_prompt_completion(self, outputs: dict) -> bool:
+        """Count the tracked prompt as executed and complete the task when the chunk is done"""
+        if outputs and self.prompt_id:
+            self.prompt_outputs[self.prompt_id] = outputs
         
         # Mark prompt as completed
         if self.prompt_id not in self.completed_prompts:
             self.completed_prompts.add(self.prompt_id)
             self.prompts_executed += 1
-            self.LogInfo(f"Prompt {self.prompt_id} execution {self.prompts_executed} of {self.chunk_size} completed")
+            chunk_index = self.prompt_chunk_indices.get(self.prompt_id)
+            if chunk_index is not None and self.prompt_count > 1:
+                self.LogInfo(f"Prompt {self.prompt_id} (frame {self.GetStartFrame() + chunk_index}) "
+                             f"execution {self.prompts_executed} of {self.prompt_count} completed")
+            else:
+                self.LogInfo(f"Prompt {self.prompt_id} execution {self.prompts_executed} of {self.prompt_count} completed")
         
         # Log output information
         self._log_output_information(outputs)
         
         # Check if all prompts completed
-        if self.prompts_executed >= self.chunk_size:
+        if self.prompts_executed >= self.prompt_count:
             self._complete_task()
             return True
         else:
@@ -1104,12 +1795,30 @@ print('Dummy command timeout reached or task completed.')
         
         if output_nodes:
             self.LogInfo(f"Output producing nodes: {output_nodes}")
+        
+        if self.folded_batch:
+            self._log_folded_output_mapping(outputs)
+
+    def _log_folded_output_mapping(self, outputs: dict):
+        """Attribute the images of a folded batch back to the frames of the chunk"""
+        start_frame = self.GetStartFrame()
+        task_outputs = {}
+        for node_id, node_outputs in outputs.items():
+            # Batch items are saved in batch order, one per frame of the chunk
+            for batch_index, img in enumerate(node_outputs.get('images', [])):
+                frame = start_frame + (batch_index % self.chunk_size)
+                task_outputs.setdefault(frame, []).append(img['filename'])
+        
+        for frame in sorted(task_outputs):
+            self.LogInfo(f"Frame {frame} outputs: {task_outputs[frame]}")
 
     def _complete_task(self):
         """Mark task as complete"""
+        self._wait_for_output_files()
         self.SetProgress(100)
         self.SetStatusMessage("Finished Render")
         self.task_completed = True
+        self._log_http_stats()
         
         # Check if we're in distributed worker mode
         worker_mode, distributed_mode, force_new_instance = get_distributed_config_for_plugin(self)
@@ -1119,7 +1828,62 @@ print('Dummy command timeout reached or task completed.')
             self._enter_distributed_keep_alive_mode()
         else:
             self.signal_task_completion()
-            self.LogInfo(f"All {self.chunk_size} prompts in chunk completed, task marked as complete")
+            self.LogInfo(f"All {self.prompt_count} prompts in chunk completed, task marked as complete")
+
+    def _wait_for_output_files(self):
+        """Wait until every output file reported for this task's prompts is fully written"""
+        if not self._output_directory_known():
+            return
+        
+        if not self._fetch_missing_prompt_outputs():
+            # Without the reported files, give ComfyUI a moment to finish writing
+            self.LogInfo(f"Output files of some prompts are unknown; waiting {OUTPUT_FALLBACK_DELAY} seconds")
+            time.sleep(OUTPUT_FALLBACK_DELAY)
+        
+        expected_files = []
+        for outputs in self.prompt_outputs.values():
+            for path in output_files_from_outputs(outputs, self.comfyui_output_dir):
+                if path not in self.verified_output_files:
+                    expected_files.append(path)
+        
+        if not expected_files:
+            return
+        
+        timeout = float(self.GetPluginInfoEntryWithDefault("OutputWaitTimeout", str(OUTPUT_WAIT_TIMEOUT)))
+        start_time = time.time()
+        watcher = OutputFileWatcher(self.LogInfo, self.LogWarning)
+        stable_files, pending_files = watcher.wait_for_files(expected_files, timeout)
+        self.verified_output_files.update(stable_files)
+        
+        self.LogInfo(f"Verified {len(stable_files)} output file(s) in {time.time() - start_time:.3f} seconds")
+        for path in pending_files:
+            self.LogWarning(f"Output file not complete after {timeout:.0f} seconds: {path}")
+
+    def _fetch_missing_prompt_outputs(self) -> bool:
+        """
+        Read outputs from /history for finished prompts whose completion was seen on stdout only.
+        
+        Returns:
+            bool: False if the outputs of some finished prompt could not be read
+        """
+        finished = self.prompt_ids if self.prompts_executed >= self.prompt_count else self.completed_prompts
+        complete = True
+        for prompt_id in finished:
+            if prompt_id in self.prompt_outputs:
+                continue
+            try:
+                history_response = self.http_request(f"{self.comfyui_api_url}/history/{prompt_id}", verbose=False)
+                if history_response['status_code'] == 200:
+                    entry = history_response['json']().get(prompt_id, {})
+                    if 'outputs' in entry:
+                        self.prompt_outputs[prompt_id] = entry['outputs']
+                        continue
+            except Exception as e:
+                self.LogWarning(f"Could not read outputs of prompt {prompt_id} from history: {e}")
+            # Don't wait for the same prompt again
+            self.prompt_outputs[prompt_id] = {}
+            complete = False
+        return complete
 
     def _move_to_next_prompt(self):
         """Move to tracking the next prompt"""
@@ -1129,13 +1893,13 @@ print('Dummy command timeout reached or task completed.')
             self.LogInfo(f"Moving to track next prompt: {self.prompt_id}")
         else:
             self.prompt_id = None
-            self.LogInfo(f"No more prompts to track. Waiting for {self.chunk_size - self.prompts_executed} more executions.")
+            self.LogInfo(f"No more prompts to track. Waiting for {self.prompt_count - self.prompts_executed} more executions.")
 
     def _update_progress(self):
         """Update progress based on completed prompts"""
-        progress_percent = (self.prompts_executed / self.chunk_size) * 100
+        progress_percent = (self.prompts_executed / self.prompt_count) * 100
         self.SetProgress(progress_percent)
-        self.SetStatusMessage(f"Completed {self.prompts_executed} of {self.chunk_size} prompts ({progress_percent:.1f}%)")
+        self.SetStatusMessage(f"Completed {self.prompts_executed} of {self.prompt_count} prompts ({progress_percent:.1f}%)")
 
     def _handle_prompt_status(self, status: dict) -> bool:
         """Handle prompt status information"""
@@ -1153,7 +1917,7 @@ print('Dummy command timeout reached or task completed.')
         error_msg = status.get('error', 'Unknown error')
         self.LogWarning(f"ComfyUI reported error for prompt {self.prompt_id}: {error_msg}")
         
-        if self.chunk_size > 1:
+        if self.prompt_count > 1:
             # Continue with remaining prompts in batch
             self.LogWarning(f"Continuing with remaining prompts in chunk")
             self.completed_prompts.add(self.prompt_id)
@@ -1169,10 +1933,10 @@ print('Dummy command timeout reached or task completed.')
         current_prompt_progress = float(progress) * 100
         
         # Calculate overall chunk progress if needed
-        if self.chunk_size > 1:
-            completed_progress = (self.prompts_executed / self.chunk_size) * 100
-            current_contribution = (current_prompt_progress / self.chunk_size)
-            overall_progress = min(99, completed_progress + current_contribution) if self.prompts_executed < self.chunk_size else 100
+        if self.prompt_count > 1:
+            completed_progress = (self.prompts_executed / self.prompt_count) * 100
+            current_contribution = (current_prompt_progress / self.prompt_count)
+            overall_progress = min(99, completed_progress + current_contribution) if self.prompts_executed < self.prompt_count else 100
             
             self.SetProgress(overall_progress)
             self.progress_value = overall_progress
@@ -1182,30 +1946,57 @@ print('Dummy command timeout reached or task completed.')
 
     def signal_task_completion(self):
         """Signal to Deadline that the task is complete"""
+        if self.persistent_process:
+            # RenderTasks returning completes the task in persistent process mode
+            return
+        
+        self.repository_calls = 0
         try:
             job = self.GetJob()
             task_id = self.GetCurrentTaskId()
             slave_name = self.GetSlaveName()
             self.LogInfo(f"Signaling Deadline that task {task_id} for job {job.JobId} is complete")
             
-            tasks = RepositoryUtils.GetJobTasks(job, True)
-            current_task = self._find_current_task(tasks, task_id)
+            current_task = self._get_current_task(job, task_id)
             
             if current_task:
                 self.LogInfo(f"Completing task {current_task.TaskID}")
+                self.repository_calls += 1
                 RepositoryUtils.CompleteTasks(job, [current_task], slave_name)
             else:
                 self.LogWarning(f"Could not find task with ID {task_id}")
         except Exception as e:
             self.LogWarning(f"Error signaling task completion: {e}")
             self.LogWarning(traceback.format_exc())
+        finally:
+            self.LogInfo(f"Repository round-trips for task completion: {self.repository_calls}")
 
-    def _find_current_task(self, tasks, task_id):
-        """Find the current task in the task list"""
-        for task in tasks:
-            if str(task.TaskID) == str(task_id):
-                return task
-        return None
+    def _get_current_task(self, job, task_id):
+        """Get the Task object being rendered without scanning the whole job"""
+        # The plugin already holds the task it is rendering
+        try:
+            current_task = self.GetCurrentTask()
+            if current_task is not None and str(current_task.TaskID) == str(task_id):
+                return current_task
+        except Exception as e:
+            self.LogInfo(f"Current task not available from plugin ({e}), using task index")
+        
+        return self._lookup_task_in_index(job, task_id)
+
+    def _lookup_task_in_index(self, job, task_id):
+        """Find a task via the per-job TaskID index, fetching the job's tasks only once"""
+        with TASK_INDEX_LOCK:
+            task_index = TASK_INDEX_CACHE.get(job.JobId)
+            if task_index is None or str(task_id) not in task_index:
+                self.repository_calls += 1
+                tasks = RepositoryUtils.GetJobTasks(job, True)
+                task_index = {str(task.TaskID): task for task in tasks}
+                # Only the current job is worth keeping
+                TASK_INDEX_CACHE.clear()
+                TASK_INDEX_CACHE[job.JobId] = task_index
+                self.LogInfo(f"Built task index for job {job.JobId} ({len(task_index)} tasks)")
+            
+            return task_index.get(str(task_id))
 
     def monitor_workflow_execution(self) -> bool:
         """Poll history endpoint and wait for workflow completion"""
@@ -1232,6 +2023,17 @@ print('Dummy command timeout reached or task completed.')
                     self.signal_task_completion()
                 return True
             
+            self._service_managed_process()
+            
+            # Prefer websocket events; poll /history only when the socket is unavailable
+            if self._event_listener_active():
+                if self._process_next_event():
+                    break
+                continue
+            
+            if self.event_listener is not None:
+                self._fall_back_to_polling()
+            
             if self.prompt_id:
                 if self._poll_prompt_status(poll_count):
                     break
@@ -1263,6 +2065,104 @@ print('Dummy command timeout reached or task completed.')
         
         return self.task_completed
 
+    def _start_event_listener(self):
+        """Connect to ComfyUI's websocket so completion is detected as soon as it happens"""
+        if not self.GetBooleanPluginInfoEntryWithDefault("UseWebSocket", True):
+            self.LogInfo("Websocket events disabled by plugin info. Using /history polling.")
+            return
+        
+        listener = ComfyUIEventListener(self.comfyui_api_url, self.client_id, self.LogInfo, self.LogWarning)
+        if listener.connect():
+            self.event_listener = listener
+        else:
+            self.LogWarning("Websocket unavailable. Using /history polling.")
+
+    def _stop_event_listener(self):
+        """Close the websocket connection if open"""
+        if self.event_listener is not None:
+            self.event_listener.stop()
+            self.event_listener = None
+
+    def _event_listener_active(self) -> bool:
+        """Check if the websocket is connected or still has events to process"""
+        listener = self.event_listener
+        return listener is not None and (listener.connected or not listener.events.empty())
+
+    def _fall_back_to_polling(self):
+        """Switch monitoring to /history polling after the websocket dropped"""
+        self.LogWarning("ComfyUI websocket disconnected. Falling back to /history polling.")
+        self.event_listener = None
+        
+        # Resume tracking at the first prompt we have not seen complete
+        self.prompt_id = None
+        for i, prompt_id in enumerate(self.prompt_ids):
+            if prompt_id not in self.completed_prompts:
+                self.prompt_id = prompt_id
+                self.current_tracking_index = i
+                break
+
+    def _process_next_event(self) -> bool:
+        """
+        Wait for the next websocket event and apply it.
+        
+        Returns:
+            bool: True if the task finished (completed or failed), False otherwise
+        """
+        event = self.event_listener.get_event(WEBSOCKET_EVENT_WAIT)
+        if event is None:
+            return False
+        
+        event_type = event.get("type")
+        data = event.get("data") or {}
+        prompt_id = data.get("prompt_id")
+        
+        # Older ComfyUI versions omit prompt_id from progress events
+        if event_type == "progress":
+            if prompt_id is None or prompt_id in self.prompt_ids:
+                max_value = data.get("max") or 0
+                if max_value:
+                    self._update_execution_progress(float(data.get("value", 0)) / max_value)
+            return False
+        
+        if prompt_id not in self.prompt_ids:
+            return False
+        
+        if event_type == "executed":
+            node_id = data.get("node")
+            if node_id is not None and data.get("output"):
+                self.prompt_outputs.setdefault(prompt_id, {})[node_id] = data["output"]
+        elif event_type == "execution_success" or (event_type == "executing" and data.get("node") is None):
+            return self._handle_event_prompt_completion(prompt_id)
+        elif event_type in ("execution_error", "execution_interrupted"):
+            return self._handle_event_prompt_error(prompt_id, data)
+        
+        return False
+
+    def _handle_event_prompt_completion(self, prompt_id: str) -> bool:
+        """Handle a prompt finishing as reported by the websocket"""
+        # Newer ComfyUI sends both execution_success and executing(node=None)
+        if prompt_id in self.completed_prompts:
+            return False
+        
+        self.prompt_id = prompt_id
+        self.current_tracking_index = self.prompt_ids.index(prompt_id)
+        self.LogInfo(f"Workflow complete: Execution finished for prompt {prompt_id}")
+        return self._record_prompt_completion(self.prompt_outputs.get(prompt_id, {}))
+
+    def _handle_event_prompt_error(self, prompt_id: str, data: dict) -> bool:
+        """Handle an execution error or interruption reported by the websocket"""
+        if prompt_id in self.completed_prompts:
+            return False
+        
+        self.prompt_id = prompt_id
+        self.current_tracking_index = self.prompt_ids.index(prompt_id)
+        error_msg = data.get("exception_message") or "Execution interrupted"
+        if "out of memory" in error_msg.lower() or "OutOfMemoryError" in str(data.get("exception_type", "")):
+            self.process_restart_requested = True
+        if data.get("node_type"):
+            error_msg = f"{data['node_type']} (node {data.get('node_id')}): {error_msg}"
+        return self._handle_prompt_error({'error': error_msg})
+
     def _enter_distributed_keep_alive_mode(self):
         """Enter keep-alive mode for distributed workers"""
         import time
@@ -1323,7 +2223,7 @@ print('Dummy command timeout reached or task completed.')
 
     def _check_for_missed_prompts(self):
         """Check for any completed prompts that weren't tracked"""
-        if self.prompts_executed >= self.chunk_size:
+        if self.prompts_executed >= self.prompt_count:
             return
             
         try:
@@ -1350,6 +2250,12 @@ print('Dummy command timeout reached or task completed.')
             if not workflow_data:
                 return
             
+            if not self._wait_for_server_ready():
+                self.FailRender("ComfyUI API did not become ready")
+                return
+            
+            self._wait_for_model_prefetch()
+            
             if not self.initialize_api_connection():
                 return
             
@@ -1358,7 +2264,79 @@ print('Dummy command timeout reached or task completed.')
             
             self.monitor_workflow_execution()
             
+            if self.task_completed:
+                self._publish_model_locality(workflow_data)
+                self._store_result_cache()
+            
         except Exception as e:
             self.LogWarning(f"Error during workflow submission: {e}")
             traceback.print_exc()
-            self.FailRender(f"Error during workflow submission: {str(e)}") 
\ No newline at end of file
+            self.FailRender(f"Error during workflow submission: {str(e)}")
+        finally:
+            self._stop_event_listener()
+
+
+class ComfyUIProcess(ManagedProcess):
+    """ComfyUI server process kept alive across tasks in persistent process mode"""
+    
+    def __init__(self, deadlinePlugin):
+        if sys.version_info.major == 3:
+            super().__init__()
+        
+        self.deadlinePlugin = deadlinePlugin
+        
+        self.InitializeProcessCallback += self.InitializeProcess
+        self.RenderExecutableCallback += self.RenderExecutable
+        self.RenderArgumentCallback += self.RenderArgument
+
+    def Cleanup(self):
+        """Clean up process resources"""
+        for stdoutHandler in self.StdoutHandlers:
+            del stdoutHandler.HandleCallback
+        
+        del self.InitializeProcessCallback
+        del self.RenderExecutableCallback
+        del self.RenderArgumentCallback
+
+    def InitializeProcess(self):
+        """Initialize process settings and stdout handlers"""
+        self.ProcessPriority = ProcessPriorityClass.BelowNormal
+        self.UseProcessTree = True
+        self.StdoutHandling = True
+        self.PopupHandling = False
+        
+        self.AddStdoutHandlerCallback(OUT_OF_MEMORY_PATTERN).HandleCallback += self.HandleOutOfMemory
+        self.AddStdoutHandlerCallback(".*Error:.*").HandleCallback += self.HandleStdoutError
+        self.AddStdoutHandlerCallback(".*Exception:.*").HandleCallback += self.HandleStdoutError
+        
+        self.AddStdoutHandlerCallback(r"\s*([0-9]+)%\|.*\|\s*([0-9]+)/([0-9]+).*").HandleCallback += self.HandleStdoutProgressBar
+        self.AddStdoutHandlerCallback(r"Progress: ([0-9.]+)%.*").HandleCallback += self.HandleStdoutProgressPercent
+        self.AddStdoutHandlerCallback(r"Prompt executed in ([0-9.]+) seconds").HandleCallback += self.HandleStdoutPromptExecuted
+
+    def RenderExecutable(self):
+        """Get the Python executable for ComfyUI"""
+        return self.deadlinePlugin.RenderExecutable()
+
+    def RenderArgument(self):
+        """Build command line arguments for ComfyUI"""
+        return self.deadlinePlugin.RenderArgument()
+
+    def HandleOutOfMemory(self):
+        """Handle GPU out-of-memory errors"""
+        self.deadlinePlugin.HandleOutOfMemory(self.GetRegexMatch(0))
+
+    def HandleStdoutError(self):
+        """Handle errors from ComfyUI"""
+        self.deadlinePlugin._apply_stdout_error(self.GetRegexMatch(0))
+
+    def HandleStdoutProgressBar(self):
+        """Handle tqdm progress bar lines"""
+        self.deadlinePlugin._apply_progress_bar(self.GetRegexMatch(0), self.GetRegexMatch(1), self.GetRegexMatch(2), self.GetRegexMatch(3))
+
+    def HandleStdoutProgressPercent(self):
+        """Handle 'Progress: X%' lines"""
+        self.deadlinePlugin._apply_progress_percent(self.GetRegexMatch(0), self.GetRegexMatch(1))
+
+    def HandleStdoutPromptExecuted(self):
+        """Handle 'Prompt executed in X seconds' lines"""
+        self.deadlinePlugin._apply_prompt_executed(self.GetRegexMatch(1))
@@ -0,0 +1,244 @@
+"""
+ComfyUI websocket event listener
+by Dominik Bargiel dominikbargiel97@gmail.com
+
+Minimal standard-library websocket client for ComfyUI's /ws endpoint. Used by the
+Deadline plugin to react to execution events the moment they happen instead of
+polling /history.
+"""
+
+import os
+import json
+import base64
+import hashlib
+import socket
+import struct
+import threading
+import queue
+import urllib.parse
+from typing import Callable, Optional
+
+# Websocket protocol constants (RFC 6455)
+WEBSOCKET_GUID = "258EAFA5-E914-47DA-95CA-C5AB0DC85B11"
+OPCODE_CONTINUATION = 0x0
+OPCODE_TEXT = 0x1
+OPCODE_BINARY = 0x2
+OPCODE_CLOSE = 0x8
+OPCODE_PING = 0x9
+OPCODE_PONG = 0xA
+
+DEFAULT_CONNECT_TIMEOUT = 5  # seconds
+MAX_HANDSHAKE_SIZE = 65536
+
+class WebSocketError(Exception):
+    """Raised when the websocket handshake or framing fails"""
+    pass
+
+class ComfyUIEventListener:
+    """
+    Listens to ComfyUI's /ws event stream on a background thread.
+
+    Text messages are decoded from JSON and pushed onto ``events`` as dicts
+    (``{"type": ..., "data": ...}``). Binary messages (live previews) are ignored.
+    """
+
+    def __init__(self, api_url: str, client_id: str, log_info: Callable = print, log_warning: Callable = print):
+        parsed = urllib.parse.urlparse(api_url)
+        self.host = parsed.hostname or "127.0.0.1"
+        self.port = parsed.port or 80
+        self.client_id = client_id
+        self.log_info = log_info
+        self.log_warning = log_warning
+        self.events = queue.Queue()
+        self.connected = False
+        self._sock = None
+        self._buffer = b""
+        self._thread = None
+        self._stopping = False
+        self._send_lock = threading.Lock()
+
+    def connect(self, timeout: float = DEFAULT_CONNECT_TIMEOUT) -> bool:
+        """Open the websocket and start the reader thread. Returns False on failure."""
+        try:
+            self._sock = socket.create_connection((self.host, self.port), timeout=timeout)
+            self._handshake()
+            # Reader blocks on recv; stop() closes the socket to unblock it
+            self._sock.settimeout(None)
+        except Exception as e:
+            self.log_warning(f"Could not open ComfyUI websocket: {e}")
+            self._close_socket()
+            return False
+
+        self.connected = True
+        self._thread = threading.Thread(target=self._reader_loop, daemon=True)
+        self._thread.start()
+        self.log_info(f"Connected to ComfyUI websocket at ws://{self.host}:{self.port}/ws (client ID {self.client_id})")
+        return True
+
+    def stop(self):
+        """Close the websocket and stop the reader thread"""
+        self._stopping = True
+        if self.connected:
+            try:
+                self._send_frame(OPCODE_CLOSE, b"")
+            except Exception:
+                pass
+        self.connected = False
+        self._close_socket()
+
+    def _handshake(self):
+        """Perform the HTTP upgrade handshake"""
+        key = base64.b64encode(os.urandom(16)).decode("ascii")
+        path = f"/ws?clientId={urllib.parse.quote(self.client_id)}"
+        request = (
+            f"GET {path} HTTP/1.1\r\n"
+            f"Host: {self.host}:{self.port}\r\n"
+            "Upgrade: websocket\r\n"
+            "Connection: Upgrade\r\n"
+            f"Sec-WebSocket-Key: {key}\r\n"
+            "Sec-WebSocket-Version: 13\r\n"
+            "\r\n"
+        )
+        self._sock.sendall(request.encode("ascii"))
+
+        response = b""
+        while b"\r\n\r\n" not in response:
+            chunk = self._sock.recv(4096)
+            if not chunk:
+                raise WebSocketError("Connection closed during handshake")
+            response += chunk
+            if len(response) > MAX_HANDSHAKE_SIZE:
+                raise WebSocketError("Handshake response too large")
+
+        header_block, self._buffer = response.split(b"\r\n\r\n", 1)
+        lines = header_block.decode("latin-1").split("\r\n")
+        if len(lines[0].split()) < 2 or lines[0].split()[1] != "101":
+            raise WebSocketError(f"Unexpected handshake response: {lines[0]}")
+
+        headers = {}
+        for line in lines[1:]:
+            if ":" in line:
+                name, value = line.split(":", 1)
+                headers[name.strip().lower()] = value.strip()
+
+        expected = base64.b64encode(hashlib.sha1((key + WEBSOCKET_GUID).encode("ascii")).digest()).decode("ascii")
+        if headers.get("sec-websocket-accept") != expected:
+            raise WebSocketError("Invalid Sec-WebSocket-Accept header")
+
+    def _recv_exact(self, size: int) -> bytes:
+        """Read exactly size bytes, using any data left over from the handshake first"""
+        data = self._buffer[:size]
+        self._buffer = self._buffer[size:]
+        while len(data) < size:
+            chunk = self._sock.recv(size - len(data))
+            if not chunk:
+                raise WebSocketError("Connection closed")
+            data += chunk
+        return data
+
+    def _read_frame(self) -> tuple:
+        """Read a single frame and return (fin, opcode, payload)"""
+        first, second = struct.unpack("!BB", self._recv_exact(2))
+        fin = bool(first & 0x80)
+        opcode = first & 0x0F
+        masked = bool(second & 0x80)
+        length = second & 0x7F
+
+        if length == 126:
+            length = struct.unpack("!H", self._recv_exact(2))[0]
+        elif length == 127:
+            length = struct.unpack("!Q", self._recv_exact(8))[0]
+
+        mask = self._recv_exact(4) if masked else None
+        payload = self._recv_exact(length) if length else b""
+        if mask:
+            payload = bytes(b ^ mask[i % 4] for i, b in enumerate(payload))
+
+        return fin, opcode, payload
+
+    def _send_frame(self, opcode: int, payload: bytes):
+        """Send a single masked frame (clients must mask every frame)"""
+        header = bytearray([0x80 | opcode])
+        length = len(payload)
+        if length < 126:
+            header.append(0x80 | length)
+        elif length < 65536:
+            header.append(0x80 | 126)
+            header += struct.pack("!H", length)
+        else:
+            header.append(0x80 | 127)
+            header += struct.pack("!Q", length)
+
+        mask = os.urandom(4)
+        masked_payload = bytes(b ^ mask[i % 4] for i, b in enumerate(payload))
+
+        with self._send_lock:
+            self._sock.sendall(bytes(header) + mask + masked_payload)
+
+    def _reader_loop(self):
+        """Read frames until the connection closes and queue decoded events"""
+        fragments = []
+        fragment_opcode = None
+
+        try:
+            while not self._stopping:
+                fin, opcode, payload = self._read_frame()
+
+                if opcode == OPCODE_PING:
+                    self._send_frame(OPCODE_PONG, payload)
+                    continue
+                if opcode == OPCODE_PONG:
+                    continue
+                if opcode == OPCODE_CLOSE:
+                    break
+
+                if opcode == OPCODE_CONTINUATION:
+                    fragments.append(payload)
+                else:
+                    fragment_opcode = opcode
+                    fragments = [payload]
+
+                if not fin:
+                    continue
+
+                message = b"".join(fragments)
+                fragments = []
+                if fragment_opcode == OPCODE_TEXT:
+                    self._queue_message(message)
+        except Exception as e:
+            if not self._stopping:
+                self.log_warning(f"ComfyUI websocket connection lost: {e}")
+        finally:
+            self.connected = False
+            self._close_socket()
+
+    def _queue_message(self, message: bytes):
+        """Decode a text message and put it on the event queue"""
+        try:
+            event = json.loads(message.decode("utf-8"))
+        except (ValueError, UnicodeDecodeError):
+            return
+
+        if isinstance(event, dict) and "type" in event:
+            self.events.put(event)
+
+    def get_event(self, timeout: float) -> Optional[dict]:
+        """Return the next event, or None if none arrived within timeout"""
+        try:
+            return self.events.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+    def _close_socket(self):
+        """Close the underlying socket, ignoring errors"""
+        if self._sock is not None:
+            try:
+                # shutdown() unblocks a reader thread waiting in recv()
+                self._sock.shutdown(socket.SHUT_RDWR)
+            except Exception:
+                pass
+            try:
+                self._sock.close()
+            except Exception:
+                pass
+            self._sock = None
@@ -0,0 +1,160 @@
+"""
+ComfyUI HTTP connection pool
+by Dominik Bargiel dominikbargiel97@gmail.com
+
+Keep-alive HTTP client for the ComfyUI API. Reuses a bounded pool of
+http.client connections so polling and chunk submission don't pay a TCP
+handshake per request.
+"""
+
+import http.client
+import socket
+import threading
+import queue
+from typing import Dict, Optional, Tuple
+
+DEFAULT_POOL_SIZE = 4
+DEFAULT_REQUEST_TIMEOUT = 30  # seconds
+
+# Methods that may be sent twice without side effects
+IDEMPOTENT_METHODS = ("GET", "HEAD", "OPTIONS")
+
+# Errors that mean a kept-alive connection was closed by the server. The request
+# is retried on a fresh connection if it never reached the server or is idempotent;
+# a POST that was sent may already have been accepted (e.g. a queued prompt).
+RECONNECT_ERRORS = (
+    http.client.RemoteDisconnected,
+    http.client.BadStatusLine,
+    ConnectionResetError,
+    ConnectionAbortedError,
+    BrokenPipeError,
+)
+
+class PoolStats:
+    """Connection reuse counters"""
+
+    def __init__(self):
+        self.requests = 0
+        self.connections_opened = 0
+        self.connections_reused = 0
+        self.reconnects = 0
+
+    def summary(self) -> str:
+        """Human readable one-line summary for the task log"""
+        return (f"{self.requests} requests, {self.connections_opened} connections opened, "
+                f"{self.connections_reused} reused, {self.reconnects} reconnects")
+
+class ComfyUIHttpPool:
+    """
+    Bounded pool of keep-alive connections to a single host.
+
+    At most ``pool_size`` connections exist at once; callers block until one
+    is returned to the pool.
+    """
+
+    def __init__(self, host: str, port: int, pool_size: int = DEFAULT_POOL_SIZE,
+                 timeout: float = DEFAULT_REQUEST_TIMEOUT):
+        self.host = host
+        self.port = port
+        self.pool_size = pool_size
+        self.timeout = timeout
+        self.stats = PoolStats()
+        self._idle = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(pool_size)
+        self._lock = threading.Lock()
+        self._closed = False
+
+    def request(self, method: str, path: str, body: Optional[bytes] = None,
+                headers: Optional[Dict[str, str]] = None, timeout: Optional[float] = None) -> Tuple[int, str, bytes]:
+        """
+        Perform a request and read the full response.
+
+        Returns:
+            tuple: (status code, reason, response body)
+        """
+        timeout = self.timeout if timeout is None else timeout
+        headers = dict(headers or {})
+
+        self._slots.acquire()
+        try:
+            conn, reused = self._checkout(timeout)
+            with self._lock:
+                self.stats.requests += 1
+                if reused:
+                    self.stats.connections_reused += 1
+
+            sent = False
+            try:
+                conn.request(method, path, body=body, headers=headers)
+                sent = True
+                result = self._read_response(conn)
+            except RECONNECT_ERRORS:
+                conn.close()
+                if not reused or (sent and method.upper() not in IDEMPOTENT_METHODS):
+                    raise
+                # Server closed the idle connection; retry once on a new one
+                with self._lock:
+                    self.stats.reconnects += 1
+                conn = self._connect(timeout)
+                try:
+                    result = self._send(conn, method, path, body, headers)
+                except Exception:
+                    conn.close()
+                    raise
+            except (socket.timeout, OSError, http.client.HTTPException):
+                conn.close()
+                raise
+
+            self._checkin(conn, result[3])
+            return result[:3]
+        finally:
+            self._slots.release()
+
+    def close(self):
+        """Close all idle connections"""
+        self._closed = True
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                break
+
+    def _checkout(self, timeout: float) -> Tuple[http.client.HTTPConnection, bool]:
+        """Take an idle connection or open a new one"""
+        try:
+            conn = self._idle.get_nowait()
+            conn.timeout = timeout
+            if conn.sock is not None:
+                conn.sock.settimeout(timeout)
+            return conn, True
+        except queue.Empty:
+            return self._connect(timeout), False
+
+    def _connect(self, timeout: float) -> http.client.HTTPConnection:
+        """Open a new connection"""
+        conn = http.client.HTTPConnection(self.host, self.port, timeout=timeout)
+        conn.connect()
+        with self._lock:
+            self.stats.connections_opened += 1
+        return conn
+
+    def _checkin(self, conn: http.client.HTTPConnection, keep_alive: bool):
+        """Return a connection to the pool, or close it if the server won't keep it open"""
+        if keep_alive and not self._closed:
+            self._idle.put(conn)
+        else:
+            conn.close()
+
+    @staticmethod
+    def _send(conn: http.client.HTTPConnection, method: str, path: str,
+              body: Optional[bytes], headers: Dict[str, str]) -> Tuple[int, str, bytes, bool]:
+        """Send the request and read the response, returning whether the connection can be reused"""
+        conn.request(method, path, body=body, headers=headers)
+        return ComfyUIHttpPool._read_response(conn)
+
+    @staticmethod
+    def _read_response(conn: http.client.HTTPConnection) -> Tuple[int, str, bytes, bool]:
+        """Read the full response, returning whether the connection can be reused"""
+        response = conn.getresponse()
+        data = response.read()
+        return response.status, response.reason, data, not response.will_close
@@ -0,0 +1,91 @@
+"""
+ComfyUI model locality
+by Dominik Bargiel dominikbargiel97@gmail.com
+
+Workers publish which models they have on local disk (and which are loaded in a
+warm ComfyUI process) as small JSON state files in a shared directory. The
+submitter reads them to find the workers where a workflow's models are already
+local, so tasks can be steered to machines that have paid the load cost.
+"""
+
+import os
+import json
+import time
+from typing import Dict, Iterable, List, Optional, Tuple
+
+STATE_FILE_SUFFIX = ".json"
+DEFAULT_MAX_AGE = 7 * 24 * 3600  # seconds after which a worker's state is ignored
+
+def model_key(folder: str, filename: str) -> str:
+    """Identify a model independent of where it is stored, e.g. 'checkpoints/sdxl/base.safetensors'"""
+    return f"{folder}/{filename}".replace("\\", "/")
+
+def publish_worker_models(directory: str, worker: str, cached: Dict[str, str], loaded: Iterable[str]):
+    """
+    Update a worker's state file.
+
+    Args:
+        directory: Shared locality directory
+        worker: Deadline worker name
+        cached: Model key -> local path of models now on this worker's local disk
+        loaded: Model keys loaded in a ComfyUI process that stays running
+    """
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, _safe_name(worker) + STATE_FILE_SUFFIX)
+    state = _read_state(path) or {}
+
+    now = time.time()
+    models = state.get("models", {})
+    models.update({key: {"path": local_path, "last_used": now} for key, local_path in cached.items()})
+    # Forget models that have since been evicted or deleted from local disk
+    models = {key: entry for key, entry in models.items() if os.path.isfile(entry.get("path", ""))}
+
+    state = {"worker": worker, "updated": now, "models": models, "loaded": sorted(loaded)}
+    temp_path = f"{path}.{os.getpid()}.tmp"
+    with open(temp_path, "w") as f:
+        json.dump(state, f, indent=1)
+    os.replace(temp_path, path)
+
+def rank_workers(directory: str, keys: Iterable[str], max_age: float = DEFAULT_MAX_AGE) -> List[Tuple[str, int, int]]:
+    """
+    Rank workers by how many of the given models they already have.
+
+    Only workers with the highest local coverage are returned; among those,
+    workers with more of the models loaded in a warm process come first.
+
+    Returns:
+        list: (worker, models on local disk, models loaded) tuples, best first
+    """
+    keys = set(keys)
+    if not keys or not os.path.isdir(directory):
+        return []
+
+    now = time.time()
+    scores = []
+    for name in os.listdir(directory):
+        if not name.endswith(STATE_FILE_SUFFIX):
+            continue
+        state = _read_state(os.path.join(directory, name))
+        if not state or now - state.get("updated", 0) > max_age:
+            continue
+        cached = len(keys & set(state.get("models", {})))
+        loaded = len(keys & set(state.get("loaded", [])))
+        if cached:
+            scores.append((state.get("worker", name[:-len(STATE_FILE_SUFFIX)]), cached, loaded))
+
+    if not scores:
+        return []
+    best = max(cached for _, cached, _ in scores)
+    return sorted((score for score in scores if score[1] == best), key=lambda score: (-score[2], score[0]))
+
+def _read_state(path: str) -> Optional[dict]:
+    """Read a worker state file, returning None if missing or unreadable"""
+    try:
+        with open(path, "r") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+def _safe_name(worker: str) -> str:
+    """File name for a worker"""
+    return "".join(c if c.isalnum() or c in "-_." else "_" for c in worker)
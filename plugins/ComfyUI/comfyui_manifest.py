@@ -0,0 +1,222 @@
+"""
+ComfyUI model store manifest
+by Dominik Bargiel dominikbargiel97@gmail.com
+
+Builds a manifest (path, size, mtime, SHA-256) of the shared model root and syncs
+worker-local model directories from it. Rebuilding only hashes files whose size
+or mtime changed, and a worker compares manifests instead of stat'ing the share,
+so an up-to-date worker is checked with a single manifest read.
+
+Usage:
+    python comfyui_manifest.py build X:/AI/models
+    python comfyui_manifest.py sync X:/AI/models C:/AI/models [--streams 4] [--delete]
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+from typing import Callable, Dict, List, Optional, Tuple
+
+from comfyui_models import MODEL_EXTENSIONS
+from comfyui_transfer import DEFAULT_STREAMS, HASH_SIDECAR_SUFFIX, ModelTransfer, hash_file, read_hash_sidecar
+
+MANIFEST_FILE_NAME = ".deadline_model_manifest.json"
+MANIFEST_VERSION = 1
+
+def manifest_path(root: str) -> str:
+    """Location of the manifest for a model root"""
+    return os.path.join(root, MANIFEST_FILE_NAME)
+
+def load_manifest(path: str) -> Optional[dict]:
+    """Read a manifest, returning None if it is missing or unreadable"""
+    try:
+        with open(path, "r") as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if manifest.get("version") != MANIFEST_VERSION:
+        return None
+    return manifest
+
+def save_manifest(path: str, manifest: dict):
+    """Write a manifest atomically"""
+    temp_path = f"{path}.{os.getpid()}.tmp"
+    with open(temp_path, "w") as f:
+        json.dump(manifest, f, indent=1, sort_keys=True)
+    os.replace(temp_path, path)
+
+def build_manifest(root: str, previous: Optional[dict] = None, log_info: Callable = print) -> dict:
+    """
+    Describe every model file under root.
+
+    Hashes are reused from the previous manifest for files whose size and mtime
+    are unchanged, and from ``<file>.sha256`` sidecars when those are newer
+    than the file; only the remaining files are read.
+    """
+    previous_files = (previous or {}).get("files", {})
+    files = {}
+    hashed = 0
+
+    for directory, subdirectories, names in os.walk(root):
+        subdirectories[:] = [d for d in subdirectories if not d.startswith(".")]
+        for name in names:
+            if not name.lower().endswith(MODEL_EXTENSIONS):
+                continue
+            path = os.path.join(directory, name)
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+
+            key = os.path.relpath(path, root).replace(os.sep, "/")
+            entry = previous_files.get(key)
+            if entry and entry["size"] == stat.st_size and entry["mtime_ns"] == stat.st_mtime_ns:
+                files[key] = entry
+                continue
+
+            digest = None
+            try:
+                if os.stat(path + HASH_SIDECAR_SUFFIX).st_mtime_ns >= stat.st_mtime_ns:
+                    digest = read_hash_sidecar(path)
+            except OSError:
+                pass
+            if digest is None:
+                log_info(f"Hashing {key} ({stat.st_size / 1024 ** 2:.0f} MB)")
+                digest = hash_file(path)
+                hashed += 1
+
+            files[key] = {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns, "sha256": digest}
+
+    log_info(f"Manifest: {len(files)} file(s), {hashed} hashed, {len(files) - hashed} reused")
+    return {
+        "version": MANIFEST_VERSION,
+        "generated": time.time(),
+        "files": files,
+    }
+
+def update_manifest(root: str, log_info: Callable = print) -> dict:
+    """Rebuild the manifest stored in root, reusing unchanged hashes"""
+    path = manifest_path(root)
+    manifest = build_manifest(root, load_manifest(path), log_info)
+    save_manifest(path, manifest)
+    return manifest
+
+def compute_delta(source: dict, local: Optional[dict]) -> Tuple[List[str], List[str]]:
+    """
+    Compare a source manifest with the manifest of a local copy.
+
+    Returns:
+        tuple: (files to copy, files present locally but no longer in the source)
+    """
+    local_files = (local or {}).get("files", {})
+    to_copy = [key for key, entry in source["files"].items()
+               if local_files.get(key, {}).get("sha256") != entry["sha256"]]
+    to_delete = [key for key in local_files if key not in source["files"]]
+    return sorted(to_copy), sorted(to_delete)
+
+def sync_models(source_root: str, local_root: str, streams: int = DEFAULT_STREAMS, delete: bool = False,
+                log_info: Callable = print, log_warning: Callable = print) -> Tuple[int, int]:
+    """
+    Bring local_root up to date with the manifest of source_root.
+
+    The local manifest records what has been synced, so the share is only
+    read for the files that differ; local files are checked for size, which
+    catches models removed by the local model cache.
+
+    Returns:
+        tuple: (files copied, files deleted)
+    """
+    source = load_manifest(manifest_path(source_root))
+    if source is None:
+        raise FileNotFoundError(f"No manifest in {source_root}; run 'build' on the model store first")
+
+    local_path = manifest_path(local_root)
+    local = load_manifest(local_path)
+    if local is not None:
+        _drop_missing_local_files(local_root, local["files"])
+
+    to_copy, to_delete = compute_delta(source, local)
+    if not to_copy and not (delete and to_delete):
+        log_info(f"{local_root} is up to date with {source_root}")
+        return 0, 0
+
+    total = sum(source["files"][key]["size"] for key in to_copy)
+    log_info(f"Sync: {len(to_copy)} file(s) to copy ({total / 1024 ** 3:.2f} GB), {len(to_delete)} stale")
+
+    os.makedirs(local_root, exist_ok=True)
+    synced = dict((local or {}).get("files", {}))
+    copied = deleted = failed = 0
+
+    for key in to_copy:
+        entry = source["files"][key]
+        try:
+            transfer = ModelTransfer(os.path.join(source_root, key), os.path.join(local_root, key), streams,
+                                     log_info=log_info, expected_sha256=entry["sha256"])
+            transfer.run()
+        except Exception as e:
+            log_warning(f"Could not copy {key}: {e}")
+            failed += 1
+            continue
+        synced[key] = entry
+        copied += 1
+        # Record progress so an interrupted sync doesn't redo finished files
+        save_manifest(local_path, {"version": MANIFEST_VERSION, "generated": time.time(), "files": synced})
+
+    if delete:
+        for key in to_delete:
+            path = os.path.join(local_root, key)
+            try:
+                for stale_path in (path, path + HASH_SIDECAR_SUFFIX):
+                    if os.path.exists(stale_path):
+                        os.remove(stale_path)
+            except OSError as e:
+                log_warning(f"Could not delete {key}: {e}")
+                continue
+            synced.pop(key, None)
+            deleted += 1
+
+    save_manifest(local_path, {"version": MANIFEST_VERSION, "generated": time.time(), "files": synced})
+
+    log_info(f"Sync finished: {copied} copied, {deleted} deleted, {failed} failed")
+    return copied, deleted
+
+def _drop_missing_local_files(local_root: str, files: Dict[str, dict]):
+    """Remove manifest entries whose local file is gone or has the wrong size"""
+    for key in list(files):
+        try:
+            size = os.path.getsize(os.path.join(local_root, key))
+        except OSError:
+            size = None
+        if size != files[key]["size"]:
+            del files[key]
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Command line entry point"""
+    parser = argparse.ArgumentParser(description="Build model store manifests and sync worker model directories")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    build = commands.add_parser("build", help="Create or update the manifest of a model root")
+    build.add_argument("root", help="Model root, e.g. X:/AI/models")
+
+    sync = commands.add_parser("sync", help="Copy files that differ from the source manifest")
+    sync.add_argument("source_root", help="Shared model root containing a manifest")
+    sync.add_argument("local_root", help="Local model root to update")
+    sync.add_argument("--streams", type=int, default=DEFAULT_STREAMS, help="Concurrent read streams per file")
+    sync.add_argument("--delete", action="store_true", help="Delete local files no longer in the source")
+
+    args = parser.parse_args(argv)
+    if args.command == "build":
+        update_manifest(args.root)
+        return 0
+
+    try:
+        sync_models(args.source_root, args.local_root, args.streams, args.delete)
+    except FileNotFoundError as e:
+        print(e, file=sys.stderr)
+        return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
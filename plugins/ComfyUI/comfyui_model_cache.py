@@ -0,0 +1,254 @@
+"""
+ComfyUI local model cache
+by Dominik Bargiel dominikbargiel97@gmail.com
+
+Keeps the local model directory under a byte budget. Every model staged into the
+cache root is recorded in an on-disk index with its size and last use; when a new
+model needs room, the least recently used models are deleted (ComfyUI then falls
+back to the network copy). Models referenced by running jobs are pinned and never
+evicted. The index is shared by all Deadline worker processes on the host and
+guarded by a lock file.
+"""
+
+import os
+import json
+import time
+import shutil
+from typing import Callable, Dict, Iterable
+
+from comfyui_models import MODEL_EXTENSIONS
+from comfyui_ports import is_process_alive
+from comfyui_transfer import HASH_SIDECAR_SUFFIX
+
+CACHE_STATE_DIRECTORY = ".deadline_model_cache"
+INDEX_FILE_NAME = "index.json"
+LOCK_FILE_NAME = "index.lock"
+PINS_DIRECTORY = "pins"
+DISK_FREE_MARGIN = 1024 ** 3  # bytes always left free on the cache volume
+LOCK_RETRY_INTERVAL = 0.1  # seconds
+
+class _IndexLock:
+    """Exclusive lock on the cache index shared between processes"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._file = None
+
+    def __enter__(self):
+        self._file = open(self.path, "a+")
+        if os.name == "nt":
+            import msvcrt
+            while True:
+                try:
+                    self._file.seek(0)
+                    msvcrt.locking(self._file.fileno(), msvcrt.LK_NBLCK, 1)
+                    break
+                except OSError:
+                    time.sleep(LOCK_RETRY_INTERVAL)
+        else:
+            import fcntl
+            fcntl.flock(self._file.fileno(), fcntl.LOCK_EX)
+        return self
+
+    def __exit__(self, *exc_info):
+        try:
+            if os.name == "nt":
+                import msvcrt
+                self._file.seek(0)
+                msvcrt.locking(self._file.fileno(), msvcrt.LK_UNLCK, 1)
+            else:
+                import fcntl
+                fcntl.flock(self._file.fileno(), fcntl.LOCK_UN)
+        finally:
+            self._file.close()
+            self._file = None
+
+class ModelCache:
+    """
+    LRU cache of model files under a root directory.
+
+    Args:
+        root: Local model root (e.g. the local ``models`` directory from extra_model_paths.yaml)
+        budget_bytes: Maximum total size of cached models; 0 disables eviction
+    """
+
+    def __init__(self, root: str, budget_bytes: int, log_info: Callable = print, log_warning: Callable = print):
+        self.root = os.path.abspath(root)
+        self.budget_bytes = budget_bytes
+        self.log_info = log_info
+        self.log_warning = log_warning
+        self.state_dir = os.path.join(self.root, CACHE_STATE_DIRECTORY)
+        self.index_path = os.path.join(self.state_dir, INDEX_FILE_NAME)
+        self.pins_dir = os.path.join(self.state_dir, PINS_DIRECTORY)
+        os.makedirs(self.pins_dir, exist_ok=True)
+
+    def contains(self, path: str) -> bool:
+        """Check whether a path lies inside the cache root"""
+        path = os.path.normcase(os.path.abspath(path))
+        root = os.path.normcase(self.root)
+        return path.startswith(root + os.sep)
+
+    def touch(self, paths: Iterable[str]):
+        """Mark cached models as used now"""
+        paths = [path for path in paths if self.contains(path)]
+        if not paths:
+            return
+        with self._lock():
+            index = self._load_index()
+            now = time.time()
+            for path in paths:
+                key = self._key(path)
+                if key in index:
+                    index[key]["last_used"] = now
+                elif os.path.isfile(path):
+                    index[key] = {"size": os.path.getsize(path), "last_used": now}
+            self._save_index(index)
+
+    def reserve(self, path: str, size: int) -> bool:
+        """
+        Make room for a model about to be staged and record it in the index.
+
+        Evicts least recently used, unpinned models until the new file fits the
+        budget and the free disk space.
+
+        Returns:
+            bool: False if enough space could not be freed; the model should not be staged
+        """
+        key = self._key(path)
+        with self._lock():
+            index = self._load_index()
+            index.pop(key, None)
+            pinned = self._pinned_keys()
+
+            used = sum(entry["size"] for entry in index.values())
+            needed = 0
+            if self.budget_bytes:
+                needed = max(needed, used + size - self.budget_bytes)
+            free = shutil.disk_usage(self.root).free
+            needed = max(needed, size + DISK_FREE_MARGIN - free)
+
+            if needed > 0:
+                freed = self._evict(index, pinned, needed)
+                if freed < needed:
+                    self._save_index(index)
+                    self.log_warning(f"Model cache: cannot free {needed / 1024 ** 3:.1f} GB for {key} "
+                                     f"(freed {freed / 1024 ** 3:.1f} GB, remaining models are pinned)")
+                    return False
+
+            index[key] = {"size": size, "last_used": time.time()}
+            self._save_index(index)
+        return True
+
+    def discard(self, path: str):
+        """Forget a reservation whose staging failed"""
+        with self._lock():
+            index = self._load_index()
+            if index.pop(self._key(path), None) is not None:
+                self._save_index(index)
+
+    def pin(self, owner: str, paths: Iterable[str]):
+        """Protect models from eviction while owner (e.g. a job ID) uses them"""
+        keys = [self._key(path) for path in paths if self.contains(path)]
+        pin_path = self._pin_path(owner)
+        temp_path = f"{pin_path}.tmp"
+        with open(temp_path, "w") as f:
+            json.dump({"pid": os.getpid(), "models": keys}, f)
+        os.replace(temp_path, pin_path)
+
+    def unpin(self, owner: str):
+        """Release the models pinned by owner"""
+        try:
+            os.remove(self._pin_path(owner))
+        except OSError:
+            pass
+
+    def usage(self) -> int:
+        """Total size of cached models in bytes"""
+        with self._lock():
+            return sum(entry["size"] for entry in self._load_index().values())
+
+    def _evict(self, index: Dict[str, dict], pinned: set, needed: int) -> int:
+        """Delete least recently used unpinned models until needed bytes are freed"""
+        freed = 0
+        for key in sorted(index, key=lambda k: index[k]["last_used"]):
+            if freed >= needed:
+                break
+            if key in pinned:
+                continue
+            path = os.path.join(self.root, key)
+            try:
+                if os.path.exists(path):
+                    os.remove(path)
+                if os.path.exists(path + HASH_SIDECAR_SUFFIX):
+                    os.remove(path + HASH_SIDECAR_SUFFIX)
+            except OSError as e:
+                # Most likely still open by a running ComfyUI process
+                self.log_warning(f"Model cache: could not evict {path}: {e}")
+                continue
+            freed += index.pop(key)["size"]
+            self.log_info(f"Model cache: evicted {key}")
+        return freed
+
+    def _pinned_keys(self) -> set:
+        """Models pinned by processes that are still alive; stale pin files are removed"""
+        pinned = set()
+        for name in os.listdir(self.pins_dir):
+            if not name.endswith(".json"):
+                continue
+            pin_path = os.path.join(self.pins_dir, name)
+            try:
+                with open(pin_path, "r") as f:
+                    pin = json.load(f)
+            except (OSError, ValueError):
+                continue
+            if not is_process_alive(pin.get("pid", 0)):
+                self.unpin(name[:-len(".json")])
+                continue
+            pinned.update(pin.get("models", []))
+        return pinned
+
+    def _load_index(self) -> Dict[str, dict]:
+        """Read the index, building it from the files on disk the first time"""
+        try:
+            with open(self.index_path, "r") as f:
+                return json.load(f).get("files", {})
+        except (OSError, ValueError):
+            return self._scan()
+
+    def _save_index(self, index: Dict[str, dict]):
+        """Write the index atomically"""
+        temp_path = f"{self.index_path}.{os.getpid()}.tmp"
+        with open(temp_path, "w") as f:
+            json.dump({"files": index}, f, indent=1)
+        os.replace(temp_path, self.index_path)
+
+    def _scan(self) -> Dict[str, dict]:
+        """Adopt model files already in the cache root, oldest modification first to evict"""
+        index = {}
+        for directory, subdirectories, files in os.walk(self.root):
+            subdirectories[:] = [d for d in subdirectories if d != CACHE_STATE_DIRECTORY]
+            for name in files:
+                if not name.lower().endswith(MODEL_EXTENSIONS):
+                    continue
+                path = os.path.join(directory, name)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                index[self._key(path)] = {"size": stat.st_size, "last_used": stat.st_mtime}
+        if index:
+            self.log_info(f"Model cache: indexed {len(index)} existing model(s) under {self.root}")
+        return index
+
+    def _lock(self) -> _IndexLock:
+        """Lock guarding the index"""
+        return _IndexLock(os.path.join(self.state_dir, LOCK_FILE_NAME))
+
+    def _key(self, path: str) -> str:
+        """Index key of a path: relative to the root, with forward slashes"""
+        return os.path.relpath(os.path.abspath(path), self.root).replace(os.sep, "/")
+
+    def _pin_path(self, owner: str) -> str:
+        """Pin file for an owner"""
+        safe_owner = "".join(c if c.isalnum() or c in "-_." else "_" for c in owner)
+        return os.path.join(self.pins_dir, f"{safe_owner}.json")
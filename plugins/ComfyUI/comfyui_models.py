@@ -0,0 +1,284 @@
+"""
+ComfyUI model prefetch
+by Dominik Bargiel dominikbargiel97@gmail.com
+
+Finds the model files a workflow's loader nodes reference, resolves them against
+ComfyUI's model search order (its own models directory plus extra_model_paths.yaml)
+and stages files that only exist on a lower priority path (usually the network
+share) into the highest priority path (usually local disk) on a background thread,
+so ComfyUI's loaders read them locally.
+"""
+
+import os
+import threading
+import time
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from comfyui_transfer import DEFAULT_STREAMS, transfer_file
+
+# File extensions ComfyUI loads models from
+MODEL_EXTENSIONS = (".ckpt", ".pt", ".pt2", ".bin", ".pth", ".safetensors", ".pkl", ".sft", ".gguf")
+
+# Loader input name -> model folder type
+MODEL_INPUT_FOLDERS = {
+    "ckpt_name": "checkpoints",
+    "unet_name": "diffusion_models",
+    "lora_name": "loras",
+    "vae_name": "vae",
+    "clip_name": "text_encoders",
+    "clip_name1": "text_encoders",
+    "clip_name2": "text_encoders",
+    "clip_name3": "text_encoders",
+    "control_net_name": "controlnet",
+    "style_model_name": "style_models",
+    "gligen_name": "gligen",
+    "hypernetwork_name": "hypernetworks",
+}
+
+# Loaders whose inputs map to a different folder than the generic mapping
+NODE_INPUT_FOLDERS = {
+    "CLIPVisionLoader": {"clip_name": "clip_vision"},
+    "UpscaleModelLoader": {"model_name": "upscale_models"},
+}
+
+# Legacy folder names ComfyUI maps onto their current names
+LEGACY_FOLDER_NAMES = {
+    "unet": "diffusion_models",
+    "clip": "text_encoders",
+}
+
+# Folders ComfyUI registers under models/ before reading extra_model_paths.yaml
+DEFAULT_MODEL_FOLDERS = {
+    "diffusion_models": ["unet", "diffusion_models"],
+    "text_encoders": ["text_encoders", "clip"],
+}
+
+def find_model_references(workflow: Dict) -> List[Tuple[str, str]]:
+    """
+    Collect the model files referenced by loader inputs of an API format workflow.
+
+    Returns:
+        list: Unique (folder type, relative filename) pairs in workflow order
+    """
+    references = []
+    for node in workflow.values():
+        if not isinstance(node, dict):
+            continue
+        overrides = NODE_INPUT_FOLDERS.get(node.get("class_type", ""), {})
+        for input_name, value in node.get("inputs", {}).items():
+            if not isinstance(value, str) or not value.lower().endswith(MODEL_EXTENSIONS):
+                continue
+            folder = overrides.get(input_name, MODEL_INPUT_FOLDERS.get(input_name))
+            if folder and (folder, value) not in references:
+                references.append((folder, value))
+    return references
+
+def parse_extra_model_paths(path: str) -> Dict[str, Dict[str, str]]:
+    """
+    Parse the subset of YAML used by extra_model_paths.yaml.
+
+    Supports top-level sections containing ``key: value`` pairs and ``key: |``
+    block scalars, which is all ComfyUI's example configs use.
+
+    Returns:
+        dict: Section name -> {key: value}; block scalars keep their line breaks
+    """
+    sections = {}
+    section = None
+    block_key = None
+    key_indent = 0
+
+    with open(path, "r", encoding="utf-8") as f:
+        lines = f.read().splitlines()
+
+    for raw in lines:
+        stripped = raw.strip()
+        indent = len(raw) - len(raw.lstrip())
+
+        if block_key is not None:
+            if not stripped:
+                continue
+            if indent > key_indent:
+                sections[section][block_key] += stripped + "\n"
+                continue
+            block_key = None
+
+        if not stripped or stripped.startswith("#"):
+            continue
+
+        if indent == 0:
+            section = stripped.rstrip(":").strip()
+            sections[section] = {}
+            continue
+
+        if section is None or ":" not in stripped:
+            continue
+
+        key, value = stripped.split(":", 1)
+        key = key.strip()
+        value = value.split(" #", 1)[0].strip()
+        if value in ("|", "|-", ">"):
+            sections[section][key] = ""
+            block_key = key
+            key_indent = indent
+        else:
+            sections[section][key] = value.strip("'\"")
+
+    return sections
+
+class ModelSearchPaths:
+    """Per-folder model search order, built the same way ComfyUI's folder_paths does"""
+
+    def __init__(self, models_dir: str):
+        self.folders: Dict[str, List[str]] = {}
+        self.models_dir = models_dir
+        self.config_files: List[str] = []
+
+    @classmethod
+    def from_comfyui(cls, comfyui_dir: str, config_files: Optional[Iterable[str]] = None) -> "ModelSearchPaths":
+        """
+        Build the search order for a ComfyUI installation.
+
+        Args:
+            comfyui_dir: Directory containing ComfyUI's main.py
+            config_files: extra_model_paths.yaml files; defaults to the one next to main.py
+        """
+        search_paths = cls(os.path.join(comfyui_dir, "models"))
+        if config_files is None:
+            config_files = [os.path.join(comfyui_dir, "extra_model_paths.yaml")]
+        for config_file in config_files:
+            if os.path.isfile(config_file):
+                search_paths.load_config(config_file)
+        return search_paths
+
+    def load_config(self, config_file: str):
+        """Add the paths from an extra_model_paths.yaml file"""
+        self.config_files.append(config_file)
+        config_dir = os.path.dirname(os.path.abspath(config_file))
+
+        for section in parse_extra_model_paths(config_file).values():
+            base_path = section.get("base_path")
+            if base_path:
+                base_path = os.path.expandvars(os.path.expanduser(base_path))
+                if not os.path.isabs(base_path):
+                    base_path = os.path.abspath(os.path.join(config_dir, base_path))
+            is_default = section.get("is_default", "").lower() == "true"
+
+            for folder, value in section.items():
+                if folder in ("base_path", "is_default"):
+                    continue
+                for line in value.splitlines():
+                    line = line.strip()
+                    if not line:
+                        continue
+                    path = os.path.normpath(os.path.join(base_path, line) if base_path else line)
+                    self.add(folder, path, is_default)
+
+    def add(self, folder: str, path: str, is_default: bool = False):
+        """Register a search path; default paths take priority over everything added before them"""
+        paths = self.get(folder)
+        if path in paths:
+            if is_default:
+                paths.remove(path)
+            else:
+                return
+        if is_default:
+            paths.insert(0, path)
+        else:
+            paths.append(path)
+
+    def get(self, folder: str) -> List[str]:
+        """Search order for a folder type"""
+        folder = LEGACY_FOLDER_NAMES.get(folder, folder)
+        if folder not in self.folders:
+            subfolders = DEFAULT_MODEL_FOLDERS.get(folder, [folder])
+            self.folders[folder] = [os.path.join(self.models_dir, name) for name in subfolders]
+        return self.folders[folder]
+
+    def locate(self, folder: str, filename: str) -> Optional[str]:
+        """First existing path for a model file, in ComfyUI's search order"""
+        for directory in self.get(folder):
+            path = os.path.join(directory, filename)
+            if os.path.isfile(path):
+                return path
+        return None
+
+class ModelPrefetcher:
+    """Stages model files into the highest priority search path on a background thread"""
+
+    def __init__(self, search_paths: ModelSearchPaths, log_info: Callable = print, log_warning: Callable = print,
+                 cache=None, streams: int = DEFAULT_STREAMS):
+        self.search_paths = search_paths
+        self.streams = streams
+        self.log_info = log_info
+        self.log_warning = log_warning
+        # Optional ModelCache that budgets and evicts staged models
+        self.cache = cache
+        self.targets: List[str] = []
+        self.staged: List[str] = []
+        self.failed: List[str] = []
+        self._thread = None
+
+    def plan(self, references: Iterable[Tuple[str, str]]) -> List[Tuple[str, str]]:
+        """
+        Work out which referenced files need staging.
+
+        Every resolved file's location in the first search path is recorded in
+        ``targets``; models already there are marked as used in the cache.
+
+        Returns:
+            list: (source, destination) pairs for files missing from the first search path
+        """
+        transfers = []
+        self.targets = []
+        for folder, filename in references:
+            search_order = self.search_paths.get(folder)
+            source = self.search_paths.locate(folder, filename)
+            if source is None:
+                self.log_warning(f"Model not found in any {folder} path: {filename}")
+                continue
+
+            destination = os.path.join(search_order[0], filename)
+            self.targets.append(destination)
+            if os.path.normcase(source) == os.path.normcase(destination):
+                continue
+            transfers.append((source, destination))
+
+        if self.cache is not None:
+            self.cache.touch(self.targets)
+        return transfers
+
+    def start(self, transfers: List[Tuple[str, str]]) -> bool:
+        """Start staging in the background. Returns False if there is nothing to do."""
+        if not transfers:
+            return False
+        self._thread = threading.Thread(target=self._run, args=(transfers,), daemon=True)
+        self._thread.start()
+        return True
+
+    def wait(self, timeout: float) -> bool:
+        """Wait for staging to finish. Returns False if it is still running after timeout."""
+        if self._thread is None:
+            return True
+        self._thread.join(timeout)
+        return not self._thread.is_alive()
+
+    def _run(self, transfers: List[Tuple[str, str]]):
+        """Copy each file, logging failures instead of raising"""
+        for source, destination in transfers:
+            cached = self.cache is not None and self.cache.contains(destination)
+            try:
+                if cached and not self.cache.reserve(destination, os.path.getsize(source)):
+                    self.log_info(f"Not staging {source}: model cache budget exhausted")
+                    continue
+                start_time = time.time()
+                size = transfer_file(source, destination, self.streams, log_info=self.log_info)
+                elapsed = max(time.time() - start_time, 0.001)
+                self.staged.append(destination)
+                self.log_info(f"Staged model {source} -> {destination} "
+                              f"({size / 1024 ** 2:.0f} MB in {elapsed:.1f}s, {size / 1024 ** 2 / elapsed:.0f} MB/s)")
+            except Exception as e:
+                self.failed.append(source)
+                self.log_warning(f"Could not stage model {source}: {e}")
+                if cached:
+                    self.cache.discard(destination)
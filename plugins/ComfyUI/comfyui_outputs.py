@@ -0,0 +1,170 @@
+"""
+ComfyUI output file watcher
+by Dominik Bargiel dominikbargiel97@gmail.com
+
+Waits for the files ComfyUI reports in a prompt's outputs to exist on disk with
+a stable size. Uses inotify to wake up early on Linux and plain stat polling
+everywhere else.
+"""
+
+import os
+import sys
+import time
+import select
+import ctypes
+import ctypes.util
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+DEFAULT_STABLE_WINDOW = 0.05  # seconds a file's size and mtime must stay unchanged
+INITIAL_POLL_INTERVAL = 0.01  # seconds
+MAX_POLL_INTERVAL = 0.5  # seconds
+
+# inotify event masks (linux/inotify.h)
+IN_MODIFY = 0x00000002
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_CLOEXEC = 0o2000000
+IN_NONBLOCK = 0o4000
+
+def output_files_from_outputs(outputs: Dict, output_dir: str) -> List[str]:
+    """
+    Resolve the files saved to the output directory from a prompt's outputs.
+
+    Args:
+        outputs: The ``outputs`` dict from /history or ``executed`` events, keyed by node ID
+        output_dir: ComfyUI's output directory
+
+    Returns:
+        list: Absolute paths of files of type 'output' (temp previews are skipped)
+    """
+    files = []
+    for node_outputs in outputs.values():
+        if not isinstance(node_outputs, dict):
+            continue
+        # 'images', 'gifs', 'videos', 'audio', ... all share the same entry shape
+        for entries in node_outputs.values():
+            if not isinstance(entries, list):
+                continue
+            for entry in entries:
+                if not isinstance(entry, dict) or "filename" not in entry:
+                    continue
+                if entry.get("type", "output") != "output":
+                    continue
+                files.append(os.path.join(output_dir, entry.get("subfolder", ""), entry["filename"]))
+    return files
+
+class _Inotify:
+    """Thin ctypes wrapper used only to wake up when watched directories change"""
+
+    def __init__(self, directories: Iterable[str]):
+        self.fd = -1
+        libc_name = ctypes.util.find_library("c") or "libc.so.6"
+        libc = ctypes.CDLL(libc_name, use_errno=True)
+        self.fd = libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+
+        mask = IN_MODIFY | IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE
+        watched = 0
+        for directory in directories:
+            if libc.inotify_add_watch(self.fd, os.fsencode(directory), mask) >= 0:
+                watched += 1
+        if not watched:
+            self.close()
+            raise OSError("No directories could be watched")
+
+    def wait(self, timeout: float):
+        """Block until a change is reported or timeout elapses"""
+        readable, _, _ = select.select([self.fd], [], [], timeout)
+        if readable:
+            try:
+                # Drain pending events; the caller re-checks the files itself
+                while os.read(self.fd, 65536):
+                    pass
+            except OSError:
+                pass
+
+    def close(self):
+        """Close the inotify descriptor"""
+        if self.fd >= 0:
+            os.close(self.fd)
+            self.fd = -1
+
+class OutputFileWatcher:
+    """Waits for output files to be completely written"""
+
+    def __init__(self, log_info: Callable = print, log_warning: Callable = print,
+                 stable_window: float = DEFAULT_STABLE_WINDOW):
+        self.log_info = log_info
+        self.log_warning = log_warning
+        self.stable_window = stable_window
+
+    def wait_for_files(self, paths: Iterable[str], timeout: float) -> Tuple[List[str], List[str]]:
+        """
+        Wait until every path exists and its size and mtime have stopped changing.
+
+        Args:
+            paths: Files to wait for
+            timeout: Maximum seconds to wait
+
+        Returns:
+            tuple: (stable files, files still missing or changing when the timeout hit)
+        """
+        # path -> ((size, mtime_ns), first time this signature was seen)
+        pending: Dict[str, Optional[tuple]] = {path: None for path in paths}
+        stable = []
+        if not pending:
+            return stable, []
+
+        deadline = time.time() + timeout
+        interval = INITIAL_POLL_INTERVAL
+        notifier = self._create_notifier(pending)
+
+        try:
+            while pending:
+                now = time.time()
+                for path in list(pending):
+                    try:
+                        stat = os.stat(path)
+                    except OSError:
+                        pending[path] = None
+                        continue
+
+                    signature = (stat.st_size, stat.st_mtime_ns)
+                    previous = pending[path]
+                    if previous is None or previous[0] != signature:
+                        pending[path] = (signature, now)
+                    elif stat.st_size > 0 and now - previous[1] >= self.stable_window:
+                        stable.append(path)
+                        del pending[path]
+
+                if not pending or now >= deadline:
+                    break
+
+                wait = min(interval, deadline - now)
+                if notifier is not None:
+                    notifier.wait(wait)
+                else:
+                    time.sleep(wait)
+                interval = min(interval * 2, MAX_POLL_INTERVAL)
+        finally:
+            if notifier is not None:
+                notifier.close()
+
+        return stable, list(pending)
+
+    def _create_notifier(self, paths: Iterable[str]) -> Optional[_Inotify]:
+        """Create an inotify watcher for the parent directories, if supported"""
+        if not sys.platform.startswith("linux"):
+            return None
+
+        directories = {os.path.dirname(path) for path in paths}
+        directories = [d for d in directories if os.path.isdir(d)]
+        if not directories:
+            return None
+
+        try:
+            return _Inotify(directories)
+        except (OSError, AttributeError):
+            return None
@@ -0,0 +1,191 @@
+"""
+ComfyUI parameter tables
+by Dominik Bargiel dominikbargiel97@gmail.com
+
+A parameter table maps task rows to values for a set of (node, input) sites, so
+a job can carry one base workflow and render a different variation per frame.
+Tables are stored column by column; arithmetic sequences and repeating value
+lists are kept as a rule instead of one value per row, so even sweeps over
+100k rows stay small. The submitter builds or imports the table (JSON or CSV)
+and ships it as an auxiliary file; the plugin applies row N to task frame N.
+
+JSON format:
+    {"version": 1, "rows": 3,
+     "sites": [["3", "seed"], ["6", "text"]],
+     "columns": [{"range": [100, 1]}, {"values": ["a cat", "a dog", "a fox"]}]}
+
+Column kinds: {"values": [...]} one value per row, {"range": [start, step]}
+start + step * row, {"cycle": [...], "repeat": k} cycle[(row // k) % len(cycle)].
+
+CSV format: a header of "node_id.input_name" cells, then one line per row.
+Cells are parsed as JSON where possible (numbers, true/false, quoted strings),
+otherwise used as plain strings.
+"""
+
+import csv
+import json
+from typing import Any, Dict, List, Sequence, Tuple
+
+PARAMETER_TABLE_VERSION = 1
+
+class ParameterTableError(ValueError):
+    """Raised when a parameter table is malformed or does not fit the workflow"""
+    pass
+
+class ParameterTable:
+    """
+    Columnar table of per-row input values.
+
+    Args:
+        rows: Number of rows (tasks) in the table
+    """
+
+    def __init__(self, rows: int):
+        if rows < 1:
+            raise ParameterTableError("A parameter table needs at least one row")
+        self.rows = rows
+        self.sites: List[Tuple[str, str]] = []
+        self.columns: List[dict] = []
+
+    def add_values(self, node_id: str, input_name: str, values: Sequence[Any]):
+        """Add a column with one value per row; integer steps of constant size are stored as a range"""
+        values = list(values)
+        if len(values) != self.rows:
+            raise ParameterTableError(f"Column {node_id}.{input_name} has {len(values)} values for {self.rows} rows")
+        self._add(node_id, input_name, _compact_column(values))
+
+    def add_range(self, node_id: str, input_name: str, start: float, step: float = 1):
+        """Add a column with the value start + step * row"""
+        self._add(node_id, input_name, {"range": [start, step]})
+
+    def add_cycle(self, node_id: str, input_name: str, values: Sequence[Any], repeat: int = 1):
+        """Add a column that repeats each value repeat times, cycling through values"""
+        if not values or repeat < 1:
+            raise ParameterTableError(f"Column {node_id}.{input_name} needs values and repeat >= 1")
+        self._add(node_id, input_name, {"cycle": list(values), "repeat": repeat})
+
+    def _add(self, node_id: str, input_name: str, column: dict):
+        """Append a column for a site that is not in the table yet"""
+        site = (str(node_id), input_name)
+        if site in self.sites:
+            raise ParameterTableError(f"Duplicate column {site[0]}.{site[1]}")
+        self.sites.append(site)
+        self.columns.append(column)
+
+    def value(self, column_index: int, row: int) -> Any:
+        """Value of a column for a row"""
+        if not 0 <= row < self.rows:
+            raise ParameterTableError(f"Row {row} is outside the table (0-{self.rows - 1})")
+        column = self.columns[column_index]
+        if "range" in column:
+            start, step = column["range"]
+            return start + step * row
+        if "cycle" in column:
+            cycle = column["cycle"]
+            return cycle[(row // column.get("repeat", 1)) % len(cycle)]
+        return column["values"][row]
+
+    def row(self, row: int) -> List[Any]:
+        """Values of all columns for a row, in site order"""
+        return [self.value(index, row) for index in range(len(self.columns))]
+
+    def apply(self, workflow: Dict[str, dict], row: int) -> List[Tuple[str, str, Any]]:
+        """
+        Write a row's values into the workflow.
+
+        Returns:
+            list: (node_id, input_name, value) for every site that was set
+        """
+        applied = []
+        for (node_id, input_name), value in zip(self.sites, self.row(row)):
+            workflow[node_id].setdefault("inputs", {})[input_name] = value
+            applied.append((node_id, input_name, value))
+        return applied
+
+    def validate(self, workflow: Dict[str, dict]):
+        """Check that every site's node exists in the workflow"""
+        missing = [f"{node_id}.{input_name}" for node_id, input_name in self.sites if node_id not in workflow]
+        if missing:
+            raise ParameterTableError(f"Parameter table references nodes missing from the workflow: {', '.join(missing)}")
+
+    def to_dict(self) -> dict:
+        """JSON-serializable form of the table"""
+        return {
+            "version": PARAMETER_TABLE_VERSION,
+            "rows": self.rows,
+            "sites": [list(site) for site in self.sites],
+            "columns": self.columns,
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "ParameterTable":
+        """Build a table from its JSON form"""
+        if data.get("version") != PARAMETER_TABLE_VERSION:
+            raise ParameterTableError(f"Unsupported parameter table version: {data.get('version')}")
+        sites, columns = data.get("sites", []), data.get("columns", [])
+        if len(sites) != len(columns):
+            raise ParameterTableError(f"Parameter table has {len(sites)} sites but {len(columns)} columns")
+
+        table = cls(int(data.get("rows", 0)))
+        for (node_id, input_name), column in zip(sites, columns):
+            if "values" in column and len(column["values"]) != table.rows:
+                raise ParameterTableError(f"Column {node_id}.{input_name} has {len(column['values'])} values for {table.rows} rows")
+            if not any(kind in column for kind in ("values", "range", "cycle")):
+                raise ParameterTableError(f"Column {node_id}.{input_name} has no values")
+            table._add(node_id, input_name, column)
+        return table
+
+    def save(self, path: str):
+        """Write the table as compact JSON"""
+        with open(path, "w") as f:
+            json.dump(self.to_dict(), f, separators=(",", ":"))
+
+    @classmethod
+    def load(cls, path: str) -> "ParameterTable":
+        """Read a table from a JSON file, or import it from a CSV file"""
+        if path.lower().endswith(".csv"):
+            return cls.from_csv(path)
+        with open(path, "r") as f:
+            return cls.from_dict(json.load(f))
+
+    @classmethod
+    def from_csv(cls, path: str) -> "ParameterTable":
+        """Import a table from a CSV file with "node_id.input_name" headers"""
+        with open(path, "r", newline="") as f:
+            reader = csv.reader(f)
+            try:
+                header = next(reader)
+            except StopIteration:
+                raise ParameterTableError(f"Parameter table {path} is empty")
+            lines = [line for line in reader if any(cell.strip() for cell in line)]
+
+        sites = []
+        for cell in header:
+            node_id, separator, input_name = cell.strip().partition(".")
+            if not separator or not node_id or not input_name:
+                raise ParameterTableError(f"Column header '{cell}' is not in node_id.input_name form")
+            sites.append((node_id, input_name))
+
+        table = cls(len(lines))
+        for index, (node_id, input_name) in enumerate(sites):
+            try:
+                values = [_parse_cell(line[index]) for line in lines]
+            except IndexError:
+                raise ParameterTableError(f"Parameter table {path} has rows with missing {node_id}.{input_name} cells")
+            table.add_values(node_id, input_name, values)
+        return table
+
+def _parse_cell(cell: str) -> Any:
+    """Parse a CSV cell as JSON, falling back to the raw string"""
+    try:
+        return json.loads(cell)
+    except ValueError:
+        return cell
+
+def _compact_column(values: List[Any]) -> dict:
+    """Store integer columns with a constant step as a range"""
+    if len(values) > 1 and all(type(value) is int for value in values):
+        step = values[1] - values[0]
+        if all(values[i + 1] - values[i] == step for i in range(len(values) - 1)):
+            return {"range": [values[0], step]}
+    return {"values": values}
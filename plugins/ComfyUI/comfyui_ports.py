@@ -0,0 +1,189 @@
+"""
+ComfyUI port leases
+by Dominik Bargiel dominikbargiel97@gmail.com
+
+Host-wide port allocation for ComfyUI instances started by Deadline. A port is
+reserved by atomically creating a lease file in a shared temp directory, so
+concurrent tasks on the same machine never pick the same port. Leases left
+behind by processes that no longer exist are reclaimed.
+"""
+
+import os
+import sys
+import json
+import time
+import socket
+import tempfile
+import threading
+from typing import Callable, Optional
+
+DEFAULT_LEASE_DIRECTORY = os.path.join(tempfile.gettempdir(), "comfyui_deadline_ports")
+DEFAULT_SEARCH_RANGE = 100
+UNREADABLE_LEASE_TIMEOUT = 10  # seconds before an unreadable lease file counts as abandoned
+
+def is_process_alive(pid: int) -> bool:
+    """Check whether a process with the given PID is still running"""
+    if pid <= 0:
+        return False
+
+    if sys.platform.startswith("win"):
+        import ctypes
+        PROCESS_QUERY_LIMITED_INFORMATION = 0x1000
+        STILL_ACTIVE = 259
+        kernel32 = ctypes.windll.kernel32
+        handle = kernel32.OpenProcess(PROCESS_QUERY_LIMITED_INFORMATION, False, pid)
+        if not handle:
+            return False
+        try:
+            exit_code = ctypes.c_ulong()
+            if not kernel32.GetExitCodeProcess(handle, ctypes.byref(exit_code)):
+                return True
+            return exit_code.value == STILL_ACTIVE
+        finally:
+            kernel32.CloseHandle(handle)
+
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        # Exists but owned by another user
+        return True
+    return True
+
+def is_port_bindable(port: int) -> bool:
+    """Check that nothing is listening on the port by binding to it"""
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
+        if os.name != "nt":
+            # Mirror the SO_REUSEADDR ComfyUI's server uses so TIME_WAIT sockets don't block us
+            s.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        try:
+            s.bind(("0.0.0.0", port))
+        except OSError:
+            return False
+    return True
+
+class PortLeaseRegistry:
+    """Lock-file based port leases shared by every process on the host"""
+
+    def __init__(self, directory: str = DEFAULT_LEASE_DIRECTORY, log_info: Callable = print):
+        self.directory = directory
+        self.log_info = log_info
+        os.makedirs(self.directory, exist_ok=True)
+
+    def acquire(self, start_port: int, owner: str, search_range: int = DEFAULT_SEARCH_RANGE) -> Optional[int]:
+        """
+        Lease the first free port at or after start_port.
+
+        Args:
+            start_port: Preferred port (normally unique per GPU and worker thread)
+            owner: Identifies the lease holder, e.g. worker name and thread number.
+                   A lease already held by the same owner in this process is reused.
+            search_range: Number of ports to try
+
+        Returns:
+            int: The leased port, or None if no port could be leased
+        """
+        for port in range(start_port, start_port + search_range):
+            if self._try_lease(port, owner):
+                if is_port_bindable(port):
+                    return port
+                # Leased but something outside the registry is listening on it
+                self.release(port)
+        return None
+
+    def release(self, port: int):
+        """Release a lease held by this process"""
+        path = self._lease_path(port)
+        lease = self._read_lease(path)
+        if lease is not None and lease.get("pid") == os.getpid():
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+    def _try_lease(self, port: int, owner: str) -> bool:
+        """Create the lease file for a port, reclaiming it if its holder is gone"""
+        path = self._lease_path(port)
+
+        for _ in range(2):
+            if self._create_lease(path, owner):
+                return True
+
+            lease = self._read_lease(path)
+            if lease is None:
+                # Leases are written before they appear, so an unreadable one was left
+                # by a crash or an interrupted write; give a slow filesystem some time
+                try:
+                    age = time.time() - os.path.getmtime(path)
+                except OSError:
+                    continue  # Released in the meantime
+                if age < UNREADABLE_LEASE_TIMEOUT or not self._reclaim(path, None):
+                    return False
+                self.log_info(f"Reclaimed unreadable lease on port {port}")
+                continue
+            if lease.get("pid") == os.getpid() and lease.get("owner") == owner:
+                return True
+            if is_process_alive(lease.get("pid", 0)):
+                return False
+            if not self._reclaim(path, lease):
+                return False
+            self.log_info(f"Reclaimed stale lease on port {port} from dead process {lease.get('pid')}")
+
+        return False
+
+    def _create_lease(self, path: str, owner: str) -> bool:
+        """
+        Create a lease file only if none exists.
+
+        The lease is written to a temporary file and hard-linked into place, so
+        a lease file is never seen empty or half written.
+        """
+        temp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            with open(temp_path, "w") as f:
+                json.dump({"pid": os.getpid(), "owner": owner, "created": time.time()}, f)
+            os.link(temp_path, path)
+            return True
+        except FileExistsError:
+            return False
+        finally:
+            try:
+                os.remove(temp_path)
+            except OSError:
+                pass
+
+    def _reclaim(self, path: str, stale_lease: dict) -> bool:
+        """Atomically move a stale lease out of the way"""
+        claimed_path = f"{path}.reclaim.{os.getpid()}"
+        try:
+            os.rename(path, claimed_path)
+        except OSError:
+            return False
+
+        # Another process may have replaced the stale lease between our read and rename
+        if self._read_lease(claimed_path) != stale_lease:
+            try:
+                os.rename(claimed_path, path)
+            except OSError:
+                pass
+            return False
+
+        try:
+            os.remove(claimed_path)
+        except OSError:
+            pass
+        return True
+
+    def _lease_path(self, port: int) -> str:
+        """Path of the lease file for a port"""
+        return os.path.join(self.directory, f"{port}.lease")
+
+    @staticmethod
+    def _read_lease(path: str) -> Optional[dict]:
+        """Read a lease file, returning None if missing or incomplete"""
+        try:
+            with open(path, "r") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
@@ -0,0 +1,230 @@
+"""
+ComfyUI prompt templating
+by Dominik Bargiel dominikbargiel97@gmail.com
+
+Builds the /prompt request bodies for every prompt in a chunk from a single
+pre-serialized template, patching only the (node, input) sites that differ
+between prompts instead of deep-copying and re-serializing the whole graph, and
+orders the prompts so ComfyUI's node cache is reused as much as possible.
+"""
+
+import json
+import uuid
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from comfyui_workflow import is_link
+
+class PromptPatchPlan:
+    """
+    Pre-serialized /prompt request body with placeholders at the varying inputs.
+
+    Args:
+        workflow: API format workflow (node ID -> node)
+        client_id: Client ID sent with every prompt
+        sites: (node_id, input_name) pairs whose values change per prompt
+    """
+
+    def __init__(self, workflow: Dict[str, Any], client_id: str, sites: Sequence[Tuple[str, str]]):
+        self.sites = list(sites)
+        token = uuid.uuid4().hex
+        placeholders = [f"__deadline_patch_{token}_{index}__" for index in range(len(self.sites))]
+
+        # Only the nodes being patched are copied; everything else is shared
+        template = dict(workflow)
+        for (node_id, input_name), placeholder in zip(self.sites, placeholders):
+            node = dict(template[node_id])
+            node["inputs"] = dict(node.get("inputs", {}))
+            node["inputs"][input_name] = placeholder
+            template[node_id] = node
+
+        serialized = json.dumps({"prompt": template, "client_id": client_id})
+
+        # Split the serialized body at each placeholder, remembering which site it belongs to
+        self._segments: List[str] = []
+        self._order: List[int] = []
+        positions = sorted(
+            (serialized.index(json.dumps(placeholder)), index)
+            for index, placeholder in enumerate(placeholders)
+        )
+        cursor = 0
+        for position, index in positions:
+            self._segments.append(serialized[cursor:position])
+            self._order.append(index)
+            cursor = position + len(json.dumps(placeholders[index]))
+        self._segments.append(serialized[cursor:])
+
+    def render(self, values: Sequence[Any]) -> bytes:
+        """Produce a request body with values[i] substituted at sites[i]"""
+        if len(values) != len(self.sites):
+            raise ValueError(f"Expected {len(self.sites)} values, got {len(values)}")
+
+        parts = [self._segments[0]]
+        for segment, index in zip(self._segments[1:], self._order):
+            parts.append(json.dumps(values[index]))
+            parts.append(segment)
+        return "".join(parts).encode("utf-8")
+
+# Samplers whose seed drives the noise for a whole latent batch: class -> (seed input, latent input)
+BATCHABLE_SAMPLERS = {
+    "KSampler": ("seed", "latent_image"),
+    "KSamplerAdvanced": ("noise_seed", "latent_image"),
+    "SamplerCustom": ("noise_seed", "latent_image"),
+}
+
+# Empty latent nodes with a batch_size input
+EMPTY_LATENT_NODE_TYPES = ["EmptyLatentImage", "EmptySD3LatentImage"]
+
+def plan_latent_fold(workflow: Dict[str, Any], sites: Sequence[Tuple[str, str]]) -> Tuple[Optional[List[str]], str]:
+    """
+    Check whether the prompts of a chunk can be rendered as one batched prompt.
+
+    Folding is only possible when the only inputs that vary per prompt are
+    sampler seeds (directly or through DeadlineSeed nodes) and every affected
+    sampler starts from an empty latent with batch_size 1.
+
+    Returns:
+        tuple: (IDs of the empty latent nodes to enlarge, or None; reason when not foldable)
+    """
+    if not sites:
+        return None, "no inputs vary between prompts"
+
+    consumers: Dict[str, List[Tuple[str, str]]] = {}
+    for node_id, node in workflow.items():
+        if not isinstance(node, dict):
+            continue
+        for input_name, value in node.get("inputs", {}).items():
+            if is_link(value):
+                consumers.setdefault(str(value[0]), []).append((node_id, input_name))
+
+    samplers = set()
+    for node_id, input_name in sites:
+        class_type = workflow[node_id].get("class_type", "")
+        if class_type in BATCHABLE_SAMPLERS and input_name == BATCHABLE_SAMPLERS[class_type][0]:
+            samplers.add(node_id)
+        elif class_type == "DeadlineSeed" and input_name == "task_id":
+            for consumer_id, consumer_input in consumers.get(node_id, []):
+                consumer_type = workflow[consumer_id].get("class_type", "")
+                if consumer_type not in BATCHABLE_SAMPLERS or consumer_input != BATCHABLE_SAMPLERS[consumer_type][0]:
+                    return None, f"DeadlineSeed node {node_id} feeds {consumer_type}.{consumer_input}"
+                samplers.add(consumer_id)
+        else:
+            return None, f"{class_type}.{input_name} on node {node_id} varies per prompt"
+
+    latent_nodes = set()
+    for sampler_id in samplers:
+        sampler = workflow[sampler_id]
+        latent_input = sampler.get("inputs", {}).get(BATCHABLE_SAMPLERS[sampler["class_type"]][1])
+        if not is_link(latent_input):
+            return None, f"sampler {sampler_id} has no linked latent input"
+
+        latent_id = str(latent_input[0])
+        latent_node = workflow.get(latent_id, {})
+        if latent_node.get("class_type") not in EMPTY_LATENT_NODE_TYPES:
+            return None, f"sampler {sampler_id} does not start from an empty latent"
+        if latent_node.get("inputs", {}).get("batch_size", 1) != 1:
+            return None, f"latent node {latent_id} already has batch_size > 1"
+        latent_nodes.add(latent_id)
+
+    if not latent_nodes:
+        # Only DeadlineSeed nodes without sampler consumers vary; nothing to batch
+        return None, "no sampler seed varies between prompts"
+    return sorted(latent_nodes), ""
+
+def fold_latent_batch(workflow: Dict[str, Any], latent_nodes: Sequence[str], batch_size: int) -> Dict[str, Any]:
+    """Return a copy of the workflow with the given empty latent nodes set to batch_size"""
+    folded = dict(workflow)
+    for node_id in latent_nodes:
+        node = dict(folded[node_id])
+        node["inputs"] = dict(node.get("inputs", {}))
+        node["inputs"]["batch_size"] = batch_size
+        folded[node_id] = node
+    return folded
+
+# Relative cost of recomputing a node, used to order prompts for ComfyUI's node cache
+NODE_RECOMPUTE_WEIGHTS = {
+    "CheckpointLoaderSimple": 100,
+    "CheckpointLoader": 100,
+    "UNETLoader": 100,
+    "CLIPLoader": 40,
+    "DualCLIPLoader": 40,
+    "VAELoader": 20,
+    "LoraLoader": 30,
+    "LoraLoaderModelOnly": 30,
+    "ControlNetLoader": 30,
+    "UpscaleModelLoader": 20,
+    "CLIPVisionLoader": 20,
+    "KSampler": 50,
+    "KSamplerAdvanced": 50,
+    "SamplerCustom": 50,
+    "SamplerCustomAdvanced": 50,
+    "CLIPTextEncode": 5,
+    "VAEDecode": 10,
+    "VAEEncode": 10,
+}
+DEFAULT_RECOMPUTE_WEIGHT = 1
+
+def _downstream_nodes(workflow: Dict[str, Any], node_id: str) -> set:
+    """The node and every node that (transitively) consumes its outputs"""
+    consumers: Dict[str, List[str]] = {}
+    for consumer_id, node in workflow.items():
+        if not isinstance(node, dict):
+            continue
+        for value in node.get("inputs", {}).values():
+            if is_link(value):
+                consumers.setdefault(str(value[0]), []).append(consumer_id)
+
+    reached = {node_id}
+    pending = [node_id]
+    while pending:
+        for consumer_id in consumers.get(pending.pop(), []):
+            if consumer_id not in reached:
+                reached.add(consumer_id)
+                pending.append(consumer_id)
+    return reached
+
+def order_prompts_for_cache(workflow: Dict[str, Any], sites: Sequence[Tuple[str, str]],
+                            prompt_values: Sequence[Sequence[Any]]) -> List[int]:
+    """
+    Order the prompts of a chunk so consecutive prompts share as much of the graph as possible.
+
+    ComfyUI reuses a node's cached output when none of its inputs (including
+    upstream nodes) changed since the previous prompt. The cost of moving from
+    one prompt to another is the summed weight of every node downstream of an
+    input whose value differs; prompts are ordered greedily by the cheapest next
+    step, starting with the first prompt. Ties keep the original order.
+
+    Args:
+        workflow: API format workflow
+        sites: (node_id, input_name) pairs that vary per prompt
+        prompt_values: prompt_values[i][s] is the value of sites[s] in prompt i
+
+    Returns:
+        list: Prompt indices in queue order
+    """
+    count = len(prompt_values)
+    if count <= 2 or not sites:
+        return list(range(count))
+
+    # Per site: weight of every node that must be recomputed when the site's value changes
+    site_weights = []
+    for node_id, _ in sites:
+        site_weights.append({
+            affected_id: NODE_RECOMPUTE_WEIGHTS.get(workflow[affected_id].get("class_type", ""), DEFAULT_RECOMPUTE_WEIGHT)
+            for affected_id in _downstream_nodes(workflow, node_id)
+        })
+
+    def transition_cost(a: int, b: int) -> int:
+        affected = {}
+        for index, weights in enumerate(site_weights):
+            if prompt_values[a][index] != prompt_values[b][index]:
+                affected.update(weights)
+        return sum(affected.values())
+
+    order = [0]
+    remaining = list(range(1, count))
+    while remaining:
+        current = order[-1]
+        best = min(remaining, key=lambda candidate: (transition_cost(current, candidate), candidate))
+        order.append(best)
+        remaining.remove(best)
+    return order
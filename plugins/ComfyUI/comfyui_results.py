@@ -0,0 +1,161 @@
+"""
+ComfyUI result cache
+by Dominik Bargiel dominikbargiel97@gmail.com
+
+Content-addressed store of rendered outputs on shared storage. The key is a
+canonical hash of everything that determines a task's images: the resolved API
+prompt, the values patched into each prompt of the chunk and the identity of
+every model file it loads. A task whose key is already stored gets its outputs
+copied from the cache instead of being rendered again.
+"""
+
+import os
+import json
+import time
+import shutil
+import hashlib
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from comfyui_models import ModelSearchPaths, find_model_references
+from comfyui_transfer import read_hash_sidecar
+from comfyui_workflow import canonical_json
+
+RESULT_CACHE_VERSION = 1
+ENTRY_FILE_NAME = "entry.json"
+
+def canonical_prompt(workflow: Dict[str, Any]) -> Dict[str, Any]:
+    """Drop data that does not affect execution (node titles and other UI metadata)"""
+    return {
+        str(node_id): {key: value for key, value in node.items() if key != "_meta"}
+        for node_id, node in workflow.items()
+        if isinstance(node, dict)
+    }
+
+def model_fingerprints(workflow: Dict[str, Any], search_paths: ModelSearchPaths) -> Dict[str, str]:
+    """
+    Identify the content of every model file the workflow loads.
+
+    Uses the SHA-256 from a ``.sha256`` sidecar when one is present and falls
+    back to size and modification time otherwise, so no model is read.
+    """
+    fingerprints = {}
+    for folder, filename in find_model_references(workflow):
+        path = search_paths.locate(folder, filename)
+        key = f"{folder}/{filename}"
+        if path is None:
+            fingerprints[key] = "missing"
+            continue
+        digest = read_hash_sidecar(path)
+        if digest:
+            fingerprints[key] = f"sha256:{digest}"
+        else:
+            stat = os.stat(path)
+            fingerprints[key] = f"stat:{stat.st_size}:{stat.st_mtime_ns}"
+    return fingerprints
+
+def result_cache_key(workflow: Dict[str, Any], sites: Sequence[Tuple[str, str]],
+                     prompt_values: Sequence[Sequence[Any]], models: Dict[str, str],
+                     options: Optional[Dict[str, Any]] = None) -> str:
+    """
+    Hash everything that determines the outputs of a task.
+
+    Args:
+        workflow: Resolved API prompt of the chunk's first prompt
+        sites: (node_id, input_name) pairs patched per prompt
+        prompt_values: Values of the sites for every prompt in chunk order
+        models: Model fingerprints from model_fingerprints()
+        options: Other settings that change the outputs (e.g. latent batch folding)
+    """
+    payload = {
+        "version": RESULT_CACHE_VERSION,
+        "prompt": canonical_prompt(workflow),
+        "sites": [list(site) for site in sites],
+        "values": [list(values) for values in prompt_values],
+        "models": models,
+        "options": options or {},
+    }
+    return hashlib.sha256(canonical_json(payload).encode("utf-8")).hexdigest()
+
+class ResultCache:
+    """Output files stored by cache key under a shared directory"""
+
+    def __init__(self, directory: str):
+        self.directory = directory
+
+    def entry_path(self, key: str) -> str:
+        """Directory holding the outputs for a key"""
+        return os.path.join(self.directory, key[:2], key)
+
+    def lookup(self, key: str) -> Optional[dict]:
+        """Return the stored entry for a key, or None on a miss"""
+        try:
+            with open(os.path.join(self.entry_path(key), ENTRY_FILE_NAME), "r") as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+        entry_dir = self.entry_path(key)
+        if not all(os.path.isfile(os.path.join(entry_dir, name)) for name in entry.get("files", [])):
+            return None
+        return entry
+
+    def restore(self, key: str, entry: dict, output_dir: str) -> List[str]:
+        """
+        Copy a cached entry's files into the output directory.
+
+        Existing files with the same name are never overwritten; the restored
+        file gets a numbered name instead.
+
+        Returns:
+            list: Paths of the restored files
+        """
+        entry_dir = self.entry_path(key)
+        restored = []
+        for name in entry.get("files", []):
+            source = os.path.join(entry_dir, name)
+            destination = _unused_path(os.path.join(output_dir, name))
+            os.makedirs(os.path.dirname(destination), exist_ok=True)
+            shutil.copy2(source, destination)
+            restored.append(destination)
+        return restored
+
+    def store(self, key: str, files: Sequence[str], output_dir: str, metadata: Optional[dict] = None) -> bool:
+        """
+        Store output files (paths inside output_dir) under a key.
+
+        Entries are written to a temporary directory and renamed into place, so
+        concurrent tasks storing the same key never expose a partial entry.
+
+        Returns:
+            bool: False if an entry for the key already exists
+        """
+        entry_dir = self.entry_path(key)
+        if os.path.isdir(entry_dir):
+            return False
+
+        names = [os.path.relpath(path, output_dir).replace(os.sep, "/") for path in files]
+        temp_dir = f"{entry_dir}.{os.getpid()}.tmp"
+        try:
+            for path, name in zip(files, names):
+                destination = os.path.join(temp_dir, name)
+                os.makedirs(os.path.dirname(destination), exist_ok=True)
+                shutil.copy2(path, destination)
+            with open(os.path.join(temp_dir, ENTRY_FILE_NAME), "w") as f:
+                json.dump(dict(metadata or {}, files=names, created=time.time()), f, indent=1)
+            os.rename(temp_dir, entry_dir)
+        except OSError:
+            shutil.rmtree(temp_dir, ignore_errors=True)
+            if os.path.isdir(entry_dir):
+                # Another task stored the same key first
+                return False
+            raise
+        return True
+
+def _unused_path(path: str) -> str:
+    """Return path, or a numbered variant of it if the file already exists"""
+    if not os.path.exists(path):
+        return path
+    base, extension = os.path.splitext(path)
+    counter = 1
+    while os.path.exists(f"{base}_cached_{counter}{extension}"):
+        counter += 1
+    return f"{base}_cached_{counter}{extension}"
@@ -0,0 +1,134 @@
+"""
+ComfyUI parameter sweeps
+by Dominik Bargiel dominikbargiel97@gmail.com
+
+Expands DeadlineSweep nodes into one value per Deadline task. Every sweep node
+lies on an axis: nodes sharing an axis name advance together (zip), different
+axes are combined as a cartesian product, the last axis varying fastest. The
+submitter uses the plan to set the task count; the plugin uses it to inject
+each node's position on its axis for the task's frame.
+"""
+
+import re
+import math
+from typing import Any, Dict, List, Tuple
+
+SWEEP_NODE_TYPES = ("DeadlineSweepInt", "DeadlineSweepFloat", "DeadlineSweepString", "DeadlineSweepCombo")
+FLOAT_PRECISION = 10  # decimal places kept in float ranges, so 0.1 steps don't drift
+
+class SweepError(ValueError):
+    """Raised when a sweep node's settings do not describe any values"""
+    pass
+
+def is_sweep_node(node: Any) -> bool:
+    """Check if a workflow node is a sweep node"""
+    return isinstance(node, dict) and node.get("class_type") in SWEEP_NODE_TYPES
+
+def sweep_values(class_type: str, inputs: Dict[str, Any]) -> List[Any]:
+    """
+    Expand a sweep node's settings into its list of values.
+
+    Ranges include stop. Lists are separated by commas or new lines for numbers
+    and by new lines for strings.
+    """
+    if class_type in ("DeadlineSweepString", "DeadlineSweepCombo"):
+        values = [line.strip() for line in str(inputs.get("values", "")).splitlines() if line.strip()]
+    else:
+        number = int if class_type == "DeadlineSweepInt" else float
+        if inputs.get("mode", "range") == "range":
+            values = _number_range(number, inputs.get("start", 0), inputs.get("stop", 0), inputs.get("step", 1))
+        else:
+            try:
+                values = [number(item) for item in re.split(r"[,\n]", str(inputs.get("values", ""))) if item.strip()]
+            except ValueError as e:
+                raise SweepError(f"Invalid {number.__name__} in sweep list: {e}")
+
+    if not values:
+        raise SweepError(f"{class_type} has no values")
+    return values
+
+def _number_range(number: type, start: Any, stop: Any, step: Any) -> List[Any]:
+    """Values from start to stop inclusive"""
+    start, stop, step = number(start), number(stop), number(step)
+    if step == 0:
+        raise SweepError("Sweep step must not be 0")
+    # floor, not int(): a range reversed by less than one step must come out empty
+    count = math.floor((stop - start) / step + 1e-9) + 1
+    if count < 1:
+        raise SweepError(f"Sweep range {start} to {stop} with step {step} is empty")
+    if number is int:
+        return [start + step * i for i in range(count)]
+    return [round(start + step * i, FLOAT_PRECISION) for i in range(count)]
+
+class SweepPlan:
+    """
+    Task layout of all sweep nodes in a workflow.
+
+    Args:
+        axes: (axis name, length, node IDs) in product order
+    """
+
+    def __init__(self, axes: List[Tuple[str, int, List[str]]]):
+        self.axes = axes
+
+    @property
+    def total(self) -> int:
+        """Number of tasks needed to cover every combination"""
+        total = 1
+        for _, length, _ in self.axes:
+            total *= length
+        return total
+
+    def node_indices(self, index: int) -> Dict[str, int]:
+        """Position of every sweep node on its axis for a task index"""
+        if not 0 <= index < self.total:
+            raise SweepError(f"Task index {index} is outside the sweep (0-{self.total - 1})")
+        positions = {}
+        for _, length, node_ids in reversed(self.axes):
+            index, position = divmod(index, length)
+            for node_id in node_ids:
+                positions[node_id] = position
+        return positions
+
+def plan_sweep(workflow: Dict[str, Any]) -> SweepPlan:
+    """
+    Group the workflow's sweep nodes into axes.
+
+    Nodes with an empty axis name get an axis of their own. Axes are ordered
+    by name (unnamed axes by node ID), so the submitter and the plugin agree
+    on the layout.
+
+    Raises:
+        SweepError: If settings are linked from other nodes, or zipped nodes differ in length
+    """
+    axes: Dict[str, List[Tuple[str, int]]] = {}
+    for node_id, node in workflow.items():
+        if not is_sweep_node(node):
+            continue
+        inputs = node.get("inputs", {})
+        linked = [name for name, value in inputs.items() if isinstance(value, list)]
+        if linked:
+            raise SweepError(f"Sweep node {node_id} has linked settings ({', '.join(linked)}); sweeps need widget values")
+
+        length = len(sweep_values(node["class_type"], inputs))
+        axis = str(inputs.get("axis", "")).strip() or f"~node {node_id}"
+        axes.setdefault(axis, []).append((str(node_id), length))
+
+    ordered = []
+    for axis in sorted(axes, key=_axis_sort_key):
+        lengths = {length for _, length in axes[axis]}
+        if len(lengths) > 1:
+            members = ", ".join(f"{node_id} ({length})" for node_id, length in axes[axis])
+            raise SweepError(f"Sweep nodes zipped on axis '{axis}' have different numbers of values: {members}")
+        ordered.append((axis, lengths.pop(), sorted((node_id for node_id, _ in axes[axis]), key=_node_sort_key)))
+    return SweepPlan(ordered)
+
+def _axis_sort_key(axis: str) -> Tuple:
+    """Named axes first by name, then unnamed axes by node ID"""
+    if axis.startswith("~node "):
+        return (1,) + _node_sort_key(axis[len("~node "):])
+    return (0, axis)
+
+def _node_sort_key(node_id: str) -> Tuple:
+    """Order numeric node IDs numerically"""
+    return (0, int(node_id), "") if node_id.isdigit() else (1, 0, node_id)
@@ -0,0 +1,255 @@
+"""
+ComfyUI model transfer engine
+by Dominik Bargiel dominikbargiel97@gmail.com
+
+Copies large model files with several concurrent range streams into a
+``.partial`` file, records finished blocks so an interrupted copy resumes where
+it stopped, verifies the result against a SHA-256 sidecar and only then renames
+it into place, so a partially copied or corrupted model is never loaded.
+"""
+
+import os
+import json
+import time
+import hashlib
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Optional
+
+from comfyui_ports import is_process_alive
+
+DEFAULT_STREAMS = 4
+DEFAULT_BLOCK_SIZE = 64 * 1024 * 1024  # bytes per range stream request
+READ_SIZE = 8 * 1024 * 1024  # bytes per read call
+HASH_SIDECAR_SUFFIX = ".sha256"
+PARTIAL_SUFFIX = ".partial"
+STATE_SUFFIX = ".partial.json"
+LOCK_SUFFIX = ".partial.lock"
+LOCK_POLL_INTERVAL = 1.0  # seconds between checks while another process copies the same file
+UNREADABLE_LOCK_TIMEOUT = 10  # seconds before an unreadable lock file counts as abandoned
+
+class TransferError(Exception):
+    """Raised when a transfer fails or the copied file does not match its hash"""
+    pass
+
+def read_hash_sidecar(path: str) -> Optional[str]:
+    """Read the hex digest from a ``<file>.sha256`` sidecar (sha256sum format), if present"""
+    try:
+        with open(path + HASH_SIDECAR_SUFFIX, "r") as f:
+            content = f.read().split()
+    except OSError:
+        return None
+    if content and len(content[0]) == 64:
+        return content[0].lower()
+    return None
+
+def write_hash_sidecar(path: str, digest: str):
+    """Write a ``<file>.sha256`` sidecar in sha256sum format"""
+    temp_path = f"{path}{HASH_SIDECAR_SUFFIX}.tmp"
+    with open(temp_path, "w") as f:
+        f.write(f"{digest}  {os.path.basename(path)}\n")
+    os.replace(temp_path, path + HASH_SIDECAR_SUFFIX)
+
+def hash_file(path: str) -> str:
+    """SHA-256 hex digest of a file"""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        while True:
+            data = f.read(READ_SIZE)
+            if not data:
+                break
+            digest.update(data)
+    return digest.hexdigest()
+
+class ModelTransfer:
+    """
+    Resumable multi-stream copy of a single file.
+
+    Args:
+        source: File to copy, usually on the network share
+        destination: Final local path
+        streams: Number of concurrent range streams
+        block_size: Bytes copied per range request; finished blocks are checkpointed
+        expected_sha256: Known digest of the source (e.g. from a manifest); defaults to its .sha256 sidecar
+    """
+
+    def __init__(self, source: str, destination: str, streams: int = DEFAULT_STREAMS,
+                 block_size: int = DEFAULT_BLOCK_SIZE, log_info: Callable = print,
+                 expected_sha256: Optional[str] = None):
+        self.source = source
+        self.expected_sha256 = expected_sha256
+        self.destination = destination
+        self.streams = max(1, streams)
+        self.block_size = block_size
+        self.log_info = log_info
+        self.partial_path = destination + PARTIAL_SUFFIX
+        self.state_path = destination + STATE_SUFFIX
+        self.lock_path = destination + LOCK_SUFFIX
+        self.resumed_bytes = 0
+        self._state_lock = threading.Lock()
+
+    def run(self) -> int:
+        """
+        Copy, verify and rename the file into place.
+
+        Returns:
+            int: Size of the copied file in bytes
+        """
+        os.makedirs(os.path.dirname(self.destination), exist_ok=True)
+        if not self._acquire_lock():
+            # Another process on this machine copied it while we waited
+            return os.path.getsize(self.destination)
+
+        try:
+            stat = os.stat(self.source)
+            state = self._load_state(stat)
+            self._copy_blocks(stat.st_size, state)
+            self._verify(stat.st_size)
+            os.replace(self.partial_path, self.destination)
+            os.utime(self.destination, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+            self._remove(self.state_path)
+            return stat.st_size
+        finally:
+            self._remove(self.lock_path)
+
+    def _acquire_lock(self) -> bool:
+        """
+        Take the per-file copy lock, waiting while a live process holds it.
+
+        Returns:
+            bool: False if another process finished the copy while we waited
+        """
+        waited = False
+        while not self._create_lock():
+            try:
+                with open(self.lock_path, "r") as f:
+                    owner = int(f.read().strip())
+            except (OSError, ValueError):
+                owner = None
+
+            if owner is None:
+                # Locks are written before they appear, so an unreadable one was left by a
+                # crash or an interrupted write; give a slow filesystem some time
+                try:
+                    abandoned = time.time() - os.path.getmtime(self.lock_path) >= UNREADABLE_LOCK_TIMEOUT
+                except OSError:
+                    continue  # Released in the meantime
+                if abandoned:
+                    self._remove(self.lock_path)
+                    continue
+            elif not is_process_alive(owner):
+                # Lock left behind by a dead process; its .partial can be resumed
+                self._remove(self.lock_path)
+                continue
+
+            waited = True
+            time.sleep(LOCK_POLL_INTERVAL)
+
+        if waited and os.path.isfile(self.destination):
+            self._remove(self.lock_path)
+            return False
+        return True
+
+    def _create_lock(self) -> bool:
+        """Create the lock file holding our PID, only if none exists; it is never seen empty"""
+        temp_path = f"{self.lock_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            with open(temp_path, "w") as f:
+                f.write(str(os.getpid()))
+            os.link(temp_path, self.lock_path)
+            return True
+        except FileExistsError:
+            return False
+        finally:
+            self._remove(temp_path)
+
+    def _load_state(self, stat: os.stat_result) -> dict:
+        """Load the resume state, or start a fresh .partial if the source changed"""
+        state = None
+        try:
+            with open(self.state_path, "r") as f:
+                state = json.load(f)
+        except (OSError, ValueError):
+            pass
+
+        if (state and state.get("source") == self.source and state.get("size") == stat.st_size
+                and state.get("mtime_ns") == stat.st_mtime_ns and state.get("block_size") == self.block_size
+                and os.path.isfile(self.partial_path)):
+            state["done"] = set(state.get("done", []))
+            self.resumed_bytes = min(len(state["done"]) * self.block_size, stat.st_size)
+            if self.resumed_bytes:
+                self.log_info(f"Resuming transfer of {self.source} ({self.resumed_bytes / 1024 ** 2:.0f} MB already copied)")
+            return state
+
+        with open(self.partial_path, "wb") as f:
+            f.truncate(stat.st_size)
+        state = {"source": self.source, "size": stat.st_size, "mtime_ns": stat.st_mtime_ns,
+                 "block_size": self.block_size, "done": set()}
+        self._save_state(state)
+        return state
+
+    def _save_state(self, state: dict):
+        """Persist the resume state atomically"""
+        temp_path = f"{self.state_path}.tmp"
+        with open(temp_path, "w") as f:
+            json.dump(dict(state, done=sorted(state["done"])), f)
+        os.replace(temp_path, self.state_path)
+
+    def _copy_blocks(self, size: int, state: dict):
+        """Copy all unfinished blocks with concurrent range streams"""
+        block_count = (size + self.block_size - 1) // self.block_size
+        pending = [index for index in range(block_count) if index not in state["done"]]
+        if not pending:
+            return
+
+        def copy_block(index: int):
+            offset = index * self.block_size
+            remaining = min(self.block_size, size - offset)
+            with open(self.source, "rb") as src, open(self.partial_path, "r+b") as dst:
+                src.seek(offset)
+                dst.seek(offset)
+                while remaining > 0:
+                    data = src.read(min(READ_SIZE, remaining))
+                    if not data:
+                        raise TransferError(f"{self.source} is shorter than expected")
+                    dst.write(data)
+                    remaining -= len(data)
+                dst.flush()
+                os.fsync(dst.fileno())
+            with self._state_lock:
+                state["done"].add(index)
+                self._save_state(state)
+
+        with ThreadPoolExecutor(max_workers=min(self.streams, len(pending))) as executor:
+            # list() re-raises the first failure; finished blocks stay checkpointed
+            list(executor.map(copy_block, pending))
+
+    def _verify(self, size: int):
+        """Check size and hash of the .partial before it is renamed into place"""
+        actual_size = os.path.getsize(self.partial_path)
+        if actual_size != size:
+            raise TransferError(f"Size mismatch for {self.destination}: {actual_size} != {size}")
+
+        expected = self.expected_sha256 or read_hash_sidecar(self.source)
+        digest = hash_file(self.partial_path)
+        if expected and digest != expected:
+            # The copy is unusable; start from scratch next time
+            self._remove(self.partial_path)
+            self._remove(self.state_path)
+            raise TransferError(f"SHA-256 mismatch for {self.destination}: {digest} != {expected}")
+
+        # Record the hash next to the local copy for later integrity checks
+        write_hash_sidecar(self.destination, digest)
+
+    @staticmethod
+    def _remove(path: str):
+        """Delete a file, ignoring missing files"""
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+def transfer_file(source: str, destination: str, streams: int = DEFAULT_STREAMS,
+                  block_size: int = DEFAULT_BLOCK_SIZE, log_info: Callable = print) -> int:
+    """Copy source to destination with ModelTransfer. Returns the file size."""
+    return ModelTransfer(source, destination, streams, block_size, log_info).run()
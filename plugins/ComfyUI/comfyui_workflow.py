@@ -0,0 +1,163 @@
+"""
+ComfyUI workflow normalization and hashing
+by Dominik Bargiel dominikbargiel97@gmail.com
+
+Shared by the submitter and the Deadline plugin. Every accepted workflow format
+(API prompt dict, list of [id, class_type, inputs] entries, or a "nodes" array)
+is normalized in one pass into the same compact form: node ID -> node dict with
+"class_type" and "inputs". On that form, each node gets a canonical hash of its
+own settings and a Merkle hash of the subgraph feeding it, both independent of
+node IDs, key order and UI metadata, so identical work can be recognized across
+jobs and changed nodes found by comparing hashes.
+"""
+
+import json
+import hashlib
+from typing import Any, Dict, List, Optional
+
+class WorkflowFormatError(ValueError):
+    """Raised when workflow data is not in a recognized format"""
+    pass
+
+def is_link(value: Any) -> bool:
+    """Check if an input value is a link ([node_id, output_index]) to another node"""
+    return isinstance(value, list) and len(value) == 2 and isinstance(value[1], int)
+
+def canonical_json(value: Any) -> str:
+    """Serialize with sorted keys and no whitespace so equal values hash equally"""
+    return json.dumps(value, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+
+def _digest(value: Any) -> str:
+    """SHA-256 hex digest of the canonical JSON of a value"""
+    return hashlib.sha256(canonical_json(value).encode("utf-8")).hexdigest()
+
+def detect_format(workflow_data: Any) -> Optional[str]:
+    """
+    Identify the layout of workflow data.
+
+    Returns:
+        str: "prompt" (node ID -> node dict), "list" ([id, class_type, inputs] entries),
+             "nodes" (dict with a "nodes" array), or None if not recognized
+    """
+    if isinstance(workflow_data, list):
+        return "list"
+    if not isinstance(workflow_data, dict):
+        return None
+    if isinstance(workflow_data.get("nodes"), list):
+        return "nodes"
+    if any(isinstance(node, dict) and "class_type" in node for node in workflow_data.values()):
+        return "prompt"
+    if any(isinstance(key, str) and key.isdigit() for key in workflow_data):
+        return "prompt"
+    return None
+
+def normalize_workflow(workflow_data: Any) -> Dict[str, dict]:
+    """
+    Convert any accepted workflow format into node ID -> {"class_type", "inputs", ...}.
+
+    Node IDs become strings and every node gets an "inputs" dict. Node dicts
+    are shallow copies, so callers may modify them without touching the input.
+
+    Raises:
+        WorkflowFormatError: If the data is not a recognized workflow format
+    """
+    workflow_format = detect_format(workflow_data)
+    if workflow_format is None:
+        raise WorkflowFormatError(f"Unrecognized workflow format ({type(workflow_data).__name__})")
+
+    normalized = {}
+    if workflow_format == "prompt":
+        for node_id, node in workflow_data.items():
+            if isinstance(node, dict):
+                normalized[str(node_id)] = _normalize_node(node)
+    elif workflow_format == "list":
+        for entry in workflow_data:
+            if isinstance(entry, list) and len(entry) >= 3:
+                normalized[str(entry[0])] = _normalize_node({"class_type": entry[1], "inputs": entry[2]})
+            elif isinstance(entry, dict) and "id" in entry:
+                normalized[str(entry["id"])] = _normalize_node(entry)
+    else:
+        for node in workflow_data["nodes"]:
+            if isinstance(node, dict):
+                normalized[str(node.get("id", 0))] = _normalize_node(node)
+    return normalized
+
+def _normalize_node(node: dict) -> dict:
+    """Shallow copy of a node with "class_type" and an "inputs" dict"""
+    normalized = dict(node)
+    if "class_type" not in normalized and "type" in normalized:
+        normalized["class_type"] = normalized["type"]
+    inputs = normalized.get("inputs")
+    normalized["inputs"] = dict(inputs) if isinstance(inputs, dict) else {}
+    return normalized
+
+def node_hashes(workflow: Dict[str, dict]) -> Dict[str, str]:
+    """
+    Hash each node's own settings: its class and literal inputs.
+
+    Links are included only by input name and output slot, so a node's hash
+    does not change when something upstream does.
+    """
+    hashes = {}
+    for node_id, node in workflow.items():
+        inputs = {}
+        for name, value in node.get("inputs", {}).items():
+            inputs[name] = {"link": value[1]} if _is_internal_link(workflow, value) else {"value": value}
+        hashes[node_id] = _digest({"class_type": node.get("class_type"), "inputs": inputs})
+    return hashes
+
+def subgraph_hashes(workflow: Dict[str, dict], local_hashes: Optional[Dict[str, str]] = None) -> Dict[str, str]:
+    """
+    Merkle hash of each node together with everything upstream of it.
+
+    Two nodes have the same subgraph hash exactly when they and all of their
+    inputs, recursively, are the same, regardless of node IDs. Links to
+    missing nodes and cycles are hashed by their target ID.
+    """
+    local_hashes = local_hashes or node_hashes(workflow)
+    hashes: Dict[str, str] = {}
+    in_progress = set()
+
+    for root in workflow:
+        # Iterative post-order walk; deep graphs would exceed the recursion limit
+        stack = [(root, False)]
+        while stack:
+            node_id, expanded = stack.pop()
+            if node_id in hashes:
+                continue
+            links = [(name, value) for name, value in workflow[node_id].get("inputs", {}).items()
+                     if _is_internal_link(workflow, value)]
+            if not expanded:
+                in_progress.add(node_id)
+                stack.append((node_id, True))
+                stack.extend((str(value[0]), False) for _, value in links
+                             if str(value[0]) not in hashes and str(value[0]) not in in_progress)
+                continue
+
+            upstream = {name: [hashes.get(str(value[0]), f"cycle:{value[0]}"), value[1]] for name, value in links}
+            hashes[node_id] = _digest({"node": local_hashes[node_id], "upstream": upstream})
+            in_progress.discard(node_id)
+    return hashes
+
+def output_node_ids(workflow: Dict[str, dict]) -> List[str]:
+    """Nodes whose outputs no other node consumes"""
+    consumed = set()
+    for node in workflow.values():
+        for value in node.get("inputs", {}).values():
+            if _is_internal_link(workflow, value):
+                consumed.add(str(value[0]))
+    return [node_id for node_id in workflow if node_id not in consumed]
+
+def workflow_hash(workflow: Dict[str, dict], hashes: Optional[Dict[str, str]] = None) -> str:
+    """Identity of the whole workflow: the subgraph hashes of its final nodes, independent of node IDs"""
+    hashes = hashes or subgraph_hashes(workflow)
+    return _digest(sorted(hashes[node_id] for node_id in output_node_ids(workflow)))
+
+def changed_nodes(old: Dict[str, dict], new: Dict[str, dict]) -> List[str]:
+    """IDs of nodes in new whose settings or upstream differ from the node with the same ID in old"""
+    old_hashes = subgraph_hashes(old)
+    return [node_id for node_id, digest in subgraph_hashes(new).items() if old_hashes.get(node_id) != digest]
+
+def _is_internal_link(workflow: Dict[str, dict], value: Any) -> bool:
+    """Check if an input value links to a node of this workflow"""
+    return is_link(value) and str(value[0]) in workflow